@@ -6,6 +6,7 @@ Handles HTTP requests on port 9000
 """
 
 import os
+import re
 import sys
 import json
 import logging
@@ -23,17 +24,20 @@ logger.info("🚀 BOOTSTRAP INITIALIZATION")
 logger.info("="*70)
 
 # Log environment
-logger.info(f"Current working directory: {os.getcwd()}")
-logger.info(f"Python executable: {sys.executable}")
-logger.info(f"Python version: {sys.version}")
-logger.info(f"Environment variables:")
-for key in sorted(os.environ.keys()):
-    if 'PATH' in key or 'PYTHON' in key or 'CODE' in key:
-        logger.info(f"  {key}={os.environ[key][:100]}")
+logger.info("Current working directory: %s", os.getcwd())
+logger.info("Python executable: %s", sys.executable)
+logger.info("Python version: %s", sys.version)
+logger.info("Environment variables:")
+# Single compiled-regex scan over environ items - no sort, no repeated
+# substring checks per key (FC containers carry hundreds of env vars)
+_ENV_LOG_PATTERN = re.compile(r'PATH|PYTHON|CODE')
+for key, value in os.environ.items():
+    if _ENV_LOG_PATTERN.search(key):
+        logger.info("  %s=%s", key, value[:100])
 
 # Determine paths - Alibaba FC specific
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-logger.info(f"Script directory: {SCRIPT_DIR}")
+logger.info("Script directory: %s", SCRIPT_DIR)
 
 # Try multiple paths
 CODE_PATHS = [
@@ -45,57 +49,115 @@ CODE_PATHS = [
     '/opt/python',                                 # Alibaba layer alt
 ]
 
+# Directory listing cache: one readdir per directory instead of several
+# stat syscalls per candidate path (cold-start init time is billed on FC)
+_dir_cache = {}
+
+def _scandir_cached(path):
+    """List a directory once and cache the entry names"""
+    if path not in _dir_cache:
+        try:
+            with os.scandir(path) as entries:
+                _dir_cache[path] = {entry.name for entry in entries}
+        except OSError:
+            _dir_cache[path] = None
+    return _dir_cache[path]
+
 CODE_DIR = None
 for path in CODE_PATHS:
-    if path and os.path.exists(path):
-        logger.info(f"Checking path: {path}")
-        if os.path.isdir(path):
-            # Check if app/ or main.py exists
-            if os.path.exists(os.path.join(path, 'app')) or os.path.exists(os.path.join(path, 'main.py')) or path == SCRIPT_DIR:
-                CODE_DIR = path
-                logger.info(f"✓ Using CODE_DIR: {CODE_DIR}")
-                break
+    if not path:
+        continue
+    entries = _scandir_cached(path)
+    if entries is None:
+        continue
+    logger.info("Checking path: %s", path)
+    # Check if app/ or main.py exists - single readdir covers both
+    if 'app' in entries or 'main.py' in entries or path == SCRIPT_DIR:
+        CODE_DIR = path
+        logger.info("✓ Using CODE_DIR: %s", CODE_DIR)
+        break
 
 if not CODE_DIR:
     CODE_DIR = SCRIPT_DIR
-    logger.warning(f"⚠ Using fallback CODE_DIR: {CODE_DIR}")
+    logger.warning("⚠ Using fallback CODE_DIR: %s", CODE_DIR)
 
 # Update sys.path
 sys.path.insert(0, CODE_DIR)
 sys.path.insert(0, os.path.join(CODE_DIR, 'app'))
-logger.info(f"Updated sys.path: {sys.path[:3]}")
+logger.info("Updated sys.path: %s", sys.path[:3])
+
+# Candidate file locations, joined once at module load. load_env and
+# import_app both sit on the cold-start path and previously rebuilt
+# these lists with several os.path.join calls per invocation.
+_ENV_PATHS = (
+    os.path.join(CODE_DIR, '.env'),
+    os.path.join(CODE_DIR, '.env.production'),
+    os.path.join(SCRIPT_DIR, '.env'),
+    '/root/.env',
+)
+# Pre-split (path, parent, name) so the lookup loop below is pure set
+# membership against one cached readdir per unique parent directory
+_ENV_CANDIDATES = tuple(
+    (p, os.path.dirname(p), os.path.basename(p)) for p in _ENV_PATHS
+)
+_MAIN_PATHS = (
+    os.path.join(CODE_DIR, 'app', 'main.py'),
+    os.path.join(CODE_DIR, 'main.py'),
+    os.path.join(SCRIPT_DIR, 'main.py'),
+)
+
+# Parsed .env cache keyed by file mtime, so reloaders that call load_env()
+# repeatedly do not re-split every line or rewrite os.environ entry by entry
+_env_file_cache = {}
+
+def _parse_env_file(env_path):
+    """Parse a .env file into a dict, cached per (path, mtime)"""
+    try:
+        mtime = os.stat(env_path).st_mtime
+    except OSError:
+        return None
+    cached = _env_file_cache.get(env_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(env_path, 'r') as f:
+        lines = f.read().splitlines()
+    parsed = {
+        key.strip(): value.strip()
+        for key, value in (
+            line.split('=', 1)
+            for line in lines
+            if line.strip() and not line.lstrip().startswith('#') and '=' in line
+        )
+    }
+    _env_file_cache[env_path] = (mtime, parsed)
+    return parsed
 
 # Load environment variables
 def load_env():
     """Load environment variables from .env files"""
-    env_paths = [
-        os.path.join(CODE_DIR, '.env'),
-        os.path.join(CODE_DIR, '.env.production'),
-        os.path.join(SCRIPT_DIR, '.env'),
-        '/root/.env',
-    ]
-    
-    for env_path in env_paths:
-        if os.path.exists(env_path):
-            logger.info(f"Loading environment from: {env_path}")
+    for env_path, parent_dir, name in _ENV_CANDIDATES:
+        # Membership check against the cached listing - no extra stat per candidate
+        parent_entries = _scandir_cached(parent_dir)
+        if parent_entries and name in parent_entries:
+            logger.info("Loading environment from: %s", env_path)
             try:
                 from dotenv import load_dotenv
                 load_dotenv(env_path)
-                logger.info(f"✓ Loaded environment from {env_path}")
+                logger.info("✓ Loaded environment from %s", env_path)
                 return True
             except ImportError:
                 logger.warning("python-dotenv not installed, reading manually")
                 try:
-                    with open(env_path, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line and not line.startswith('#') and '=' in line:
-                                key, value = line.split('=', 1)
-                                os.environ[key.strip()] = value.strip()
-                    logger.info(f"✓ Manually loaded environment from {env_path}")
-                    return True
+                    parsed = _parse_env_file(env_path)
+                    if parsed is not None:
+                        # Variables already set win; apply the rest in one update
+                        os.environ.update(
+                            {k: v for k, v in parsed.items() if k not in os.environ}
+                        )
+                        logger.info("✓ Manually loaded environment from %s", env_path)
+                        return True
                 except Exception as e:
-                    logger.warning(f"Error reading {env_path}: {e}")
+                    logger.warning("Error reading %s: %s", env_path, e)
     
     logger.info("No .env file found, using system environment")
     return False
@@ -117,7 +179,7 @@ def import_app():
         return app
     except (ImportError, ModuleNotFoundError) as e:
         strategies.append(f"app.main: {e}")
-        logger.debug(f"Strategy 1 failed: {e}")
+        logger.debug("Strategy 1 failed: %s", e)
     
     # Strategy 2: Import from main (current directory)
     try:
@@ -127,149 +189,149 @@ def import_app():
         return app
     except (ImportError, ModuleNotFoundError) as e:
         strategies.append(f"main: {e}")
-        logger.debug(f"Strategy 2 failed: {e}")
+        logger.debug("Strategy 2 failed: %s", e)
     
     # Strategy 3: Load from file path using importlib
     try:
         logger.debug("Strategy 3: Attempting importlib.util.spec_from_file_location")
         import importlib.util
-        
-        main_paths = [
-            os.path.join(CODE_DIR, 'app', 'main.py'),
-            os.path.join(CODE_DIR, 'main.py'),
-            os.path.join(SCRIPT_DIR, 'main.py'),
-        ]
-        
-        for main_path in main_paths:
-            logger.debug(f"Checking: {main_path}")
-            if os.path.exists(main_path):
-                logger.info(f"Found main.py at: {main_path}")
+
+        for main_path in _MAIN_PATHS:
+            logger.debug("Checking: %s", main_path)
+            # Reuse the directory listings cached during CODE_DIR resolution
+            # instead of issuing fresh stat() calls for the same paths
+            parent_entries = _scandir_cached(os.path.dirname(main_path))
+            if parent_entries and os.path.basename(main_path) in parent_entries:
+                logger.info("Found main.py at: %s", main_path)
                 spec = importlib.util.spec_from_file_location("app_main", main_path)
                 if spec and spec.loader:
                     main_module = importlib.util.module_from_spec(spec)
                     sys.modules['app_main'] = main_module
                     spec.loader.exec_module(main_module)
                     if hasattr(main_module, 'app'):
-                        logger.info(f"✓ Strategy 3 SUCCESS: FastAPI app loaded from {main_path}")
+                        logger.info("✓ Strategy 3 SUCCESS: FastAPI app loaded from %s", main_path)
                         return main_module.app
     except Exception as e:
         strategies.append(f"importlib: {e}")
-        logger.debug(f"Strategy 3 failed: {e}")
+        logger.debug("Strategy 3 failed: %s", e)
     
     # All strategies failed
     logger.error("❌ ALL IMPORT STRATEGIES FAILED!")
     logger.error("\nDiagnostic Information:")
-    logger.error(f"  CODE_DIR: {CODE_DIR}")
-    logger.error(f"  SCRIPT_DIR: {SCRIPT_DIR}")
-    logger.error(f"  CWD: {os.getcwd()}")
-    logger.error(f"  sys.path[:5]: {sys.path[:5]}")
+    logger.error("  CODE_DIR: %s", CODE_DIR)
+    logger.error("  SCRIPT_DIR: %s", SCRIPT_DIR)
+    logger.error("  CWD: %s", os.getcwd())
+    logger.error("  sys.path[:5]: %s", sys.path[:5])
     
     logger.error("\nAttempted strategies:")
     for strategy in strategies:
-        logger.error(f"  - {strategy}")
+        logger.error("  - %s", strategy)
     
     logger.error("\nDirectory contents:")
     try:
         contents = os.listdir(CODE_DIR)
-        logger.error(f"  {CODE_DIR}/: {contents[:10]}")
+        logger.error("  %s/: %s", CODE_DIR, contents[:10])
     except Exception as e:
-        logger.error(f"  Error listing {CODE_DIR}: {e}")
+        logger.error("  Error listing %s: %s", CODE_DIR, e)
     
     sys.exit(1)
 
 # Import the app
 app = import_app()
-logger.info(f"FastAPI app object: {app}")
-logger.info(f"App title: {getattr(app, 'title', 'N/A')}")
+logger.info("FastAPI app object: %s", app)
+logger.info("App title: %s", getattr(app, 'title', 'N/A'))
 
 # Port configuration from environment
 FC_PORT = int(os.environ.get('FC_PORT', 9000))
 FC_HOST = os.environ.get('FC_HOST', '0.0.0.0')
 
-logger.info(f"Configured to listen on {FC_HOST}:{FC_PORT}")
+logger.info("Configured to listen on %s:%s", FC_HOST, FC_PORT)
 logger.info("="*70)
 
 # ASGI app reference
 asgi_app = app
 
-# HTTP handler for Alibaba FC
-def http_handler(environ, start_response):
-    """
-    WSGI handler for Alibaba Function Compute
-    Converts WSGI to ASGI for FastAPI
-    """
-    import io
+# WSGI entry point for Alibaba FC
+# Strategy 1: a2wsgi keeps a single event loop in a worker thread and streams
+# multi-chunk response bodies correctly - no per-request loop create/destroy.
+try:
+    from a2wsgi import ASGIMiddleware
+    http_handler = ASGIMiddleware(app)
+    logger.info("✓ WSGI handler: a2wsgi.ASGIMiddleware (persistent event loop)")
+except ImportError:
+    # Strategy 2: minimal in-process bridge on one persistent event loop.
+    # The loop is created once at module load and reused for every request;
+    # response body chunks are accumulated so multi-chunk bodies are not dropped.
+    import asyncio
+    from http import HTTPStatus
     from urllib.parse import unquote
-    
-    # Extract request details
-    method = environ.get('REQUEST_METHOD', 'GET')
-    path = unquote(environ.get('PATH_INFO', '/'))
-    query_string = environ.get('QUERY_STRING', '')
-    content_length = int(environ.get('CONTENT_LENGTH', 0))
-    body = environ['wsgi.input'].read(content_length) if content_length else b''
-    
-    headers = {}
-    for key, value in environ.items():
-        if key.startswith('HTTP_'):
-            headers[key[5:].replace('_', '-').lower()] = value
-    
-    # Create ASGI event
-    asgi_scope = {
+
+    logger.warning("a2wsgi not installed, using built-in WSGI bridge")
+
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+
+    # Pre-encoded scope template - immutable parts built once, not per request
+    _SCOPE_TEMPLATE = {
         'type': 'http',
         'asgi': {'version': '3.0'},
         'http_version': '1.1',
-        'method': method,
-        'scheme': environ.get('wsgi.url_scheme', 'http'),
-        'path': path,
-        'query_string': query_string.encode(),
         'root_path': '',
-        'headers': [[k.encode(), v.encode()] for k, v in headers.items()],
-        'server': (environ.get('SERVER_NAME', 'localhost'), int(environ.get('SERVER_PORT', 80))),
-        'client': (environ.get('REMOTE_ADDR', '0.0.0.0'), 0),
         'state': {},
     }
-    
-    response_started = False
-    status_code = 200
-    response_headers = []
-    
-    async def asgi_coroutine():
-        nonlocal response_started, status_code, response_headers
-        
-        # Receive
+
+    def _status_line(code):
+        try:
+            return f"{code} {HTTPStatus(code).phrase}"
+        except ValueError:
+            return f"{code} Unknown"
+
+    def http_handler(environ, start_response):
+        """
+        WSGI handler for Alibaba Function Compute
+        Converts WSGI to ASGI for FastAPI on a single persistent event loop
+        """
+        content_length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(content_length) if content_length else b''
+
+        headers = [
+            [key[5:].replace('_', '-').lower().encode(), value.encode()]
+            for key, value in environ.items()
+            if key.startswith('HTTP_')
+        ]
+
+        asgi_scope = dict(
+            _SCOPE_TEMPLATE,
+            method=environ.get('REQUEST_METHOD', 'GET'),
+            scheme=environ.get('wsgi.url_scheme', 'http'),
+            path=unquote(environ.get('PATH_INFO', '/')),
+            query_string=environ.get('QUERY_STRING', '').encode(),
+            headers=headers,
+            server=(environ.get('SERVER_NAME', 'localhost'), int(environ.get('SERVER_PORT', 80))),
+            client=(environ.get('REMOTE_ADDR', '0.0.0.0'), 0),
+        )
+
+        response = {'status': 500, 'headers': [], 'chunks': []}
+
         async def receive():
             return {'type': 'http.request', 'body': body, 'more_body': False}
-        
-        # Send
+
         async def send(message):
-            nonlocal response_started, status_code, response_headers
             if message['type'] == 'http.response.start':
-                response_started = True
-                status_code = message['status']
-                response_headers = message.get('headers', [])
+                response['status'] = message['status']
+                response['headers'] = message.get('headers', [])
             elif message['type'] == 'http.response.body':
-                if response_started:
-                    body = message.get('body', b'')
-                    if body:
-                        start_response(f"{status_code} OK", response_headers)
-                        return body
-        
-        await app(asgi_scope, receive, send)
-    
-    # Run async coroutine
-    import asyncio
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        response_body = loop.run_until_complete(asgi_coroutine())
-        if response_body:
-            start_response(f"{status_code} OK", response_headers)
-            return [response_body]
-    finally:
-        loop.close()
-    
-    start_response('200 OK', [('Content-Type', 'application/json')])
-    return [b'{"status":"ok"}']
+                chunk = message.get('body', b'')
+                if chunk:
+                    response['chunks'].append(chunk)
+
+        _loop.run_until_complete(app(asgi_scope, receive, send))
+
+        start_response(
+            _status_line(response['status']),
+            [(k.decode('latin-1'), v.decode('latin-1')) for k, v in response['headers']]
+        )
+        return response['chunks']
 
 if __name__ == '__main__':
     try:
@@ -281,24 +343,28 @@ if __name__ == '__main__':
         
         logger.info("\n" + "="*70)
         logger.info("✅ WMS Manufacturing Query Service (FastAPI)")
-        logger.info(f"   Environment: {env_name}")
-        logger.info(f"   Listening on: http://{FC_HOST}:{FC_PORT}")
-        logger.info(f"   Health Check: http://{FC_HOST}:{FC_PORT}/health")
-        logger.info(f"   API Docs: http://{FC_HOST}:{FC_PORT}/docs")
+        logger.info("   Environment: %s", env_name)
+        logger.info("   Listening on: http://%s:%s", FC_HOST, FC_PORT)
+        logger.info("   Health Check: http://%s:%s/health", FC_HOST, FC_PORT)
+        logger.info("   API Docs: http://%s:%s/docs", FC_HOST, FC_PORT)
         logger.info("="*70 + "\n")
         
-        # Start Uvicorn server
+        # Start Uvicorn server with the C-accelerated event loop and HTTP
+        # parser; access logs are disabled (each line is a Python-level
+        # format+write on the request path)
         uvicorn.run(
             app,
             host=FC_HOST,
             port=FC_PORT,
-            log_level='info',
-            access_log=True,
+            loop='uvloop',
+            http='httptools',
+            log_level='warning',
+            access_log=False,
             reload=False,
         )
         
     except ImportError as e:
-        logger.error(f"Required package not found: {e}")
+        logger.error("Required package not found: %s", e)
         sys.exit(1)
     except Exception as e:
         logger.error(f"Failed to start server: {e}", exc_info=True)
@@ -1,81 +1,52 @@
 """
 API Router untuk ERP Query Service
 Production-ready routing dengan comprehensive endpoints
+
+Endpoint modules are imported lazily: each one transitively pulls SQLAlchemy
+models and pydantic schemas, which dominates cold-start time on Function
+Compute. The router is only built on first access to `api_router` (PEP 562).
 """
 from fastapi import APIRouter
-from .endpoints import (
-    production, 
-    quality_control, 
-    warehouse, 
-    user_management, 
-    historical_stock, 
-    master_product,
-    erp_query,  # New ERP endpoints
-    mobile  # Mobile API endpoints
-)
-from app.get import (
-    get_qc,  # Enhanced QC endpoints
-    get_warehouse  # Enhanced Warehouse endpoints
+
+# (router_module_path, prefix, tags)
+_ROUTE_TABLE = (
+    # ERP Query Endpoints (Primary focus for production)
+    ("app.api.v1.endpoints.erp_query", "/erp", ["ERP Queries"]),
+    # Mobile API Endpoints
+    ("app.api.v1.endpoints.mobile", "/mobile", ["Mobile API"]),
+    # Enhanced Warehouse Query Endpoints (New CQRS Implementation)
+    ("app.get.get_warehouse", "/warehouse", ["Warehouse Management - Enhanced"]),
+    # Enhanced QC Query Endpoints (CQRS Implementation)
+    ("app.get.get_qc", "/qc", ["Quality Control - Enhanced"]),
+    # Legacy endpoints (for backward compatibility)
+    ("app.api.v1.endpoints.production", "/production-legacy", ["Production (Legacy)"]),
+    ("app.api.v1.endpoints.quality_control", "/quality-legacy", ["Quality Control (Legacy)"]),
+    ("app.api.v1.endpoints.warehouse", "/warehouse-legacy", ["Warehouse (Legacy)"]),
+    ("app.api.v1.endpoints.user_management", "/users", ["User Management"]),
+    ("app.api.v1.endpoints.historical_stock", "/historical-stock", ["Historical Stock"]),
+    ("app.api.v1.endpoints.master_product", "/master-product", ["Master Product"]),
 )
 
-api_router = APIRouter()
+_api_router = None
 
-# ERP Query Endpoints (Primary focus for production)
-api_router.include_router(
-    erp_query.router, 
-    prefix="/erp", 
-    tags=["ERP Queries"]
-)
 
-# Mobile API Endpoints
-api_router.include_router(
-    mobile.router, 
-    prefix="/mobile", 
-    tags=["Mobile API"]
-)
+def build_api_router() -> APIRouter:
+    """Build the aggregate router, importing endpoint modules on first use"""
+    global _api_router
+    if _api_router is None:
+        from importlib import import_module
 
-# Enhanced Warehouse Query Endpoints (New CQRS Implementation)
-api_router.include_router(
-    get_warehouse.router, 
-    prefix="/warehouse", 
-    tags=["Warehouse Management - Enhanced"]
-)
+        router = APIRouter()
+        for module_path, prefix, tags in _ROUTE_TABLE:
+            module = import_module(module_path)
+            router.include_router(module.router, prefix=prefix, tags=tags)
+        _api_router = router
+    return _api_router
 
-# Enhanced QC Query Endpoints (CQRS Implementation)
-api_router.include_router(
-    get_qc.router, 
-    prefix="/qc", 
-    tags=["Quality Control - Enhanced"]
-)
 
-# Legacy endpoints (for backward compatibility)
-api_router.include_router(
-    production.router, 
-    prefix="/production-legacy", 
-    tags=["Production (Legacy)"]
-)
-api_router.include_router(
-    quality_control.router, 
-    prefix="/quality-legacy", 
-    tags=["Quality Control (Legacy)"]
-)
-api_router.include_router(
-    warehouse.router, 
-    prefix="/warehouse-legacy", 
-    tags=["Warehouse (Legacy)"]
-)
-api_router.include_router(
-    user_management.router, 
-    prefix="/users", 
-    tags=["User Management"]
-)
-api_router.include_router(
-    historical_stock.router, 
-    prefix="/historical-stock", 
-    tags=["Historical Stock"]
-)
-api_router.include_router(
-    master_product.router, 
-    prefix="/master-product", 
-    tags=["Master Product"]
-)
+def __getattr__(name):
+    # Keep `from app.api.v1.api import api_router` working while deferring
+    # the heavy endpoint imports until the attribute is actually needed
+    if name == "api_router":
+        return build_api_router()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
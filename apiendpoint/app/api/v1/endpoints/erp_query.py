@@ -3,14 +3,21 @@ ERP Query Router
 Production-ready endpoints for querying ERP data
 Read-only operations for analytics and reporting
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, asc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, or_, desc, asc, inspect as sa_inspect
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date, timedelta
+from decimal import Decimal
+import hashlib
+import json
 import logging
 
-from app.database.session import get_db
+from app.database.session import get_db, get_async_db
+from app.core.cache import cache_lookup, cache_store
 from app.models.erp_models import (
     InventoryLocation, InventoryBalance, InventoryMovement,
     Machine, Supplier, PurchaseOrder, PurchaseOrderItem,
@@ -19,7 +26,61 @@ from app.models.erp_models import (
 )
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+
+# orjson serializes large float/date-heavy payloads in C instead of the
+# stdlib json Python loop; fall back to the default encoder if not installed
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    router = APIRouter(default_response_class=ORJSONResponse)
+except ImportError:
+    router = APIRouter()
+
+def _json_default(value):
+    """JSON fallback for Decimal and datetime values in streamed rows"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# ===============================================
+# REFERENCE DATA CACHE
+# ===============================================
+# Locations and machines change on the order of minutes/hours, so their
+# full-table queries are served from the shared bounded TTL cache
+# (app/core/cache.py), with an ETag so clients can short-circuit with 304.
+# Entries are keyed by the filter tuple, which includes client-controlled
+# query strings - the shared store caps itself at _MAX_ENTRIES, so
+# arbitrary filter values cannot grow the cache without bound.
+
+_REFERENCE_CACHE_TTL = 60  # seconds
+_DASHBOARD_CACHE_TTL = 30  # seconds - dashboards are polled, keep them fresher
+
+def _row_as_dict(row) -> Dict[str, Any]:
+    """Map an ORM row to a plain column dict for caching/hashing"""
+    return {column.name: getattr(row, column.name) for column in row.__table__.columns}
+
+def _reference_cache_lookup(cache_key, ttl=_REFERENCE_CACHE_TTL):
+    """Return (payload, etag) on fresh hit, None otherwise"""
+    return cache_lookup(cache_key, ttl)
+
+def _reference_cache_store(cache_key, payload):
+    etag = hashlib.blake2b(
+        json.dumps(payload, default=_json_default, sort_keys=True).encode(),
+        digest_size=8
+    ).hexdigest()
+    cache_store(cache_key, (payload, etag))
+    return etag
+
+def _conditional_response(request: Request, response: Response, payload, etag,
+                          ttl=_REFERENCE_CACHE_TTL):
+    """Attach cache headers; emit 304 when the client ETag still matches"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"max-age={ttl}"
+    return payload
 
 # ===============================================
 # INVENTORY QUERIES
@@ -27,32 +88,57 @@ router = APIRouter()
 
 @router.get("/inventory/locations", tags=["Inventory"])
 async def get_inventory_locations(
+    request: Request,
+    response: Response,
     location_type: Optional[str] = None,
     is_active: Optional[bool] = True,
     db: Session = Depends(get_db)
 ):
     """Get all inventory locations with optional filtering"""
     try:
-        query = db.query(InventoryLocation)
-        
-        if location_type:
-            query = query.filter(InventoryLocation.location_type == location_type)
-        if is_active is not None:
-            query = query.filter(InventoryLocation.is_active == is_active)
-            
-        locations = query.order_by(InventoryLocation.location_code).all()
-        return {
-            "success": True,
-            "count": len(locations),
-            "data": locations
-        }
+        cache_key = ("inventory_locations", location_type, is_active)
+        cached = _reference_cache_lookup(cache_key)
+        if cached is None:
+            query = db.query(InventoryLocation)
+
+            if location_type:
+                query = query.filter(InventoryLocation.location_type == location_type)
+            if is_active is not None:
+                query = query.filter(InventoryLocation.is_active == is_active)
+
+            locations = query.order_by(InventoryLocation.location_code).all()
+            payload = {
+                "success": True,
+                "count": len(locations),
+                "data": [_row_as_dict(location) for location in locations]
+            }
+            etag = _reference_cache_store(cache_key, payload)
+        else:
+            payload, etag = cached
+
+        return _conditional_response(request, response, payload, etag)
     except Exception as e:
-        logger.error(f"Error getting inventory locations: {e}")
+        logger.error("Error getting inventory locations: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+class BalanceOut(BaseModel):
+    """Streamed balance row; pydantic-core coerces the Decimal columns
+    to float and serializes in Rust instead of per-field float() calls"""
+    part_number: str
+    location_code: str
+    location_name: str
+    location_type: Optional[str] = None
+    available_quantity: float
+    reserved_quantity: float
+    allocated_quantity: float
+    average_cost: float
+    total_value: float
+    last_movement_date: Optional[datetime] = None
+
 @router.get("/inventory/balances", tags=["Inventory"])
 async def get_inventory_balances(
     part_number: Optional[str] = None,
+    part_number_prefix: Optional[str] = None,
     location_code: Optional[str] = None,
     min_quantity: Optional[float] = None,
     include_zero: bool = False,
@@ -60,55 +146,67 @@ async def get_inventory_balances(
 ):
     """Get inventory balances with comprehensive filtering"""
     try:
-        query = db.query(
-            InventoryBalance,
-            InventoryLocation.location_code,
-            InventoryLocation.location_name,
-            InventoryLocation.location_type
-        ).join(InventoryLocation)
-        
-        if part_number:
-            query = query.filter(InventoryBalance.part_number.like(f"%{part_number}%"))
+        filters = []
+        if part_number_prefix:
+            # Anchored prefix search uses the part_number B-tree index;
+            # contains-search below needs the FULLTEXT index
+            # (see database/search_index_optimization.sql)
+            filters.append(InventoryBalance.part_number.like(f"{part_number_prefix}%"))
+        elif part_number:
+            filters.append(InventoryBalance.part_number.like(f"%{part_number}%"))
         if location_code:
-            query = query.filter(InventoryLocation.location_code == location_code)
+            filters.append(InventoryLocation.location_code == location_code)
         if min_quantity is not None:
-            query = query.filter(InventoryBalance.available_quantity >= min_quantity)
+            filters.append(InventoryBalance.available_quantity >= min_quantity)
         if not include_zero:
-            query = query.filter(InventoryBalance.available_quantity > 0)
-            
-        results = query.order_by(
+            filters.append(InventoryBalance.available_quantity > 0)
+
+        # Per-row value and the envelope totals are computed by the DB in
+        # one pass (window aggregates) - no Python multiply/add per row and
+        # no second aggregate round trip; rows stream so the full result
+        # set is never materialized in memory
+        row_value = (InventoryBalance.available_quantity * InventoryBalance.average_cost)
+        results = db.query(
+            InventoryBalance,
+            InventoryLocation.location_code,
+            InventoryLocation.location_name,
+            InventoryLocation.location_type,
+            row_value.label('item_value'),
+            func.count().over().label('total_count'),
+            func.sum(row_value).over().label('total_value')
+        ).join(InventoryLocation).filter(*filters).order_by(
             InventoryBalance.part_number,
             InventoryLocation.location_code
-        ).all()
-        
-        # Format response
-        balances = []
-        total_value = 0
-        for balance, loc_code, loc_name, loc_type in results:
-            item_value = float(balance.available_quantity * balance.average_cost)
-            total_value += item_value
-            
-            balances.append({
-                "part_number": balance.part_number,
-                "location_code": loc_code,
-                "location_name": loc_name,
-                "location_type": loc_type,
-                "available_quantity": float(balance.available_quantity),
-                "reserved_quantity": float(balance.reserved_quantity),
-                "allocated_quantity": float(balance.allocated_quantity),
-                "average_cost": float(balance.average_cost),
-                "total_value": item_value,
-                "last_movement_date": balance.last_movement_date
-            })
-        
-        return {
-            "success": True,
-            "count": len(balances),
-            "total_value": total_value,
-            "data": balances
-        }
+        ).execution_options(stream_results=True, yield_per=500)
+
+        def generate():
+            first = True
+            for balance, loc_code, loc_name, loc_type, item_value, total_count, total_value in results:
+                if first:
+                    yield '{"success": true, "count": %d, "total_value": %s, "data": [' % (
+                        total_count, json.dumps(float(total_value))
+                    )
+                chunk = BalanceOut.model_validate({
+                    "part_number": balance.part_number,
+                    "location_code": loc_code,
+                    "location_name": loc_name,
+                    "location_type": loc_type,
+                    "available_quantity": balance.available_quantity,
+                    "reserved_quantity": balance.reserved_quantity,
+                    "allocated_quantity": balance.allocated_quantity,
+                    "average_cost": balance.average_cost,
+                    "total_value": item_value,
+                    "last_movement_date": balance.last_movement_date
+                }).model_dump_json()
+                yield chunk if first else "," + chunk
+                first = False
+            if first:
+                yield '{"success": true, "count": 0, "total_value": 0.0, "data": ['
+            yield ']}'
+
+        return StreamingResponse(generate(), media_type="application/json")
     except Exception as e:
-        logger.error(f"Error getting inventory balances: {e}")
+        logger.error("Error getting inventory balances: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/inventory/movements", tags=["Inventory"])
@@ -119,23 +217,27 @@ async def get_inventory_movements(
     date_to: Optional[date] = None,
     limit: int = Query(100, le=1000),
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get inventory movements with date filtering and pagination"""
     try:
-        query = db.query(InventoryMovement)
-        
+        # COUNT(*) OVER() rides along with the page query - one scan of the
+        # filtered set instead of a separate count() round trip
+        stmt = select(InventoryMovement, func.count().over().label('total_count'))
+
         if part_number:
-            query = query.filter(InventoryMovement.part_number.like(f"%{part_number}%"))
+            stmt = stmt.where(InventoryMovement.part_number.like(f"%{part_number}%"))
         if movement_type:
-            query = query.filter(InventoryMovement.movement_type == movement_type)
+            stmt = stmt.where(InventoryMovement.movement_type == movement_type)
         if date_from:
-            query = query.filter(InventoryMovement.movement_date >= date_from)
+            stmt = stmt.where(InventoryMovement.movement_date >= date_from)
         if date_to:
-            query = query.filter(InventoryMovement.movement_date <= date_to)
-            
-        total_count = query.count()
-        movements = query.order_by(desc(InventoryMovement.movement_date)).offset(offset).limit(limit).all()
+            stmt = stmt.where(InventoryMovement.movement_date <= date_to)
+
+        stmt = stmt.order_by(desc(InventoryMovement.movement_date)).offset(offset).limit(limit)
+        rows = (await db.execute(stmt)).all()
+        total_count = rows[0].total_count if rows else 0
+        movements = [row[0] for row in rows]
         
         return {
             "success": True,
@@ -146,7 +248,7 @@ async def get_inventory_movements(
             "data": movements
         }
     except Exception as e:
-        logger.error(f"Error getting inventory movements: {e}")
+        logger.error("Error getting inventory movements: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ===============================================
@@ -161,23 +263,26 @@ async def get_production_orders(
     date_to: Optional[date] = None,
     limit: int = Query(100, le=1000),
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get production orders with comprehensive filtering"""
     try:
-        query = db.query(ProductionOrder)
-        
+        # Window-function count: one scan instead of count() + page query
+        stmt = select(ProductionOrder, func.count().over().label('total_count'))
+
         if status:
-            query = query.filter(ProductionOrder.status == status)
+            stmt = stmt.where(ProductionOrder.status == status)
         if part_number:
-            query = query.filter(ProductionOrder.part_number.like(f"%{part_number}%"))
+            stmt = stmt.where(ProductionOrder.part_number.like(f"%{part_number}%"))
         if date_from:
-            query = query.filter(ProductionOrder.start_date >= date_from)
+            stmt = stmt.where(ProductionOrder.start_date >= date_from)
         if date_to:
-            query = query.filter(ProductionOrder.start_date <= date_to)
-            
-        total_count = query.count()
-        orders = query.order_by(desc(ProductionOrder.created_at)).offset(offset).limit(limit).all()
+            stmt = stmt.where(ProductionOrder.start_date <= date_to)
+
+        stmt = stmt.order_by(desc(ProductionOrder.created_at)).offset(offset).limit(limit)
+        rows = (await db.execute(stmt)).all()
+        total_count = rows[0].total_count if rows else 0
+        orders = [row[0] for row in rows]
         
         return {
             "success": True,
@@ -188,9 +293,46 @@ async def get_production_orders(
             "data": orders
         }
     except Exception as e:
-        logger.error(f"Error getting production orders: {e}")
+        logger.error("Error getting production orders: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+class _MachineRef(BaseModel):
+    """Machine fields needed to flatten into the schedule payload"""
+    model_config = ConfigDict(from_attributes=True)
+
+    machine_code: Optional[str] = None
+    machine_name: Optional[str] = None
+
+class ScheduleOut(BaseModel):
+    """Production schedule row, flattened with its machine"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    schedule_number: str
+    production_order_id: int
+    scheduled_start: Optional[datetime] = None
+    scheduled_end: Optional[datetime] = None
+    actual_start: Optional[datetime] = None
+    actual_end: Optional[datetime] = None
+    status: Optional[str] = None
+    priority: Optional[int] = None
+    estimated_runtime_minutes: Optional[int] = None
+    actual_runtime_minutes: Optional[int] = None
+    # Column does not exist in the database; kept for payload compatibility
+    efficiency_percentage: Optional[float] = None
+    notes: Optional[str] = None
+    machine: Optional[_MachineRef] = Field(None, exclude=True)
+
+    @computed_field
+    @property
+    def machine_code(self) -> Optional[str]:
+        return self.machine.machine_code if self.machine else None
+
+    @computed_field
+    @property
+    def machine_name(self) -> Optional[str]:
+        return self.machine.machine_name if self.machine else None
+
 @router.get("/production/schedules", tags=["Production"])
 async def get_production_schedules(
     machine_id: Optional[int] = None,
@@ -201,50 +343,34 @@ async def get_production_schedules(
 ):
     """Get production schedules with machine and date filtering"""
     try:
-        query = db.query(
-            ProductionSchedule,
-            Machine.machine_code,
-            Machine.machine_name
-        ).join(Machine)
-        
+        stmt = select(ProductionSchedule).options(
+            selectinload(ProductionSchedule.machine)
+        )
+
         if machine_id:
-            query = query.filter(ProductionSchedule.machine_id == machine_id)
+            stmt = stmt.where(ProductionSchedule.machine_id == machine_id)
         if status:
-            query = query.filter(ProductionSchedule.status == status)
+            stmt = stmt.where(ProductionSchedule.status == status)
         if date_from:
-            query = query.filter(ProductionSchedule.scheduled_start >= date_from)
+            stmt = stmt.where(ProductionSchedule.scheduled_start >= date_from)
         if date_to:
-            query = query.filter(ProductionSchedule.scheduled_start <= date_to)
-            
-        results = query.order_by(ProductionSchedule.scheduled_start).all()
-        
-        schedules = []
-        for schedule, machine_code, machine_name in results:
-            schedules.append({
-                "id": schedule.id,
-                "schedule_number": schedule.schedule_number,
-                "production_order_id": schedule.production_order_id,
-                "machine_code": machine_code,
-                "machine_name": machine_name,
-                "scheduled_start": schedule.scheduled_start,
-                "scheduled_end": schedule.scheduled_end,
-                "actual_start": schedule.actual_start,
-                "actual_end": schedule.actual_end,
-                "status": schedule.status,
-                "priority": schedule.priority,
-                "estimated_runtime_minutes": schedule.estimated_runtime_minutes,
-                "actual_runtime_minutes": schedule.actual_runtime_minutes,
-                "efficiency_percentage": float(schedule.efficiency_percentage) if schedule.efficiency_percentage else None,
-                "notes": schedule.notes
-            })
-        
+            stmt = stmt.where(ProductionSchedule.scheduled_start <= date_to)
+
+        results = db.execute(
+            stmt.order_by(ProductionSchedule.scheduled_start)
+        ).scalars().all()
+
+        # Per-row dict assembly happens inside pydantic-core instead of a
+        # Python loop building 15-field dict literals
+        schedules = [ScheduleOut.model_validate(schedule) for schedule in results]
+
         return {
             "success": True,
             "count": len(schedules),
             "data": schedules
         }
     except Exception as e:
-        logger.error(f"Error getting production schedules: {e}")
+        logger.error("Error getting production schedules: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/production/output", tags=["Production"])
@@ -256,25 +382,28 @@ async def get_production_output(
     shift: Optional[str] = None,
     limit: int = Query(100, le=1000),
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get production output records"""
     try:
-        query = db.query(OutputMc)
-        
+        # Window-function count: one scan instead of count() + page query
+        stmt = select(OutputMc, func.count().over().label('total_count'))
+
         if job_order:
-            query = query.filter(OutputMc.job_order.like(f"%{job_order}%"))
+            stmt = stmt.where(OutputMc.job_order.like(f"%{job_order}%"))
         if part_number:
-            query = query.filter(OutputMc.part_number.like(f"%{part_number}%"))
+            stmt = stmt.where(OutputMc.part_number.like(f"%{part_number}%"))
         if date_from:
-            query = query.filter(OutputMc.operation_date >= date_from)
+            stmt = stmt.where(OutputMc.operation_date >= date_from)
         if date_to:
-            query = query.filter(OutputMc.operation_date <= date_to)
+            stmt = stmt.where(OutputMc.operation_date <= date_to)
         if shift:
-            query = query.filter(OutputMc.shift == shift)
-            
-        total_count = query.count()
-        outputs = query.order_by(desc(OutputMc.operation_date)).offset(offset).limit(limit).all()
+            stmt = stmt.where(OutputMc.shift == shift)
+
+        stmt = stmt.order_by(desc(OutputMc.operation_date)).offset(offset).limit(limit)
+        rows = (await db.execute(stmt)).all()
+        total_count = rows[0].total_count if rows else 0
+        outputs = [row[0] for row in rows]
         
         return {
             "success": True,
@@ -285,7 +414,7 @@ async def get_production_output(
             "data": outputs
         }
     except Exception as e:
-        logger.error(f"Error getting production output: {e}")
+        logger.error("Error getting production output: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ===============================================
@@ -321,7 +450,7 @@ async def get_bom_by_part(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting BOM: {e}")
+        logger.error("Error getting BOM: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/bom/calculate-requirements", tags=["BOM"])
@@ -332,38 +461,44 @@ async def calculate_material_requirements(
 ):
     """Calculate material requirements for production quantity"""
     try:
-        # Get BOM items
-        bom_items = db.query(BillOfMaterials).filter(
+        # Get BOM items with availability in one round trip instead of
+        # one SELECT SUM per child part (N+1)
+        bom_items = db.query(
+            BillOfMaterials.child_part_number,
+            BillOfMaterials.quantity_required,
+            BillOfMaterials.scrap_factor,
+            BillOfMaterials.unit_of_measure,
+            BillOfMaterials.operation_sequence,
+            func.coalesce(func.sum(InventoryBalance.available_quantity), 0).label('available')
+        ).outerjoin(
+            InventoryBalance,
+            InventoryBalance.part_number == BillOfMaterials.child_part_number
+        ).filter(
             and_(
                 BillOfMaterials.parent_part_number == parent_part_number,
                 BillOfMaterials.is_active == True
             )
-        ).all()
-        
+        ).group_by(BillOfMaterials.id).all()
+
         if not bom_items:
             raise HTTPException(status_code=404, detail="BOM not found")
-        
+
         requirements = []
         total_shortage = 0
-        
+
         for item in bom_items:
             # Calculate required quantity with scrap factor
             required_qty = production_quantity * item.quantity_required * (1 + item.scrap_factor)
-            
-            # Get available inventory
-            available = db.query(func.sum(InventoryBalance.available_quantity)).filter(
-                InventoryBalance.part_number == item.child_part_number
-            ).scalar() or 0
-            
-            shortage = max(0, required_qty - float(available))
+
+            shortage = max(0, required_qty - float(item.available))
             total_shortage += shortage
-            
+
             requirements.append({
                 "child_part_number": item.child_part_number,
                 "quantity_required": item.quantity_required,
                 "scrap_factor": float(item.scrap_factor),
                 "total_required": required_qty,
-                "available_quantity": float(available),
+                "available_quantity": float(item.available),
                 "shortage": shortage,
                 "unit_of_measure": item.unit_of_measure,
                 "operation_sequence": item.operation_sequence
@@ -382,7 +517,7 @@ async def calculate_material_requirements(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error calculating material requirements: {e}")
+        logger.error("Error calculating material requirements: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ===============================================
@@ -391,85 +526,140 @@ async def calculate_material_requirements(
 
 @router.get("/machines", tags=["Machines"])
 async def get_machines(
+    request: Request,
+    response: Response,
     is_active: Optional[bool] = True,
     machine_type: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Get all machines with optional filtering"""
     try:
-        query = db.query(Machine)
-        
-        if is_active is not None:
-            query = query.filter(Machine.is_active == is_active)
-        if machine_type:
-            query = query.filter(Machine.machine_type == machine_type)
-            
-        machines = query.order_by(Machine.machine_code).all()
-        
-        return {
-            "success": True,
-            "count": len(machines),
-            "data": machines
-        }
+        cache_key = ("machines", is_active, machine_type)
+        cached = _reference_cache_lookup(cache_key)
+        if cached is None:
+            query = db.query(Machine)
+
+            if is_active is not None:
+                query = query.filter(Machine.is_active == is_active)
+            if machine_type:
+                query = query.filter(Machine.machine_type == machine_type)
+
+            machines = query.order_by(Machine.machine_code).all()
+            payload = {
+                "success": True,
+                "count": len(machines),
+                "data": [_row_as_dict(machine) for machine in machines]
+            }
+            etag = _reference_cache_store(cache_key, payload)
+        else:
+            payload, etag = cached
+
+        return _conditional_response(request, response, payload, etag)
     except Exception as e:
-        logger.error(f"Error getting machines: {e}")
+        logger.error("Error getting machines: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ===============================================
 # DASHBOARD & ANALYTICS
 # ===============================================
 
+# Statement objects untuk query panas dibangun sekali saat import -
+# menyusun pohon ekspresi select() tiap request itu kerja Python murni
+# yang berulang, dan objek yang sama membuat compiled-SQL cache
+# SQLAlchemy langsung hit.
+_DASHBOARD_STATS_STMT = select(
+    select(func.count()).select_from(ProductionOrder)
+        .scalar_subquery().label("total_orders"),
+    select(func.count()).select_from(ProductionOrder).where(
+        ProductionOrder.status.in_(['planning', 'running', 'in_production'])
+    ).scalar_subquery().label("active_orders"),
+    select(func.count()).select_from(Machine).where(
+        Machine.is_active == True
+    ).scalar_subquery().label("total_machines"),
+    select(func.count()).select_from(InventoryLocation).where(
+        InventoryLocation.is_active == True
+    ).scalar_subquery().label("total_locations"),
+    select(func.coalesce(func.sum(
+        InventoryBalance.available_quantity * InventoryBalance.average_cost
+    ), 0)).scalar_subquery().label("total_inventory_value"),
+    select(func.count()).select_from(InventoryBalance).join(
+        InventoryLocation
+    ).where(
+        and_(
+            InventoryLocation.location_type == 'wip',
+            InventoryBalance.available_quantity > 0
+        )
+    ).scalar_subquery().label("wip_items"),
+)
+
+_ACTIVE_SCHEDULES_STMT = select(func.count()).select_from(
+    ProductionSchedule
+).where(ProductionSchedule.status == 'started')
+
+_RECENT_MOVEMENTS_STMT = select(func.count()).select_from(
+    select(InventoryMovement.id).limit(10).subquery()
+)
+
+# Keberadaan tabel opsional (schedules, movements) tidak berubah selama
+# proses hidup - probe sekali lewat inspector pada request pertama, bukan
+# try/except (yang memaksa rollback transaksi) di setiap request
+_optional_tables: Dict[str, bool] = {}
+
+def _has_table(db: Session, table_name: str) -> bool:
+    flag = _optional_tables.get(table_name)
+    if flag is None:
+        try:
+            flag = sa_inspect(db.get_bind()).has_table(table_name)
+        except Exception as e:
+            logger.warning("Table probe failed for %s: %s", table_name, e)
+            flag = False
+        _optional_tables[table_name] = flag
+    return flag
+
 @router.get("/dashboard/summary", tags=["Dashboard"])
-async def get_dashboard_summary(db: Session = Depends(get_db)):
+async def get_dashboard_summary(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     """Get comprehensive dashboard summary"""
     try:
-        # Production statistics
-        total_orders = db.query(ProductionOrder).count()
-        active_orders = db.query(ProductionOrder).filter(
-            ProductionOrder.status.in_(['planning', 'running', 'in_production'])
-        ).count()
-        
-        # Machine statistics
-        total_machines = db.query(Machine).filter(Machine.is_active == True).count()
-        
-        # Try to get active schedules, but handle if table doesn't exist
-        try:
-            active_schedules = db.query(ProductionSchedule).filter(
-                ProductionSchedule.status == 'started'
-            ).count()
-        except Exception as e:
-            logger.warning(f"ProductionSchedule table not available: {e}")
-            active_schedules = 0
-        
-        # Inventory statistics
-        total_locations = db.query(InventoryLocation).filter(
-            InventoryLocation.is_active == True
-        ).count()
-        
-        total_inventory_value = db.query(
-            func.sum(InventoryBalance.available_quantity * InventoryBalance.average_cost)
-        ).scalar() or 0
-        
-        # Recent movements - handle if table doesn't exist
-        try:
-            recent_movements = db.query(InventoryMovement).order_by(
-                desc(InventoryMovement.movement_date)
-            ).limit(10).all()
-        except Exception as e:
-            logger.warning(f"InventoryMovement table not available: {e}")
-            recent_movements = []
-        
-        # WIP inventory
-        wip_items = db.query(InventoryBalance, InventoryLocation).join(
-            InventoryLocation
-        ).filter(
-            and_(
-                InventoryLocation.location_type == 'wip',
-                InventoryBalance.available_quantity > 0
-            )
-        ).count()
-        
-        return {
+        # The summary is identical for every user; serve it from the TTL
+        # cache for 30s so polling dashboards skip all the count queries
+        cache_key = ("dashboard_summary",)
+        cached = _reference_cache_lookup(cache_key, ttl=_DASHBOARD_CACHE_TTL)
+        if cached is not None:
+            payload, etag = cached
+            return _conditional_response(request, response, payload, etag,
+                                         ttl=_DASHBOARD_CACHE_TTL)
+
+        # All counters over the core tables are fused into one SELECT of
+        # scalar subqueries - a single round-trip instead of six. The two
+        # optional tables (schedules, movements) stay separate so a missing
+        # table degrades that number only, as before.
+        stats = db.execute(_DASHBOARD_STATS_STMT).first()
+        total_orders = stats.total_orders
+        active_orders = stats.active_orders
+        total_machines = stats.total_machines
+        total_locations = stats.total_locations
+        total_inventory_value = stats.total_inventory_value or 0
+        wip_items = stats.wip_items
+
+        # Active schedules hanya jika tabelnya ada (probe sekali, bukan
+        # try/except per request). Direct SELECT COUNT(*) - Query.count()
+        # wraps the query in a subquery before counting.
+        active_schedules = (
+            db.execute(_ACTIVE_SCHEDULES_STMT).scalar() or 0
+        ) if _has_table(db, ProductionSchedule.__tablename__) else 0
+
+        # Recent movements - only a count capped at 10 is reported, so
+        # count over a LIMIT 10 subquery rather than hydrating rows or
+        # scanning the whole table
+        recent_movements = (
+            db.execute(_RECENT_MOVEMENTS_STMT).scalar() or 0
+        ) if _has_table(db, InventoryMovement.__tablename__) else 0
+
+        payload = {
             "success": True,
             "summary": {
                 "production": {
@@ -488,16 +678,25 @@ async def get_dashboard_summary(db: Session = Depends(get_db)):
                     "wip_items": wip_items
                 }
             },
-            "recent_movements": len(recent_movements)
+            "recent_movements": recent_movements
         }
+        etag = _reference_cache_store(cache_key, payload)
+        return _conditional_response(request, response, payload, etag,
+                                     ttl=_DASHBOARD_CACHE_TTL)
     except Exception as e:
-        logger.error(f"Error getting dashboard summary: {e}")
+        logger.error("Error getting dashboard summary: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ===============================================
 # MASTER DATA QUERIES
 # ===============================================
 
+# Base statement dibangun sekali; filter dinamis tinggal di-where() per
+# request (append klausa jauh lebih murah daripada menyusun ulang
+# statement dari nol)
+_MASTER_PROD_BASE_STMT = select(MasterProd).order_by(MasterProd.part_number)
+_MASTER_PROD_COUNT_STMT = select(func.count()).select_from(MasterProd)
+
 @router.get("/master/products", tags=["Master Data"])
 async def get_master_products(
     part_number: Optional[str] = None,
@@ -505,30 +704,49 @@ async def get_master_products(
     is_active: Optional[bool] = True,
     limit: int = Query(100, le=1000),
     offset: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get master product data"""
+    """Get master product data
+
+    Pagination is keyset-based: pass the returned ``next_cursor`` (the
+    last part_number of the previous page) instead of growing ``offset``,
+    so deep pages stay a bounded index range scan. ``offset`` is kept for
+    older callers; ``total_count`` is only computed when asked for.
+    """
     try:
-        query = db.query(MasterProd)
-        
+        filters = []
         if part_number:
-            query = query.filter(MasterProd.part_number.like(f"%{part_number}%"))
+            filters.append(MasterProd.part_number.like(f"%{part_number}%"))
         if category:
-            query = query.filter(MasterProd.category == category)
+            filters.append(MasterProd.category == category)
         if is_active is not None:
-            query = query.filter(MasterProd.is_active == is_active)
-            
-        total_count = query.count()
-        products = query.order_by(MasterProd.part_number).offset(offset).limit(limit).all()
-        
+            filters.append(MasterProd.is_active == is_active)
+
+        # Direct SELECT COUNT(*) instead of Query.count()'s subquery wrap
+        total_count = db.execute(
+            _MASTER_PROD_COUNT_STMT.where(*filters)
+        ).scalar() if include_total else None
+
+        stmt = _MASTER_PROD_BASE_STMT.where(*filters)
+        if cursor:
+            stmt = stmt.where(MasterProd.part_number > cursor)
+        else:
+            stmt = stmt.offset(offset)
+        products = db.scalars(stmt.limit(limit)).all()
+
+        next_cursor = products[-1].part_number if len(products) == limit else None
+
         return {
             "success": True,
             "count": len(products),
             "total_count": total_count,
             "offset": offset,
             "limit": limit,
+            "next_cursor": next_cursor,
             "data": products
         }
     except Exception as e:
-        logger.error(f"Error getting master products: {e}")
+        logger.error("Error getting master products: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.orm import Session, selectinload
+from app.core.http_cache import conditional
 from app.database.session import get_db
 from app.core.security import get_current_user
 from app.models import User, StockTakeHistory, StockAdjustment
 from app.schemas import StockTakeHistorySchema, StockAdjustmentSchema
 
-router = APIRouter()
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    router = APIRouter(default_response_class=ORJSONResponse)
+except ImportError:
+    router = APIRouter()
 
-@router.get("/stock-takes", response_model=List[StockTakeHistorySchema])
-def get_stock_takes(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(StockTakeHistory).all()
+@router.get("/stock-takes")
+def get_stock_takes(request: Request, response: Response, db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = Query(100, le=1000)):
+    # Schema menyentuh relasi user; eager load supaya tidak N+1 saat serialisasi.
+    # Data historis jarang berubah; ETag -> 304 untuk klien yang polling.
+    # Limit wajib: .all() tanpa batas = full scan + transfer + validasi semua baris.
+    records = db.query(StockTakeHistory).options(
+        selectinload(StockTakeHistory.user)
+    ).order_by(StockTakeHistory.id.desc()).offset(skip).limit(limit).all()
+    payload = [StockTakeHistorySchema.model_validate(r).model_dump() for r in records]
+    return conditional(request, response, payload)
 
-@router.get("/adjustments", response_model=List[StockAdjustmentSchema])
-def get_stock_adjustments(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(StockAdjustment).all()
+@router.get("/adjustments")
+def get_stock_adjustments(db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = Query(100, le=1000)):
+    # Baris dari DB sudah trusted; serialisasi lewat schema sekali saja
+    # tanpa validasi ulang response_model
+    rows = db.query(StockAdjustment).order_by(StockAdjustment.id.desc()).offset(skip).limit(limit).all()
+    return [StockAdjustmentSchema.model_validate(r).model_dump() for r in rows]
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
+from app.core.http_cache import conditional
+
 # Sesuaikan path import jika perlu
 from app.database.session import get_db
 from app.core.security import get_current_user
@@ -9,10 +11,17 @@ from app.models.user import User
 from app.models.master_prod import MasterProd
 from app.schemas.master_prod import MasterProdSchema # <-- BARIS INI DITAMBAHKAN
 
-router = APIRouter()
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    router = APIRouter(default_response_class=ORJSONResponse)
+except ImportError:
+    router = APIRouter()
 
-@router.get("/", response_model=List[MasterProdSchema], summary="Dapatkan semua data master produk")
+@router.get("/", summary="Dapatkan semua data master produk")
 def get_all_master_products(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     skip: int = 0,
@@ -20,5 +29,10 @@ def get_all_master_products(
 ):
     """
     Mengambil daftar semua produk dari tabel master.
+    Validasi schema tetap jalan per baris, tapi hasilnya dikembalikan
+    sebagai dict supaya FastAPI tidak mengulang jsonable_encoder.
+    Response ber-ETag: klien yang polling dapat 304 kalau data belum berubah.
     """
-    return db.query(MasterProd).offset(skip).limit(limit).all()
+    products = db.query(MasterProd).offset(skip).limit(limit).all()
+    payload = [MasterProdSchema.model_validate(p).model_dump() for p in products]
+    return conditional(request, response, payload)
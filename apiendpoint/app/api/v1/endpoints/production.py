@@ -3,65 +3,206 @@ FastAPI Production Query Endpoints - CQRS Query Side
 Read-only operations for production data
 Handles: GET requests only (commands go to Node.js service)
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
-from app.database.session import get_db
+from decimal import Decimal
+from itertools import combinations
+import time
+from app.database.session import get_async_db, AsyncSessionLocal
 from app.models import ProductionOrder, OutputMc, StockWip
 from app.schemas import ProductionOrderSchema, OutputMcSchema, StockWipSchema
 
-router = APIRouter()
+def _json_default(value):
+    """Serialize the SQL row types orjson/json do not handle natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type {type(value)} not serializable")
+
+# Responses here are large row lists; orjson serializes them in C rather
+# than the stdlib json Python loop (fallback if not installed)
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    router = APIRouter(default_response_class=ORJSONResponse)
+
+    def _raw_json(payload):
+        """Serialize once and return the bytes directly - skips FastAPI's
+        per-item jsonable_encoder walk over the result list"""
+        return Response(orjson.dumps(payload, default=_json_default),
+                        media_type="application/json")
+
+    def _dump_bytes(obj) -> bytes:
+        return orjson.dumps(obj, default=_json_default)
+except ImportError:
+    import json
+
+    router = APIRouter()
+
+    def _raw_json(payload):
+        return Response(json.dumps(payload, default=_json_default),
+                        media_type="application/json")
+
+    def _dump_bytes(obj) -> bytes:
+        return json.dumps(obj, default=_json_default).encode()
+
+# 30-day analytics scans are polled by dashboards; cache the serialized
+# bytes in-process so a steady-state hit costs no DB work and no
+# re-serialization (Redis was proposed, but this deployment has none and
+# the dashboard cache below already uses the same in-process approach)
+_ANALYTICS_CACHE_TTL = 60  # seconds
+_analytics_cache = {}
+
+def _analytics_cached(key):
+    entry = _analytics_cache.get(key)
+    if entry and (time.monotonic() - entry[0]) < _ANALYTICS_CACHE_TTL:
+        return entry[1]
+    return None
+
+def _analytics_store(key, body: bytes) -> bytes:
+    _analytics_cache[key] = (time.monotonic(), body)
+    return body
+
+async def _stream_array(stmt, params):
+    """Stream a result set as a JSON array - constant memory: rows come
+    off a server-side cursor and are serialized one at a time.
+
+    The stream runs on the generator's own session: the request session
+    from Depends(get_async_db) is torn down before the StreamingResponse
+    body is consumed, which would return the connection to the pool while
+    the cursor is still being read from it."""
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt, params)
+        yield b'['
+        first = True
+        async for row in result.mappings():
+            chunk = _dump_bytes(dict(row))
+            yield chunk if first else b"," + chunk
+            first = False
+        yield b']'
 
 # ====================================================================
 # PRODUCTION ORDERS QUERIES
 # ====================================================================
 
-@router.get("/orders", response_model=List[Dict[str, Any]])
-def get_production_orders(
-    db: Session = Depends(get_db), 
-    skip: int = 0, 
-    limit: int = 100,
-    status: Optional[str] = None,
-    job_order: Optional[str] = None
-):
-    """Get production orders with optional filtering"""
-    query = """
-    SELECT 
+def _build_variants(base, filter_clauses, tail):
+    """Precompile one text() statement per combination of active filters.
+
+    The handlers used to rebuild the SQL string with += on every request,
+    re-parsing and re-compiling each time. Freezing every variant at import
+    lets SQLAlchemy's compiled-statement cache and the server plan cache
+    key on a stable statement.
+    """
+    names = list(filter_clauses)
+    variants = {}
+    for r in range(len(names) + 1):
+        for combo in combinations(names, r):
+            sql = base + "".join(filter_clauses[n] for n in combo) + tail
+            variants[frozenset(combo)] = text(sql)
+    return variants
+
+_ORDERS_BASE = """
+    SELECT
         po.id, po.job_order, po.part_number, po.plan_quantity,
         po.start_date, po.status, po.workflow_status, po.machine_name,
         po.created_at, po.updated_at,
         COALESCE(SUM(om.actual_quantity), 0) as total_produced,
         COALESCE(SUM(om.ng_quantity), 0) as total_ng,
-        CASE 
-            WHEN po.plan_quantity > 0 THEN 
+        CASE
+            WHEN po.plan_quantity > 0 THEN
                 ROUND((COALESCE(SUM(om.actual_quantity), 0) / po.plan_quantity) * 100, 2)
-            ELSE 0 
+            ELSE 0
         END as completion_percentage
     FROM production_orders po
     LEFT JOIN output_mc om ON po.job_order = om.job_order
     WHERE 1=1
+"""
+_ORDERS_FILTERS = {
+    "status": " AND po.status = :status",
+    # FULLTEXT (ft_prod_order_search) - LIKE '%term%' cannot use an index
+    # and scanned the table; boolean-mode prefix match can
+    "job_order": " AND MATCH(po.job_order, po.part_number) AGAINST (:job_order IN BOOLEAN MODE)",
+}
+_ORDERS_OFFSET_VARIANTS = _build_variants(
+    _ORDERS_BASE, _ORDERS_FILTERS,
+    " GROUP BY po.id ORDER BY po.created_at DESC, po.id DESC LIMIT :limit OFFSET :skip"
+)
+_ORDERS_CURSOR_VARIANTS = _build_variants(
+    _ORDERS_BASE,
+    dict(_ORDERS_FILTERS, cursor=" AND (po.created_at, po.id) < (:cursor_created, :cursor_id)"),
+    " GROUP BY po.id ORDER BY po.created_at DESC, po.id DESC LIMIT :limit"
+)
+
+@router.get("/orders")
+async def get_production_orders(
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    job_order: Optional[str] = None,
+    cursor: Optional[str] = None
+):
+    """Get production orders with optional filtering
+
+    Pass ``cursor`` (the ``next_cursor`` from the previous page) for
+    keyset pagination on (created_at, id) - bounded work per page where
+    OFFSET degrades linearly with depth. Cursor responses are wrapped in
+    {"data": [...], "next_cursor": ...}; the legacy skip/limit path keeps
+    returning a bare list.
     """
-    params = {}
-    
+    params = {"limit": limit}
     if status:
-        query += " AND po.status = :status"
         params["status"] = status
-    
     if job_order:
-        query += " AND po.job_order LIKE :job_order"
-        params["job_order"] = f"%{job_order}%"
-    
-    query += " GROUP BY po.id ORDER BY po.created_at DESC LIMIT :limit OFFSET :skip"
-    params["limit"] = limit
+        params["job_order"] = f"{job_order}*"
+    key = frozenset(n for n in ("status", "job_order") if n in params)
+
+    if cursor:
+        try:
+            cursor_created, cursor_id = cursor.rsplit(",", 1)
+            params["cursor_created"] = cursor_created
+            params["cursor_id"] = int(cursor_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = _ORDERS_CURSOR_VARIANTS[key | {"cursor"}]
+
+        async def gen_cursor():
+            # Rows stream from a server-side cursor on the generator's own
+            # session (see _stream_array); next_cursor is emitted after the
+            # data array once the last row is known
+            yield b'{"data":['
+            first = True
+            count = 0
+            last = None
+            async with AsyncSessionLocal() as session:
+                result = await session.stream(stmt, params)
+                async for row in result.mappings():
+                    last = dict(row)
+                    chunk = _dump_bytes(last)
+                    yield chunk if first else b"," + chunk
+                    first = False
+                    count += 1
+            if count == limit and last is not None:
+                yield b'],"next_cursor":' + _dump_bytes(
+                    f"{last['created_at']},{last['id']}"
+                ) + b'}'
+            else:
+                yield b'],"next_cursor":null}'
+
+        return StreamingResponse(gen_cursor(), media_type="application/json")
+
     params["skip"] = skip
-    
-    result = db.execute(text(query), params)
-    return [dict(row) for row in result]
+    return StreamingResponse(
+        _stream_array(_ORDERS_OFFSET_VARIANTS[key], params),
+        media_type="application/json"
+    )
 
 @router.get("/orders/{job_order}")
-def get_production_order_detail(job_order: str, db: Session = Depends(get_db)):
+async def get_production_order_detail(job_order: str, db: AsyncSession = Depends(get_async_db)):
     """Get detailed production order information"""
     query = """
     SELECT 
@@ -74,49 +215,44 @@ def get_production_order_detail(job_order: str, db: Session = Depends(get_db)):
     WHERE po.job_order = :job_order
     GROUP BY po.id
     """
-    result = db.execute(text(query), {"job_order": job_order}).first()
+    result = (await db.execute(text(query), {"job_order": job_order})).first()
     if not result:
         raise HTTPException(status_code=404, detail="Production order not found")
     return dict(result)
 
 @router.get("/orders/status/summary")
-def get_production_status_summary(db: Session = Depends(get_db)):
+async def get_production_status_summary(db: AsyncSession = Depends(get_async_db)):
     """Get production orders grouped by status"""
     query = """
-    SELECT 
-        status,
+    SELECT
+        po.status,
         COUNT(*) as count,
-        SUM(plan_quantity) as total_planned,
-        AVG(CASE 
-            WHEN plan_quantity > 0 THEN 
-                (SELECT COALESCE(SUM(actual_quantity), 0) FROM output_mc WHERE job_order = production_orders.job_order) / plan_quantity * 100
-            ELSE 0 
+        SUM(po.plan_quantity) as total_planned,
+        AVG(CASE
+            WHEN po.plan_quantity > 0 THEN
+                COALESCE(om.total_actual, 0) / po.plan_quantity * 100
+            ELSE 0
         END) as avg_completion
-    FROM production_orders 
-    WHERE created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-    GROUP BY status
+    FROM production_orders po
+    LEFT JOIN (
+        SELECT job_order, SUM(actual_quantity) as total_actual
+        FROM output_mc
+        GROUP BY job_order
+    ) om ON om.job_order = po.job_order
+    WHERE po.created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
+    GROUP BY po.status
     ORDER BY count DESC
     """
-    result = db.execute(text(query))
+    result = await db.execute(text(query))
     return [dict(row) for row in result]
 
 # ====================================================================
 # MACHINE OUTPUT QUERIES
 # ====================================================================
 
-@router.get("/outputs", response_model=List[Dict[str, Any]])
-def get_machine_outputs(
-    db: Session = Depends(get_db), 
-    skip: int = 0, 
-    limit: int = 100,
-    job_order: Optional[str] = None,
-    shift: Optional[str] = None,
-    date_from: Optional[date] = None,
-    date_to: Optional[date] = None
-):
-    """Get machine outputs with filtering"""
-    query = """
-    SELECT 
+_OUTPUTS_VARIANTS = _build_variants(
+    """
+    SELECT
         om.*,
         po.part_number,
         po.plan_quantity,
@@ -124,38 +260,54 @@ def get_machine_outputs(
     FROM output_mc om
     JOIN production_orders po ON om.job_order = po.job_order
     WHERE 1=1
-    """
-    params = {}
-    
+""",
+    {
+        "job_order": " AND om.job_order LIKE :job_order",
+        "shift": " AND om.shift = :shift",
+        "date_from": " AND om.operation_date >= :date_from",
+        "date_to": " AND om.operation_date <= :date_to",
+    },
+    " ORDER BY om.operation_date DESC, om.created_at DESC LIMIT :limit OFFSET :skip"
+)
+
+@router.get("/outputs")
+async def get_machine_outputs(
+    skip: int = 0,
+    limit: int = 100,
+    job_order: Optional[str] = None,
+    shift: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Get machine outputs with filtering"""
+    params = {"limit": limit, "skip": skip}
     if job_order:
-        query += " AND om.job_order LIKE :job_order"
         params["job_order"] = f"%{job_order}%"
-    
     if shift:
-        query += " AND om.shift = :shift"
         params["shift"] = shift
-    
     if date_from:
-        query += " AND om.operation_date >= :date_from"
         params["date_from"] = date_from
-        
     if date_to:
-        query += " AND om.operation_date <= :date_to"
         params["date_to"] = date_to
-    
-    query += " ORDER BY om.operation_date DESC, om.created_at DESC LIMIT :limit OFFSET :skip"
-    params["limit"] = limit
-    params["skip"] = skip
-    
-    result = db.execute(text(query), params)
-    return [dict(row) for row in result]
+    key = frozenset(
+        n for n in ("job_order", "shift", "date_from", "date_to") if n in params
+    )
+
+    return StreamingResponse(
+        _stream_array(_OUTPUTS_VARIANTS[key], params),
+        media_type="application/json"
+    )
 
 @router.get("/outputs/summary/daily")
-def get_daily_output_summary(
-    db: Session = Depends(get_db),
+async def get_daily_output_summary(
+    db: AsyncSession = Depends(get_async_db),
     days: int = Query(7, description="Number of days to include")
 ):
     """Get daily production output summary"""
+    cached = _analytics_cached(("daily_output", days))
+    if cached is not None:
+        return Response(cached, media_type="application/json")
+
     query = """
     SELECT 
         DATE(om.operation_date) as production_date,
@@ -175,99 +327,108 @@ def get_daily_output_summary(
     GROUP BY DATE(om.operation_date), om.shift
     ORDER BY production_date DESC, om.shift
     """
-    result = db.execute(text(query), {"days": days})
-    return [dict(row) for row in result]
+    result = await db.execute(text(query), {"days": days})
+    body = _analytics_store(
+        ("daily_output", days), _dump_bytes([dict(row) for row in result.mappings()])
+    )
+    return Response(body, media_type="application/json")
 
 # ====================================================================
 # WIP STOCK QUERIES
 # ====================================================================
 
-@router.get("/stock-wip")
-def get_wip_stock(
-    db: Session = Depends(get_db),
-    part_number: Optional[str] = None,
-    location: Optional[str] = None
-):
-    """Get WIP stock levels"""
-    query = """
-    SELECT 
+_WIP_VARIANTS = _build_variants(
+    """
+    SELECT
         sw.*,
         po.job_order,
         po.plan_quantity,
         po.status as order_status
     FROM stock_wip sw
-    LEFT JOIN production_orders po ON sw.part_number = po.part_number 
+    LEFT JOIN production_orders po ON sw.part_number = po.part_number
         AND po.status IN ('running', 'completed')
     WHERE sw.quantity > 0
-    """
+""",
+    {
+        "part_number": " AND sw.part_number LIKE :part_number",
+        "location": " AND sw.location LIKE :location",
+    },
+    " ORDER BY sw.part_number, sw.location"
+)
+
+@router.get("/stock-wip")
+async def get_wip_stock(
+    db: AsyncSession = Depends(get_async_db),
+    part_number: Optional[str] = None,
+    location: Optional[str] = None
+):
+    """Get WIP stock levels"""
     params = {}
-    
     if part_number:
-        query += " AND sw.part_number LIKE :part_number"
         params["part_number"] = f"%{part_number}%"
-    
     if location:
-        query += " AND sw.location LIKE :location"
         params["location"] = f"%{location}%"
-    
-    query += " ORDER BY sw.part_number, sw.location"
-    
-    result = db.execute(text(query), params)
-    return [dict(row) for row in result]
+    key = frozenset(params)
+
+    result = await db.execute(_WIP_VARIANTS[key], params)
+    return _raw_json([dict(row) for row in result.mappings()])
 
 # ====================================================================
 # DASHBOARD & ANALYTICS QUERIES
 # ====================================================================
 
+# Dashboard overview is identical for every user and polled frequently;
+# cache the composed payload in-process for a short window
+_DASHBOARD_CACHE_TTL = 30  # seconds
+_dashboard_cache = {"at": 0.0, "payload": None}
+
 @router.get("/dashboard/overview")
-def get_production_dashboard(db: Session = Depends(get_db)):
+async def get_production_dashboard(db: AsyncSession = Depends(get_async_db)):
     """Get production dashboard overview"""
-    # Active orders
-    active_orders = db.execute(text("""
-        SELECT COUNT(*) as count FROM production_orders 
-        WHERE status = 'running'
-    """)).scalar()
-    
-    # Today's production
-    today_production = db.execute(text("""
-        SELECT 
-            COALESCE(SUM(actual_quantity), 0) as produced,
-            COALESCE(SUM(ng_quantity), 0) as ng
-        FROM output_mc 
-        WHERE DATE(operation_date) = CURDATE()
-    """)).first()
-    
-    # Efficiency calculation
-    efficiency = db.execute(text("""
-        SELECT 
-            ROUND(
-                CASE 
+    if _dashboard_cache["payload"] is not None and \
+            (time.monotonic() - _dashboard_cache["at"]) < _DASHBOARD_CACHE_TTL:
+        return _dashboard_cache["payload"]
+
+    # One round-trip: every metric is a scalar subquery in a single SELECT
+    # instead of four sequential queries
+    overview = (await db.execute(text("""
+        SELECT
+            (SELECT COUNT(*) FROM production_orders
+             WHERE status = 'running') as active_orders,
+            (SELECT COALESCE(SUM(actual_quantity), 0) FROM output_mc
+             WHERE DATE(operation_date) = CURDATE()) as produced,
+            (SELECT COALESCE(SUM(ng_quantity), 0) FROM output_mc
+             WHERE DATE(operation_date) = CURDATE()) as ng,
+            (SELECT ROUND(
+                CASE
                     WHEN SUM(actual_quantity + ng_quantity) > 0 THEN
                         (SUM(actual_quantity) / SUM(actual_quantity + ng_quantity)) * 100
-                    ELSE 0 
-                END, 2
-            ) as efficiency
-        FROM output_mc 
-        WHERE operation_date >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-    """)).scalar()
-    
-    # WIP levels
-    wip_count = db.execute(text("""
-        SELECT COUNT(*) as count FROM stock_wip WHERE quantity > 0
-    """)).scalar()
-    
-    return {
-        "active_orders": active_orders or 0,
-        "today_produced": today_production.produced if today_production else 0,
-        "today_ng": today_production.ng if today_production else 0,
-        "week_efficiency": efficiency or 0,
-        "wip_items": wip_count or 0,
+                    ELSE 0
+                END, 2)
+             FROM output_mc
+             WHERE operation_date >= DATE_SUB(NOW(), INTERVAL 7 DAY)) as efficiency,
+            (SELECT COUNT(*) FROM stock_wip WHERE quantity > 0) as wip_count
+    """))).first()
+
+    payload = {
+        "active_orders": overview.active_orders or 0,
+        "today_produced": overview.produced or 0,
+        "today_ng": overview.ng or 0,
+        "week_efficiency": overview.efficiency or 0,
+        "wip_items": overview.wip_count or 0,
         "last_updated": datetime.now().isoformat()
     }
+    _dashboard_cache["at"] = time.monotonic()
+    _dashboard_cache["payload"] = payload
+    return payload
 
 @router.get("/machines/utilization")
-def get_machine_utilization(db: Session = Depends(get_db)):
+async def get_machine_utilization(db: AsyncSession = Depends(get_async_db)):
     """Get machine utilization data"""
+    cached = _analytics_cached(("machine_utilization",))
+    if cached is not None:
+        return Response(cached, media_type="application/json")
+
     query = """
     SELECT 
         machine_name,
@@ -281,17 +442,20 @@ def get_machine_utilization(db: Session = Depends(get_db)):
     GROUP BY machine_name
     ORDER BY orders_handled DESC
     """
-    result = db.execute(text(query))
-    return [dict(row) for row in result]
+    result = await db.execute(text(query))
+    body = _analytics_store(
+        ("machine_utilization",), _dump_bytes([dict(row) for row in result.mappings()])
+    )
+    return Response(body, media_type="application/json")
 
 # ====================================================================
 # SEARCH & FILTER ENDPOINTS
 # ====================================================================
 
 @router.get("/search")
-def search_production_data(
+async def search_production_data(
     q: str = Query(..., description="Search term"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     limit: int = 50
 ):
     """Search across production orders and outputs"""
@@ -303,29 +467,30 @@ def search_production_data(
         status,
         created_at,
         NULL as shift
-    FROM production_orders 
-    WHERE job_order LIKE :search_term 
-        OR part_number LIKE :search_term
+    FROM production_orders
+    WHERE MATCH(job_order, part_number) AGAINST (:search_term IN BOOLEAN MODE)
     )
     UNION ALL
-    (SELECT 
+    (SELECT
         'output' as type,
-        job_order as identifier,
-        (SELECT part_number FROM production_orders WHERE job_order = output_mc.job_order) as part_number,
+        om.job_order as identifier,
+        po.part_number,
         'output' as status,
-        created_at,
-        shift
-    FROM output_mc 
-    WHERE job_order LIKE :search_term
+        om.created_at,
+        om.shift
+    FROM output_mc om
+    LEFT JOIN production_orders po ON po.job_order = om.job_order
+    WHERE MATCH(om.job_order, om.part_number) AGAINST (:search_term IN BOOLEAN MODE)
     )
     ORDER BY created_at DESC
     LIMIT :limit
     """
     
-    search_pattern = f"%{q}%"
-    result = db.execute(text(query), {
+    # Boolean-mode prefix term for the FULLTEXT indexes
+    search_pattern = f"{q}*"
+    result = await db.execute(text(query), {
         "search_term": search_pattern,
         "limit": limit
     })
-    return [dict(row) for row in result]
+    return _raw_json([dict(row) for row in result.mappings()])
 
@@ -1,25 +1,38 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session, selectinload
 from app.database.session import get_db
 from app.core.security import get_current_user
 from app.models import User, OQC, TransferQc, StockWip, StockFg
 from app.schemas import OQCSchema, TransferQcSchema, StockWipSchema, StockFgSchema
 
-router = APIRouter()
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    router = APIRouter(default_response_class=ORJSONResponse)
+except ImportError:
+    router = APIRouter()
 
-@router.get("/oqc-records", response_model=List[OQCSchema])
+# Baris dari DB sudah trusted; serialisasi lewat schema sekali saja
+# tanpa validasi ulang response_model (Pydantic validation pass kedua)
+
+@router.get("/oqc-records")
 def get_oqc_records(db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = 100):
-    return db.query(OQC).offset(skip).limit(limit).all()
+    rows = db.query(OQC).offset(skip).limit(limit).all()
+    return [OQCSchema.model_validate(r).model_dump() for r in rows]
 
-@router.get("/transfers", response_model=List[TransferQcSchema])
+@router.get("/transfers")
 def get_qc_transfers(db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = 100):
-    return db.query(TransferQc).offset(skip).limit(limit).all()
+    # Schema menyentuh relasi user; eager load supaya tidak N+1 saat serialisasi
+    rows = db.query(TransferQc).options(selectinload(TransferQc.user)).offset(skip).limit(limit).all()
+    return [TransferQcSchema.model_validate(r).model_dump() for r in rows]
 
-@router.get("/stock-wip", response_model=List[StockWipSchema])
-def get_wip_stock(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(StockWip).all()
+@router.get("/stock-wip")
+def get_wip_stock(db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = Query(100, le=1000)):
+    # Limit wajib: .all() tanpa batas = full scan + transfer + validasi semua baris
+    rows = db.query(StockWip).order_by(StockWip.id.desc()).offset(skip).limit(limit).all()
+    return [StockWipSchema.model_validate(r).model_dump() for r in rows]
 
-@router.get("/stock-fg", response_model=List[StockFgSchema])
-def get_fg_stock(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(StockFg).all()
+@router.get("/stock-fg")
+def get_fg_stock(db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = Query(100, le=1000)):
+    rows = db.query(StockFg).order_by(StockFg.id.desc()).offset(skip).limit(limit).all()
+    return [StockFgSchema.model_validate(r).model_dump() for r in rows]
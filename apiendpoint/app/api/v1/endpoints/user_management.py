@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from app.core.http_cache import conditional
 from app.database.session import get_db
 from app.core.security import get_current_user
 from app.models import User, UserLog
 from app.schemas import UserSchema, UserLogSchema
 
-router = APIRouter()
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    router = APIRouter(default_response_class=ORJSONResponse)
+except ImportError:
+    router = APIRouter()
 
-@router.get("/users", response_model=List[UserSchema])
-def get_users(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(User).all()
+@router.get("/users")
+def get_users(request: Request, response: Response, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    # Daftar user jarang berubah tapi sering dipolling; ETag -> 304
+    payload = [UserSchema.model_validate(u).model_dump() for u in db.query(User).all()]
+    return conditional(request, response, payload)
 
-@router.get("/logs", response_model=List[UserLogSchema])
-def get_user_logs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(UserLog).all()
+@router.get("/logs")
+def get_user_logs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = Query(100, le=1000)):
+    # Tabel log tumbuh terus; tanpa limit endpoint ini full scan.
+    # Baris dari DB sudah trusted; serialisasi sekali tanpa validasi response_model.
+    rows = db.query(UserLog).order_by(UserLog.id.desc()).offset(skip).limit(limit).all()
+    return [UserLogSchema.model_validate(r).model_dump() for r in rows]
@@ -1,21 +1,34 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.orm import Session, selectinload
+from app.core.http_cache import conditional
 from app.database.session import get_db
 from app.core.security import get_current_user
 from app.models import User, Delivery, ReturnCustomer, StockFg
 from app.schemas import DeliverySchema, ReturnCustomerSchema, StockFgSchema
 
-router = APIRouter()
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    router = APIRouter(default_response_class=ORJSONResponse)
+except ImportError:
+    router = APIRouter()
 
-@router.get("/deliveries", response_model=List[DeliverySchema])
+@router.get("/deliveries")
 def get_deliveries(db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = 100):
-    return db.query(Delivery).offset(skip).limit(limit).all()
+    # Schema menyentuh relasi user; eager load supaya tidak N+1 saat serialisasi.
+    # Baris dari DB sudah trusted; serialisasi sekali tanpa validasi response_model.
+    rows = db.query(Delivery).options(selectinload(Delivery.user)).offset(skip).limit(limit).all()
+    return [DeliverySchema.model_validate(r).model_dump() for r in rows]
 
-@router.get("/returns", response_model=List[ReturnCustomerSchema])
+@router.get("/returns")
 def get_returns(db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = 100):
-    return db.query(ReturnCustomer).offset(skip).limit(limit).all()
+    rows = db.query(ReturnCustomer).offset(skip).limit(limit).all()
+    return [ReturnCustomerSchema.model_validate(r).model_dump() for r in rows]
 
-@router.get("/stock-fg", response_model=List[StockFgSchema])
-def get_fg_stock(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(StockFg).all()
+@router.get("/stock-fg")
+def get_fg_stock(request: Request, response: Response, db: Session = Depends(get_db), current_user: User = Depends(get_current_user), skip: int = 0, limit: int = Query(100, le=1000)):
+    # Snapshot stok FG dipolling; ETag -> 304 kalau belum berubah.
+    # Limit wajib supaya tidak full scan saat tabel membesar.
+    rows = db.query(StockFg).order_by(StockFg.id.desc()).offset(skip).limit(limit).all()
+    payload = [StockFgSchema.model_validate(s).model_dump() for s in rows]
+    return conditional(request, response, payload)
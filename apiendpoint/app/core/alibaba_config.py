@@ -5,88 +5,99 @@ Handles RDS MySQL, OSS, and other Alibaba Cloud services
 
 import os
 from typing import Optional
-from functools import lru_cache
-from dotenv import load_dotenv
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load .env.alibaba file
-load_dotenv(os.path.join(os.path.dirname(__file__), '../../.env.alibaba'))
+# .env.alibaba dibaca sekali oleh pydantic-settings saat instansiasi
+_ENV_FILE = os.path.join(os.path.dirname(__file__), '../../.env.alibaba')
 
 
-class AlibabaCloudConfig:
-    """Alibaba Cloud Configuration"""
-    
+class AlibabaCloudConfig(BaseSettings):
+    """Alibaba Cloud Configuration
+
+    BaseSettings (pydantic-core) membaca .env + environment dan
+    meng-coerce tipe dalam satu pass di Rust - menggantikan ~30 panggilan
+    os.getenv + int()/lower() terpisah di class body.
+    """
+
+    model_config = SettingsConfigDict(
+        env_file=_ENV_FILE,
+        case_sensitive=False,
+        extra="ignore",
+    )
+
     # ==================================================
     # ALIBABA CLOUD CREDENTIALS
     # ==================================================
-    access_key_id: str = os.getenv("ALIBABA_ACCESS_KEY_ID", "")
-    access_key_secret: str = os.getenv("ALIBABA_ACCESS_KEY_SECRET", "")
-    region: str = os.getenv("ALIBABA_REGION", "ap-southeast-1")
-    
+    access_key_id: str = Field("", validation_alias="ALIBABA_ACCESS_KEY_ID")
+    access_key_secret: str = Field("", validation_alias="ALIBABA_ACCESS_KEY_SECRET")
+    region: str = Field("ap-southeast-1", validation_alias="ALIBABA_REGION")
+
     # ==================================================
     # APSARADB RDS MYSQL DATABASE
     # ==================================================
-    db_host: str = os.getenv("DB_HOST", "localhost")
-    db_port: int = int(os.getenv("DB_PORT", 3306))
-    db_user: str = os.getenv("DB_USER", "root")
-    db_password: str = os.getenv("DB_PASSWORD", "")
-    db_name: str = os.getenv("DB_NAME", "wms_manufacture")
-    
+    db_host: str = "localhost"
+    db_port: int = 3306
+    db_user: str = "root"
+    db_password: str = ""
+    db_name: str = "wms_manufacture"
+
     # Connection pool settings
-    db_connection_limit: int = int(os.getenv("DB_CONNECTION_LIMIT", 10))
-    db_ssl_enabled: bool = os.getenv("DB_SSL_ENABLED", "false").lower() == "true"
-    db_ssl_ca_path: Optional[str] = os.getenv("DB_SSL_CA_PATH")
-    
+    db_connection_limit: int = 10
+    db_ssl_enabled: bool = False
+    db_ssl_ca_path: Optional[str] = None
+
     # ==================================================
     # ALIBABA OSS (OBJECT STORAGE SERVICE)
     # ==================================================
-    oss_endpoint: str = os.getenv("OSS_ENDPOINT", "")
-    oss_bucket: str = os.getenv("OSS_BUCKET_NAME", "")
-    oss_region: str = os.getenv("OSS_REGION", "ap-southeast-1")
-    
+    oss_endpoint: str = ""
+    oss_bucket: str = Field("", validation_alias="OSS_BUCKET_NAME")
+    oss_region: str = "ap-southeast-1"
+
     # ==================================================
     # ALIBABA MESSAGE QUEUE (Optional)
     # ==================================================
-    mq_endpoint: str = os.getenv("MQ_ENDPOINT", "")
-    mq_queue_name: str = os.getenv("MQ_QUEUE_NAME", "")
-    mq_topic_name: str = os.getenv("MQ_TOPIC_NAME", "")
-    mq_consumer_group: str = os.getenv("MQ_CONSUMER_GROUP", "")
-    mq_username: Optional[str] = os.getenv("MQ_USERNAME")
-    mq_password: Optional[str] = os.getenv("MQ_PASSWORD")
-    
+    mq_endpoint: str = ""
+    mq_queue_name: str = ""
+    mq_topic_name: str = ""
+    mq_consumer_group: str = ""
+    mq_username: Optional[str] = None
+    mq_password: Optional[str] = None
+
     # ==================================================
     # SERVICE CONFIGURATION
     # ==================================================
-    query_service_port: int = int(os.getenv("QUERY_SERVICE_PORT", 2025))
-    query_service_host: str = os.getenv("QUERY_SERVICE_HOST", "0.0.0.0")
-    
+    query_service_port: int = 2025
+    query_service_host: str = "0.0.0.0"
+
     # ==================================================
     # VPC & NETWORKING
     # ==================================================
-    vpc_id: str = os.getenv("VPC_ID", "")
-    security_group_id: str = os.getenv("SECURITY_GROUP_ID", "")
-    ecs_instance_id: str = os.getenv("ECS_INSTANCE_ID", "")
-    ecs_private_ip: str = os.getenv("ECS_PRIVATE_IP", "")
-    
+    vpc_id: str = ""
+    security_group_id: str = ""
+    ecs_instance_id: str = ""
+    ecs_private_ip: str = ""
+
     # ==================================================
     # BACKUP CONFIGURATION
     # ==================================================
-    backup_enabled: bool = os.getenv("BACKUP_ENABLED", "false").lower() == "true"
-    backup_frequency: str = os.getenv("BACKUP_FREQUENCY", "daily")
-    backup_time: str = os.getenv("BACKUP_TIME", "02:00")
-    backup_retention_days: int = int(os.getenv("BACKUP_RETENTION_DAYS", 30))
-    backup_location: str = os.getenv("BACKUP_LOCATION", "")
-    
+    backup_enabled: bool = False
+    backup_frequency: str = "daily"
+    backup_time: str = "02:00"
+    backup_retention_days: int = 30
+    backup_location: str = ""
+
     # ==================================================
     # SECURITY
     # ==================================================
-    jwt_secret: str = os.getenv("JWT_SECRET", "")
-    jwt_expiry: str = os.getenv("JWT_EXPIRY", "24h")
-    
+    jwt_secret: str = ""
+    jwt_expiry: str = "24h"
+
     # ==================================================
     # ENVIRONMENT
     # ==================================================
-    python_env: str = os.getenv("PYTHON_ENV", "development")
-    
+    python_env: str = "development"
+
     # ==================================================
     # SQLALCHEMY DATABASE URL
     # ==================================================
@@ -96,21 +107,21 @@ class AlibabaCloudConfig:
         if self.db_ssl_enabled and self.db_ssl_ca_path:
             return f"mysql+pymysql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}?ssl_ca={self.db_ssl_ca_path}&ssl_verify_cert=true"
         return f"mysql+pymysql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
-    
+
     # ==================================================
     # CHECK IF CONFIGURED
     # ==================================================
     def is_configured(self) -> bool:
         """Check if Alibaba Cloud is properly configured"""
         return (
-            self.access_key_id != "" and 
+            self.access_key_id != "" and
             self.access_key_id != "your_access_key_id_here" and
             self.access_key_secret != "" and
             self.access_key_secret != "your_access_key_secret_here" and
             self.db_host != "" and
             self.db_host != "rm-xxxxx.mysql.rds.aliyuncs.com"
         )
-    
+
     def get_info(self) -> dict:
         """Get configuration info for display"""
         return {
@@ -125,12 +136,11 @@ class AlibabaCloudConfig:
         }
 
 
-# Create singleton instance
-@lru_cache()
-def get_alibaba_config() -> AlibabaCloudConfig:
-    """Get Alibaba Cloud configuration (cached)"""
-    return AlibabaCloudConfig()
+# Singleton dibuat sekali saat import; get_alibaba_config() tinggal
+# return global tanpa overhead wrapper lru_cache per panggilan
+alibaba_config = AlibabaCloudConfig()
 
 
-# For backward compatibility
-alibaba_config = get_alibaba_config()
+def get_alibaba_config() -> AlibabaCloudConfig:
+    """Get the shared Alibaba Cloud configuration"""
+    return alibaba_config
@@ -0,0 +1,75 @@
+"""
+In-process TTL cache untuk hasil agregasi read-only
+
+Endpoint summary/dashboard menghitung agregasi identik untuk semua
+pemakai; payload-nya kecil tapi query-nya mahal. Cache per-proses
+dengan TTL pendek membuat polling hanya membayar agregasi sekali per
+jendela TTL - tanpa dependensi Redis, dan degradasinya aman: cache miss
+cuma berarti query jalan seperti biasa.
+"""
+import hashlib
+import time
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+
+    def _dumps(value: Any) -> bytes:
+        return orjson.dumps(value)
+except ImportError:
+    import json
+
+    def _dumps(value: Any) -> bytes:
+        return json.dumps(value, default=str, sort_keys=True).encode()
+
+_MAX_ENTRIES = 1024
+_store = {}
+
+
+def cache_lookup(key: tuple, ttl: float) -> Optional[Any]:
+    """Nilai ter-cache untuk key kalau masih dalam TTL, selain itu None"""
+    entry = _store.get(key)
+    if entry and (time.monotonic() - entry[0]) < ttl:
+        return entry[1]
+    return None
+
+
+def cache_store(key: tuple, value: Any) -> Any:
+    """Simpan value lalu kembalikan lagi (enak dipakai di return)"""
+    # Bound sederhana: buang isi cache kalau membengkak; entri lama toh
+    # kadaluarsa sendiri lewat TTL
+    if len(_store) >= _MAX_ENTRIES:
+        _store.clear()
+    _store[key] = (time.monotonic(), value)
+    return value
+
+
+def make_etag(payload: Any) -> str:
+    """ETag deterministik dari isi payload (blake2b 16 byte)"""
+    return hashlib.blake2b(_dumps(payload), digest_size=16).hexdigest()
+
+
+def conditional_response(request: Request, response: Response,
+                         payload: Any, etag: str, ttl: float) -> Any:
+    """Pasang header cache; balas 304 kalau ETag klien masih cocok
+
+    Payload summary berubah paling cepat sekali per jendela TTL, jadi
+    klien yang polling cukup revalidasi murah (If-None-Match) dan hanya
+    mengunduh body saat isinya benar-benar berubah.
+    """
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"max-age={int(ttl)}"
+    return payload
+
+
+def cache_invalidate(prefix: Optional[str] = None) -> None:
+    """Buang entri dengan key[0] == prefix (None = semua)"""
+    if prefix is None:
+        _store.clear()
+        return
+    for key in [k for k in _store if k and k[0] == prefix]:
+        del _store[key]
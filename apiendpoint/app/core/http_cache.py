@@ -0,0 +1,45 @@
+"""
+HTTP conditional-response helper for read endpoints
+Reference data (master products, users, stock snapshots) rarely changes
+but is polled; an ETag lets clients revalidate with If-None-Match and
+receive an empty 304 instead of the full payload.
+"""
+from fastapi import Request, Response
+from datetime import datetime, date
+from decimal import Decimal
+import hashlib
+import json
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type {type(value)} not serializable")
+
+
+try:
+    import orjson
+
+    def _canonical_bytes(payload) -> bytes:
+        return orjson.dumps(payload, default=_json_default, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    def _canonical_bytes(payload) -> bytes:
+        return json.dumps(payload, default=_json_default, sort_keys=True).encode()
+
+
+def etag_of(payload) -> str:
+    """Short content hash of a JSON-serializable payload"""
+    return hashlib.blake2b(_canonical_bytes(payload), digest_size=8).hexdigest()
+
+
+def conditional(request: Request, response: Response, payload, max_age: int = 60):
+    """Return 304 when the client's ETag still matches, else the payload
+    with ETag and Cache-Control headers attached"""
+    etag = etag_of(payload)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"max-age={max_age}"
+    return payload
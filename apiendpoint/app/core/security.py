@@ -3,30 +3,104 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from starlette import status
 from jose import JWTError, jwt
+import base64
+import hashlib
+import hmac
+import time
 from app.database.session import get_db
 from app.models.user import User
 from app.core.config import settings # Asumsi JWT_SECRET & ALGORITHM ada di config
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json as _json
+    _json_loads = _json.loads
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/command/auth/login")
 
+# Verifikasi HS256 manual: jose membangun ulang objek validator algoritma
+# tiap panggilan; di sini cukup satu HMAC-SHA256 atas key yang sudah
+# di-encode sekali + compare_digest. Algoritma lain tetap lewat jose.
+_SIGNING_KEY = settings.JWT_SECRET.encode()
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def _decode_hs256(token: str) -> dict:
+    """Verify and decode an HS256 JWT; raises ValueError when invalid"""
+    header_b64, payload_b64, signature_b64 = token.split(".")
+    expected = hmac.new(
+        _SIGNING_KEY, f"{header_b64}.{payload_b64}".encode(), hashlib.sha256
+    ).digest()
+    if not hmac.compare_digest(expected, _b64url_decode(signature_b64)):
+        raise ValueError("Invalid token signature")
+    if _json_loads(_b64url_decode(header_b64)).get("alg") != "HS256":
+        raise ValueError("Unexpected token algorithm")
+    payload = _json_loads(_b64url_decode(payload_b64))
+    exp = payload.get("exp")
+    if exp is not None and time.time() > float(exp):
+        raise ValueError("Token expired")
+    return payload
+
+# Auth dipanggil di tiap request; decode JWT + SELECT user per panggilan
+# bikin satu DB round-trip ekstra di path terpanas. Hasil resolve di-cache
+# per token (key = digest, bukan token mentah) untuk jendela pendek -
+# token yang sama dalam 60 detik cukup satu dict lookup.
+_AUTH_CACHE_TTL = 60  # seconds
+_AUTH_CACHE_MAX = 10_000
+_auth_cache = {}
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def authenticate_token(token: str, db: Session):
+    """Resolve token -> User lewat cache; None kalau token tidak valid.
+
+    Dipakai oleh get_current_user (dependency) maupun auth middleware,
+    supaya decode + SELECT + cache hanya ada di satu tempat.
+    """
+    key = _token_key(token)
+    entry = _auth_cache.get(key)
+    if entry and (time.monotonic() - entry[0]) < _AUTH_CACHE_TTL:
+        return entry[1]
+
+    try:
+        if settings.ALGORITHM == "HS256":
+            payload = _decode_hs256(token)
+        else:
+            payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM])
+    except (ValueError, JWTError):
+        return None
+    email = payload.get("email")
+    if email is None:
+        return None
+
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        return None
+
+    # Bound sederhana: buang isi cache kalau membengkak (token lama toh
+    # kadaluarsa sendiri lewat TTL)
+    if len(_auth_cache) >= _AUTH_CACHE_MAX:
+        _auth_cache.clear()
+    _auth_cache[key] = (time.monotonic(), user)
+    return user
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Tidak dapat memvalidasi kredensial",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("email")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    user = db.query(User).filter(User.email == email).first()
+    user = authenticate_token(token, db)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Tidak dapat memvalidasi kredensial",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
+
+def request_user(request):
+    """Dependency ringan untuk route di belakang auth middleware"""
+    return request.state.user
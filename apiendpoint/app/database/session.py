@@ -3,17 +3,46 @@ Database session management for ERP Query Service
 Production-ready with connection pooling and error handling
 """
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from typing import Generator
 import logging
+import time
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Kolom JSON di-decode sekali oleh driver; orjson parse di C, jauh lebih
+# cepat dari loop json stdlib (fallback kalau orjson belum terinstall)
+try:
+    import orjson
+    _json_deserializer = orjson.loads
+
+    def _json_serializer(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    import json as _json
+    _json_deserializer = _json.loads
+    _json_serializer = _json.dumps
+
+# Driver C (mysqlclient di atas libmysqlclient) mem-parse paket protokol
+# dan decoding baris di C, jauh lebih cepat dari driver pure-Python pada
+# result set besar. Dipakai otomatis kalau terinstall; kalau tidak, URL
+# dari konfigurasi dipakai apa adanya (pymysql tetap jalan).
+try:
+    import MySQLdb  # noqa: F401
+    _SYNC_DATABASE_URL = settings.DATABASE_URL.replace(
+        "mysql+pymysql://", "mysql+mysqldb://"
+    )
+except ImportError:
+    _SYNC_DATABASE_URL = settings.DATABASE_URL
+
 # Create database engine with production-ready configuration
 engine = create_engine(
-    settings.DATABASE_URL,
+    _SYNC_DATABASE_URL,
+    json_deserializer=_json_deserializer,
+    json_serializer=_json_serializer,
     # Connection Pool Configuration
     poolclass=QueuePool,
     pool_size=settings.DB_POOL_SIZE,
@@ -32,17 +61,18 @@ engine = create_engine(
     }
 )
 
-# Add connection event listeners for monitoring
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    """Set database connection parameters"""
-    if settings.DEBUG:
+# Listener monitoring hanya didaftarkan saat DEBUG: tanpa listener,
+# SQLAlchemy men-skip dispatch event connect/checkout sama sekali, jadi
+# path production tidak bayar function call per checkout
+if settings.DEBUG:
+    @event.listens_for(engine, "connect")
+    def connect_listener(dbapi_connection, connection_record):
+        """Log new database connections"""
         logger.info("New database connection established")
 
-@event.listens_for(engine, "checkout")
-def checkout_listener(dbapi_connection, connection_record, connection_proxy):
-    """Monitor connection checkout"""
-    if settings.DEBUG:
+    @event.listens_for(engine, "checkout")
+    def checkout_listener(dbapi_connection, connection_record, connection_proxy):
+        """Monitor connection checkout"""
         logger.debug("Connection checked out from pool")
 
 # Session factory
@@ -72,15 +102,77 @@ def get_db_session() -> Session:
     """Get database session for direct usage"""
     return SessionLocal()
 
-# Health check function
-def check_database_health() -> bool:
-    """Check if database is healthy"""
+def get_conn() -> Generator[Connection, None, None]:
+    """
+    Dependency untuk endpoint read-only murni: Connection langsung dari
+    pool tanpa Session (tanpa identity map, autoflush, atau konstruksi
+    instance ORM). stream_results membuat hasil besar mengalir lewat
+    server-side cursor alih-alih dimuat sekaligus.
+    """
+    with engine.connect().execution_options(stream_results=True) as conn:
+        yield conn
+
+# Async engine - lets read endpoints await DB I/O instead of blocking the
+# event loop while a query is in flight. Needs an async MySQL driver
+# (aiomysql); the sync engine above keeps working without it.
+try:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        settings.DATABASE_URL.replace("mysql+pymysql://", "mysql+aiomysql://"),
+        json_deserializer=_json_deserializer,
+        json_serializer=_json_serializer,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+except ImportError as e:
+    logger.warning(f"Async database driver not available, async endpoints disabled: {e}")
+    async_engine = None
+    AsyncSessionLocal = None
+
+async def get_async_db():
+    """
+    Dependency to get async database session
+    Mirrors get_db error handling for the non-blocking read path
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database driver (aiomysql) is not installed")
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Async database session error: {e}")
+            await db.rollback()
+            raise
+
+# Health check function - hasil OK di-cache sebentar supaya liveness
+# probe 1Hz tidak membebani DB dengan SELECT 1 per detik per replica;
+# koneksi basi tetap tertangkap oleh pool_pre_ping saat checkout
+_HEALTH_CHECK_TTL = 2.0  # seconds
+_last_health_ok = 0.0
+
+def check_database_health(ttl: float = _HEALTH_CHECK_TTL) -> bool:
+    """Check if database is healthy (cached for `ttl` seconds on success)"""
+    global _last_health_ok
+    now = time.monotonic()
+    if (now - _last_health_ok) < ttl:
+        return True
     try:
         from sqlalchemy import text
-        db = SessionLocal()
-        result = db.execute(text("SELECT 1")).scalar()
-        db.close()
-        return result == 1
+        with engine.connect() as conn:
+            ok = conn.execute(text("SELECT 1")).scalar() == 1
+        if ok:
+            _last_health_ok = now
+        return ok
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
         return False
@@ -1,23 +1,66 @@
-from sqlalchemy.orm import Session, joinedload
-from app.models import production_order, stock_wip, output_mc
+from sqlalchemy import text
 
-def get_dashboard_data(db: Session):
-    active_orders = db.query(production_order.ProductionOrder)\
-        .options(joinedload(production_order.ProductionOrder.master_prod))\
-        .filter(production_order.ProductionOrder.status.in_(['running', 'pending']))\
-        .order_by(production_order.ProductionOrder.created_at.desc())\
-        .limit(10).all()
+from app.database.session import AsyncSessionLocal
 
-    wip_stock = db.query(stock_wip.StockWip)\
-        .order_by(stock_wip.StockWip.last_updated.desc())\
-        .limit(20).all()
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json as _json
+    _json_loads = _json.loads
 
-    recent_outputs = db.query(output_mc.OutputMc)\
-        .order_by(output_mc.OutputMc.created_at.desc())\
-        .limit(10).all()
+# Ketiga potongan dashboard diambil dalam SATU round-trip: tiap blok
+# adalah derived table (dengan ORDER BY + LIMIT sendiri) yang diagregasi
+# jadi array JSON, lalu ketiganya jadi tiga kolom pada satu baris hasil.
+# Deskripsi produk ikut di-join di SQL, menggantikan eager load relasi.
+# JSON_ARRAYAGG tidak menjamin urutan, jadi tiap baris membawa sort key
+# dan diurutkan ulang di Python (murah: maksimal 10-20 elemen per array).
+_DASHBOARD_STMT = text("""
+    SELECT
+        (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+            'id', t.id, 'job_order', t.job_order,
+            'part_number', t.part_number, 'plan_quantity', t.plan_quantity,
+            'machine_name', t.machine_name, 'start_date', t.start_date,
+            'status', t.status, 'workflow_status', t.workflow_status,
+            'product_description', t.product_description,
+            'created_at', t.created_at, 'updated_at', t.updated_at))
+         FROM (SELECT po.*, mp.description AS product_description
+               FROM production_orders po
+               LEFT JOIN master_prod mp ON mp.part_number = po.part_number
+               WHERE po.status IN ('running', 'pending')
+               ORDER BY po.created_at DESC LIMIT 10) AS t) AS active_orders,
+        (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+            'id', t.id, 'part_number', t.part_number,
+            'description', t.description, 'quantity', t.quantity,
+            'current_station', t.current_station,
+            'last_updated', t.last_updated))
+         FROM (SELECT * FROM stock_wip
+               ORDER BY last_updated DESC LIMIT 20) AS t) AS wip_stock,
+        (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+            'id', t.id, 'production_order_id', t.production_order_id,
+            'machine_id', t.machine_id, 'part_number', t.part_number,
+            'quantity_good', t.quantity_good, 'quantity_ng', t.quantity_ng,
+            'operator_id', t.operator_id, 'shift', t.shift,
+            'production_date', t.production_date,
+            'created_at', t.created_at))
+         FROM (SELECT * FROM output_mc
+               ORDER BY created_at DESC LIMIT 10) AS t) AS recent_outputs
+""")
+
+def _decode_sorted(raw, sort_key: str) -> list:
+    if raw is None:
+        return []
+    rows = _json_loads(raw) if isinstance(raw, (str, bytes)) else raw
+    rows.sort(key=lambda r: (r.get(sort_key) is not None, r.get(sort_key)),
+              reverse=True)
+    return rows
+
+async def get_dashboard_data():
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(_DASHBOARD_STMT)).one()
 
     return {
-        "active_production_orders": active_orders,
-        "current_wip_stock": wip_stock,
-        "recent_machine_outputs": recent_outputs
+        "active_production_orders": _decode_sorted(row.active_orders, "created_at"),
+        "current_wip_stock": _decode_sorted(row.wip_stock, "last_updated"),
+        "recent_machine_outputs": _decode_sorted(row.recent_outputs, "created_at"),
     }
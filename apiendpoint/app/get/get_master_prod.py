@@ -1,5 +1,43 @@
-from sqlalchemy.orm import Session
+import time
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from app.database.session import AsyncSessionLocal
 from app.models.master_prod import MasterProd
 
-def get_all_master_prod(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(MasterProd).offset(skip).limit(limit).all()
+# Snapshot list lengkap (urut id, supaya slice skip/limit stabil) di-cache
+# 60 detik: satu-satunya input endpoint ini cuma skip/limit, jadi pada
+# cache hit tidak ada SQL maupun materialisasi baris sama sekali
+_MP_LIST_CACHE_TTL = 60  # seconds
+_mp_list_cache = {"at": 0.0, "rows": ()}
+
+def get_all_master_prod(conn: Connection, skip: int = 0, limit: int = 100):
+    if (time.monotonic() - _mp_list_cache["at"]) > _MP_LIST_CACHE_TTL:
+        stmt = select(*MasterProd.__table__.c).order_by(MasterProd.id)
+        _mp_list_cache["rows"] = tuple(conn.execute(stmt).mappings().all())
+        _mp_list_cache["at"] = time.monotonic()
+    return list(_mp_list_cache["rows"][skip:skip + limit])
+
+# master_prod adalah data referensi yang jarang berubah; seluruh tabel
+# dimuat sekali per proses (refresh tiap 5 menit) jadi konsumen tinggal
+# lookup dict per part_number tanpa query relasi per request
+_MASTER_PROD_CACHE_TTL = 300  # seconds
+_master_prod_cache = {"at": 0.0, "by_part": {}}
+
+def master_prod_by_part(db) -> dict:
+    """Map part_number -> MasterProd dari cache TTL (sync session/conn)"""
+    if (time.monotonic() - _master_prod_cache["at"]) > _MASTER_PROD_CACHE_TTL:
+        rows = db.execute(select(MasterProd)).scalars().all()
+        _master_prod_cache["by_part"] = {r.part_number: r for r in rows}
+        _master_prod_cache["at"] = time.monotonic()
+    return _master_prod_cache["by_part"]
+
+async def master_prod_by_part_async() -> dict:
+    """Versi async dari master_prod_by_part, berbagi cache yang sama"""
+    if (time.monotonic() - _master_prod_cache["at"]) > _MASTER_PROD_CACHE_TTL:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(MasterProd))
+            rows = result.scalars().all()
+        _master_prod_cache["by_part"] = {r.part_number: r for r in rows}
+        _master_prod_cache["at"] = time.monotonic()
+    return _master_prod_cache["by_part"]
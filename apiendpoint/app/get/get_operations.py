@@ -1,5 +1,14 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
 from app.models.output_mc import OutputMc
 
-def get_all_machine_outputs(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(OutputMc).order_by(OutputMc.created_at.desc()).offset(skip).limit(limit).all()
+def get_all_machine_outputs(conn: Connection, skip: int = 0, limit: int = 100):
+    # Core select di atas Connection polos (lihat get_conn): tanpa
+    # konstruksi instance ORM, baris keluar sebagai RowMapping dict
+    stmt = (
+        select(*OutputMc.__table__.c)
+        .order_by(OutputMc.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return conn.execute(stmt).mappings().all()
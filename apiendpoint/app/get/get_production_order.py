@@ -1,5 +1,14 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.production_order import ProductionOrder
+from app.get.get_master_prod import master_prod_by_part
 
 def get_all_production_orders(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(ProductionOrder).options(joinedload(ProductionOrder.master_prod)).order_by(ProductionOrder.created_at.desc()).offset(skip).limit(limit).all()
+    orders = db.query(ProductionOrder).order_by(ProductionOrder.created_at.desc()).offset(skip).limit(limit).all()
+    # Relasi product diisi dari cache referensi master_prod - query relasi
+    # kedua hilang sama sekali saat cache hangat. set_committed_value
+    # mengisi atribut relasi tanpa menandai instance dirty.
+    by_part = master_prod_by_part(db)
+    for order in orders:
+        set_committed_value(order, "product", by_part.get(order.part_number))
+    return orders
@@ -2,16 +2,19 @@
 QC Query Operations for FastAPI (CQRS)
 Handles all read operations for Quality Control
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import text, func, desc, asc
+from sqlalchemy import select, text, func, desc, asc, bindparam, tuple_, case, inspect as sa_inspect
+from sqlalchemy.engine import Connection
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
-import json
+from functools import lru_cache
 
-from app.database.session import get_db
-from app.core.security import get_current_user
-from app.models.user import User  # Fixed import
+from app.core.cache import cache_lookup, cache_store, make_etag, conditional_response
+import asyncio
+
+from app.database.session import get_db, get_conn, AsyncSessionLocal
+from app.get.pagination import decode_cursor, next_cursor_from
 from app.models.oqc import OQC
 from app.models.transfer_qc import TransferQc
 from app.models.master_prod import MasterProd
@@ -23,7 +26,34 @@ from app.models.qc_models import (  # New QC models
     QCCalibrationRecord
 )
 
-router = APIRouter(prefix="/qc", tags=["Quality Control - Query"])
+# orjson serializes the row dicts (datetime/Decimal included) in C
+# instead of the stdlib json Python loop; fallback if not installed
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    router = APIRouter(prefix="/qc", tags=["Quality Control - Query"],
+                       default_response_class=ORJSONResponse)
+except ImportError:
+    router = APIRouter(prefix="/qc", tags=["Quality Control - Query"])
+
+# Proyeksi detail dibekukan sekali di scope modul: statement + daftar
+# kolomnya sudah jadi saat import, endpoint tinggal bind id dan dict()
+# atas mapping hasil - tanpa literal dict 20+ key per pemanggilan
+_OQC_DETAIL_STMT = select(*OQC.__table__.c).where(
+    OQC.__table__.c.id == bindparam("oqc_id")
+)
+_PLAN_DETAIL_STMT = select(*QCInspectionPlan.__table__.c).where(
+    QCInspectionPlan.__table__.c.id == bindparam("plan_id")
+)
+
+def _rows_to_dicts(rows, strip_total):
+    # dict(RowMapping) jalan lewat konstruktor C; comprehension per-key
+    # per-baris diganti satu del kolom window _total setelahnya
+    data = [dict(row) for row in rows]
+    if strip_total:
+        for item in data:
+            del item["_total"]
+    return data
 
 # ====================================================================
 # OQC QUERY OPERATIONS
@@ -31,8 +61,7 @@ router = APIRouter(prefix="/qc", tags=["Quality Control - Query"])
 
 @router.get("/oqc")
 async def get_oqc_records(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Connection = Depends(get_conn),
     part_number: Optional[str] = Query(None, description="Filter by part number"),
     lot_number: Optional[str] = Query(None, description="Filter by lot number"),
     inspection_status: Optional[str] = Query(None, description="Filter by inspection status"),
@@ -43,107 +72,64 @@ async def get_oqc_records(
 ):
     """Get OQC inspection records with filtering"""
     try:
-        query = db.query(OQC)
-        
-        # Apply filters
+        # MATCH ... AGAINST pakai FULLTEXT index (ngram) - leading-%
+        # ilike mematikan index dan memaksa full scan
+        filters = []
         if part_number:
-            query = query.filter(OQC.part_number.ilike(f"%{part_number}%"))
+            filters.append(
+                text("MATCH(part_number) AGAINST (:oqc_pn IN BOOLEAN MODE)")
+                .bindparams(oqc_pn=f"{part_number}*")
+            )
         if lot_number:
-            query = query.filter(OQC.lot_number.ilike(f"%{lot_number}%"))
+            filters.append(
+                text("MATCH(lot_number) AGAINST (:oqc_lot IN BOOLEAN MODE)")
+                .bindparams(oqc_lot=f"{lot_number}*")
+            )
         if inspection_status:
-            query = query.filter(OQC.inspection_status == inspection_status)
+            filters.append(OQC.inspection_status == inspection_status)
         if start_date:
-            query = query.filter(OQC.created_at >= start_date)
+            filters.append(OQC.created_at >= start_date)
         if end_date:
-            query = query.filter(OQC.created_at <= end_date)
-        
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination and ordering
-        oqc_records = query.order_by(desc(OQC.created_at)).offset(offset).limit(limit).all()
-        
+            filters.append(OQC.created_at <= end_date)
+
+        # Core select + .mappings(): baris datang sebagai RowMapping (dict
+        # lookup langsung, tanpa instrumentasi ORM), dan dict literal 25
+        # key per baris hilang. Total tetap difusi via COUNT(*) OVER().
+        stmt = (
+            select(*OQC.__table__.c, func.count().over().label("_total"))
+            .where(*filters)
+            .order_by(desc(OQC.created_at))
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = db.execute(stmt).mappings().all()
+        total = rows[0]["_total"] if rows else 0
+
         return {
-            "data": [
-                {
-                    "id": record.id,
-                    "inspection_number": record.inspection_number,
-                    "part_number": record.part_number,
-                    "lot_number": record.lot_number,
-                    "production_order_id": record.production_order_id,
-                    "quantity_received": record.quantity_received,
-                    "quantity_inspected": record.quantity_inspected,
-                    "quantity_good": record.quantity_good,
-                    "quantity_ng": record.quantity_ng,
-                    "quantity_rework": record.quantity_rework,
-                    "inspection_type": record.inspection_type,
-                    "inspection_location": record.inspection_location,
-                    "inspector_id": record.inspector_id,
-                    "measurement_data": json.loads(record.measurement_data) if record.measurement_data else None,
-                    "defect_details": json.loads(record.defect_details) if record.defect_details else None,
-                    "inspector_notes": record.inspector_notes,
-                    "disposition": record.disposition,
-                    "inspection_status": record.inspection_status,
-                    "overall_result": record.overall_result,
-                    "approved_by": record.approved_by,
-                    "approved_at": record.approved_at,
-                    "approval_notes": record.approval_notes,
-                    "created_at": record.created_at,
-                    "updated_at": record.updated_at
-                } for record in oqc_records
-            ],
+            "data": _rows_to_dicts(rows, True),
             "total": total,
             "limit": limit,
             "offset": offset,
             "status": "success"
         }
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving OQC records: {str(e)}")
 
 @router.get("/oqc/{oqc_id}")
 async def get_oqc_record(
     oqc_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """Get specific OQC record by ID"""
     try:
-        oqc_record = db.query(OQC).filter(OQC.id == oqc_id).first()
-        
-        if not oqc_record:
+        row = db.execute(_OQC_DETAIL_STMT, {"oqc_id": oqc_id}).mappings().first()
+
+        if row is None:
             raise HTTPException(status_code=404, detail="OQC record not found")
-        
-        return {
-            "data": {
-                "id": oqc_record.id,
-                "inspection_number": oqc_record.inspection_number,
-                "part_number": oqc_record.part_number,
-                "lot_number": oqc_record.lot_number,
-                "production_order_id": oqc_record.production_order_id,
-                "quantity_received": oqc_record.quantity_received,
-                "quantity_inspected": oqc_record.quantity_inspected,
-                "quantity_good": oqc_record.quantity_good,
-                "quantity_ng": oqc_record.quantity_ng,
-                "quantity_rework": oqc_record.quantity_rework,
-                "inspection_type": oqc_record.inspection_type,
-                "inspection_location": oqc_record.inspection_location,
-                "inspector_id": oqc_record.inspector_id,
-                "measurement_data": json.loads(oqc_record.measurement_data) if oqc_record.measurement_data else None,
-                "defect_details": json.loads(oqc_record.defect_details) if oqc_record.defect_details else None,
-                "inspector_notes": oqc_record.inspector_notes,
-                "disposition": oqc_record.disposition,
-                "inspection_status": oqc_record.inspection_status,
-                "overall_result": oqc_record.overall_result,
-                "approved_by": oqc_record.approved_by,
-                "approved_at": oqc_record.approved_at,
-                "approval_notes": oqc_record.approval_notes,
-                "created_at": oqc_record.created_at,
-                "updated_at": oqc_record.updated_at
-            },
-            "status": "success"
-        }
-        
+
+        return {"data": dict(row), "status": "success"}
+
     except HTTPException:
         raise
     except Exception as e:
@@ -156,7 +142,6 @@ async def get_oqc_record(
 @router.get("/inspection-plans")
 async def get_inspection_plans(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
     part_number: Optional[str] = Query(None, description="Filter by part number"),
     inspection_type: Optional[str] = Query(None, description="Filter by inspection type"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
@@ -165,85 +150,51 @@ async def get_inspection_plans(
 ):
     """Get QC inspection plans with filtering"""
     try:
-        query = db.query(QCInspectionPlan)
-        
-        # Apply filters
+        filters = []
         if part_number:
-            query = query.filter(QCInspectionPlan.part_number.ilike(f"%{part_number}%"))
+            filters.append(QCInspectionPlan.part_number.ilike(f"%{part_number}%"))
         if inspection_type:
-            query = query.filter(QCInspectionPlan.inspection_type == inspection_type)
+            filters.append(QCInspectionPlan.inspection_type == inspection_type)
         if is_active is not None:
-            query = query.filter(QCInspectionPlan.is_active == is_active)
-        
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination and ordering
-        plans = query.order_by(desc(QCInspectionPlan.created_at)).offset(offset).limit(limit).all()
-        
+            filters.append(QCInspectionPlan.is_active == is_active)
+
+        # Core select + .mappings() seperti list OQC: tanpa instrumentasi
+        # ORM dan tanpa dict literal per baris; total via COUNT(*) OVER()
+        stmt = (
+            select(*QCInspectionPlan.__table__.c, func.count().over().label("_total"))
+            .where(*filters)
+            .order_by(desc(QCInspectionPlan.created_at))
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = db.execute(stmt).mappings().all()
+        total = rows[0]["_total"] if rows else 0
+
         return {
-            "data": [
-                {
-                    "id": plan.id,
-                    "plan_code": plan.plan_code,
-                    "part_number": plan.part_number,
-                    "plan_name": plan.plan_name,
-                    "inspection_type": plan.inspection_type,
-                    "sampling_method": plan.sampling_method,
-                    "sample_size": plan.sample_size,
-                    "acceptance_criteria": json.loads(plan.acceptance_criteria) if plan.acceptance_criteria else None,
-                    "inspection_points": json.loads(plan.inspection_points) if plan.inspection_points else None,
-                    "required_tools": json.loads(plan.required_tools) if plan.required_tools else None,
-                    "estimated_time_minutes": plan.estimated_time_minutes,
-                    "is_active": plan.is_active,
-                    "created_by": plan.created_by,
-                    "created_at": plan.created_at,
-                    "updated_at": plan.updated_at
-                } for plan in plans
-            ],
+            "data": _rows_to_dicts(rows, True),
             "total": total,
             "limit": limit,
             "offset": offset,
             "status": "success"
         }
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving inspection plans: {str(e)}")
 
 @router.get("/inspection-plans/{plan_id}")
 async def get_inspection_plan(
     plan_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """Get specific inspection plan by ID"""
     try:
-        plan = db.query(QCInspectionPlan).filter(QCInspectionPlan.id == plan_id).first()
-        
-        if not plan:
+        row = db.execute(_PLAN_DETAIL_STMT, {"plan_id": plan_id}).mappings().first()
+
+        if row is None:
             raise HTTPException(status_code=404, detail="Inspection plan not found")
-        
-        return {
-            "data": {
-                "id": plan.id,
-                "plan_code": plan.plan_code,
-                "part_number": plan.part_number,
-                "plan_name": plan.plan_name,
-                "inspection_type": plan.inspection_type,
-                "sampling_method": plan.sampling_method,
-                "sample_size": plan.sample_size,
-                "acceptance_criteria": json.loads(plan.acceptance_criteria) if plan.acceptance_criteria else None,
-                "inspection_points": json.loads(plan.inspection_points) if plan.inspection_points else None,
-                "required_tools": json.loads(plan.required_tools) if plan.required_tools else None,
-                "estimated_time_minutes": plan.estimated_time_minutes,
-                "is_active": plan.is_active,
-                "created_by": plan.created_by,
-                "created_at": plan.created_at,
-                "updated_at": plan.updated_at
-            },
-            "status": "success"
-        }
-        
+
+        return {"data": dict(row), "status": "success"}
+
     except HTTPException:
         raise
     except Exception as e:
@@ -256,7 +207,6 @@ async def get_inspection_plan(
 @router.get("/inspection-results")
 async def get_inspection_results(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
     part_number: Optional[str] = Query(None, description="Filter by part number"),
     lot_number: Optional[str] = Query(None, description="Filter by lot number"),
     overall_result: Optional[str] = Query(None, description="Filter by overall result"),
@@ -267,60 +217,45 @@ async def get_inspection_results(
 ):
     """Get QC inspection results with filtering"""
     try:
-        query = db.query(QCInspectionResult)
-        
-        # Apply filters
+        # MATCH ... AGAINST pakai FULLTEXT index ngram, bukan leading-%
+        # ilike yang full scan
+        filters = []
         if part_number:
-            query = query.filter(QCInspectionResult.part_number.ilike(f"%{part_number}%"))
+            filters.append(
+                text("MATCH(part_number) AGAINST (:res_pn IN BOOLEAN MODE)")
+                .bindparams(res_pn=f"{part_number}*")
+            )
         if lot_number:
-            query = query.filter(QCInspectionResult.lot_number.ilike(f"%{lot_number}%"))
+            filters.append(
+                text("MATCH(lot_number) AGAINST (:res_lot IN BOOLEAN MODE)")
+                .bindparams(res_lot=f"{lot_number}*")
+            )
         if overall_result:
-            query = query.filter(QCInspectionResult.overall_result == overall_result)
+            filters.append(QCInspectionResult.overall_result == overall_result)
         if start_date:
-            query = query.filter(QCInspectionResult.inspection_start_time >= start_date)
+            filters.append(QCInspectionResult.inspection_start_time >= start_date)
         if end_date:
-            query = query.filter(QCInspectionResult.inspection_start_time <= end_date)
-        
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination and ordering
-        results = query.order_by(desc(QCInspectionResult.inspection_start_time)).offset(offset).limit(limit).all()
-        
+            filters.append(QCInspectionResult.inspection_start_time <= end_date)
+
+        # Core select + .mappings() seperti list OQC; total via COUNT(*) OVER()
+        stmt = (
+            select(*QCInspectionResult.__table__.c, func.count().over().label("_total"))
+            .where(*filters)
+            .order_by(desc(QCInspectionResult.inspection_start_time))
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = db.execute(stmt).mappings().all()
+        total = rows[0]["_total"] if rows else 0
+
         return {
-            "data": [
-                {
-                    "id": result.id,
-                    "inspection_number": result.inspection_number,
-                    "qc_plan_id": result.qc_plan_id,
-                    "source_type": result.source_type,
-                    "source_reference_id": result.source_reference_id,
-                    "lot_number": result.lot_number,
-                    "part_number": result.part_number,
-                    "quantity_inspected": result.quantity_inspected,
-                    "quantity_passed": result.quantity_passed,
-                    "quantity_failed": result.quantity_failed,
-                    "quantity_rework": result.quantity_rework,
-                    "inspector_id": result.inspector_id,
-                    "inspection_start_time": result.inspection_start_time,
-                    "inspection_end_time": result.inspection_end_time,
-                    "inspection_location": result.inspection_location,
-                    "measurement_data": json.loads(result.measurement_data) if result.measurement_data else None,
-                    "defect_codes": json.loads(result.defect_codes) if result.defect_codes else None,
-                    "corrective_actions": result.corrective_actions,
-                    "inspector_notes": result.inspector_notes,
-                    "inspection_status": result.inspection_status,
-                    "overall_result": result.overall_result,
-                    "created_at": result.created_at,
-                    "updated_at": result.updated_at
-                } for result in results
-            ],
+            "data": _rows_to_dicts(rows, True),
             "total": total,
             "limit": limit,
             "offset": offset,
             "status": "success"
         }
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving inspection results: {str(e)}")
 
@@ -328,65 +263,99 @@ async def get_inspection_results(
 # NON-CONFORMANCE REPORT QUERY OPERATIONS
 # ====================================================================
 
+# Statement list dibangun sekali per kombinasi kehadiran filter lalu
+# di-memoize: nilai dikirim lewat bindparam saat execute, jadi bentuk
+# SQL ter-compile di-reuse lintas request (statement cache SQLAlchemy
+# key pada struktur statement, bukan nilai parameternya)
+@lru_cache(maxsize=64)
+def _ncr_list_stmt(has_type, has_status, has_priority, has_pn, has_cursor, include_total):
+    filters = []
+    if has_type:
+        filters.append(QCNonConformance.ncr_type == bindparam("ncr_type"))
+    if has_status:
+        filters.append(QCNonConformance.status == bindparam("ncr_status"))
+    if has_priority:
+        filters.append(QCNonConformance.priority == bindparam("ncr_priority"))
+    if has_pn:
+        # FULLTEXT ngram (ft_ncr_part) - leading-% ilike memaksa full scan
+        filters.append(text("MATCH(part_number) AGAINST (:ncr_pn IN BOOLEAN MODE)"))
+    if has_cursor:
+        filters.append(
+            tuple_(QCNonConformance.created_at, QCNonConformance.id)
+            < tuple_(bindparam("cur_ts"), bindparam("cur_id"))
+        )
+    cols = list(QCNonConformance.__table__.c)
+    if include_total:
+        cols.append(func.count().over().label("_total"))
+    stmt = (
+        select(*cols)
+        .where(*filters)
+        .order_by(desc(QCNonConformance.created_at), desc(QCNonConformance.id))
+        .limit(bindparam("lim"))
+    )
+    if not has_cursor:
+        stmt = stmt.offset(bindparam("off"))
+    return stmt
+
 @router.get("/non-conformance")
 async def get_non_conformance_reports(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
     ncr_type: Optional[str] = Query(None, description="Filter by NCR type"),
     status: Optional[str] = Query(None, description="Filter by status"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
     part_number: Optional[str] = Query(None, description="Filter by part number"),
     limit: int = Query(100, le=1000, description="Limit results"),
-    offset: int = Query(0, description="Offset for pagination")
+    offset: int = Query(0, description="Offset for pagination (deprecated, pakai cursor)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor dari next_cursor halaman sebelumnya"),
+    include_total: bool = Query(False, description="Hitung total (scan penuh, hanya untuk ekspor/admin)")
 ):
     """Get Non-Conformance Reports with filtering"""
     try:
-        query = db.query(QCNonConformance)
-        
-        # Apply filters
+        # COUNT di path panas dibuang: ambil limit+1 baris, kelebihan satu
+        # berarti masih ada halaman berikut. Total penuh (COUNT(*) OVER())
+        # hanya saat include_total diminta eksplisit.
+        params: Dict[str, Any] = {"lim": limit + 1}
         if ncr_type:
-            query = query.filter(QCNonConformance.ncr_type == ncr_type)
+            params["ncr_type"] = ncr_type
         if status:
-            query = query.filter(QCNonConformance.status == status)
+            params["ncr_status"] = status
         if priority:
-            query = query.filter(QCNonConformance.priority == priority)
+            params["ncr_priority"] = priority
         if part_number:
-            query = query.filter(QCNonConformance.part_number.ilike(f"%{part_number}%"))
-        
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination and ordering
-        ncrs = query.order_by(desc(QCNonConformance.created_at)).offset(offset).limit(limit).all()
-        
+            params["ncr_pn"] = f"{part_number}*"
+
+        # Keyset pagination: cursor (created_at, id) baris terakhir jadi
+        # batas bawah range seek - tanpa scan+buang O(offset). OFFSET tetap
+        # didukung untuk klien lama.
+        if cursor:
+            try:
+                params["cur_ts"], params["cur_id"] = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        else:
+            params["off"] = offset
+
+        stmt = _ncr_list_stmt(
+            bool(ncr_type), bool(status), bool(priority), bool(part_number),
+            bool(cursor), include_total,
+        )
+        rows = db.execute(stmt, params).mappings().all()
+        total = (rows[0]["_total"] if rows else 0) if include_total else None
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
         return {
-            "data": [
-                {
-                    "id": ncr.id,
-                    "ncr_number": ncr.ncr_number,
-                    "inspection_result_id": ncr.inspection_result_id,
-                    "ncr_type": ncr.ncr_type,
-                    "part_number": ncr.part_number,
-                    "lot_number": ncr.lot_number,
-                    "quantity_affected": ncr.quantity_affected,
-                    "problem_description": ncr.problem_description,
-                    "immediate_action": ncr.immediate_action,
-                    "priority": ncr.priority,
-                    "status": ncr.status,
-                    "reported_by": ncr.reported_by,
-                    "assigned_to": ncr.assigned_to,
-                    "target_close_date": ncr.target_close_date,
-                    "actual_close_date": ncr.actual_close_date,
-                    "created_at": ncr.created_at,
-                    "updated_at": ncr.updated_at
-                } for ncr in ncrs
-            ],
+            "data": _rows_to_dicts(rows, include_total),
             "total": total,
+            "has_more": has_more,
             "limit": limit,
             "offset": offset,
+            "next_cursor": next_cursor_from(rows, "created_at", limit) if has_more else None,
             "status": "success"
         }
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving NCR reports: {str(e)}")
 
@@ -394,10 +363,49 @@ async def get_non_conformance_reports(
 # QC DASHBOARD & ANALYTICS
 # ====================================================================
 
+# Rollup harian qc_daily_summary (lihat database/qc_daily_summary.sql)
+# diisi MySQL EVENT tiap 10 menit; dashboard cukup satu SELECT SUM atas
+# rentang hari alih-alih 9 COUNT(*) ke tabel sumber per request
+_QC_SUMMARY_TTL = 600  # seconds - selaras interval refresh EVENT
+_QC_DASHBOARD_CACHE_TTL = 60  # seconds - cache payload per rentang tanggal
+_qc_summary_table = {"ok": None}
+
+_QC_SUMMARY_ROLLUP_STMT = text("""
+    SELECT
+        COALESCE(SUM(oqc_total), 0) AS oqc_total,
+        COALESCE(SUM(oqc_pass), 0) AS oqc_pass,
+        COALESCE(SUM(oqc_fail), 0) AS oqc_fail,
+        COALESCE(SUM(insp_total), 0) AS insp_total,
+        COALESCE(SUM(insp_pass), 0) AS insp_pass,
+        COALESCE(SUM(insp_fail), 0) AS insp_fail,
+        COALESCE(SUM(ncr_total), 0) AS ncr_total,
+        COALESCE(SUM(ncr_open), 0) AS ncr_open,
+        COALESCE(SUM(ncr_closed), 0) AS ncr_closed,
+        MAX(CASE WHEN day = CURDATE() THEN refreshed_at END) AS today_refreshed_at
+    FROM qc_daily_summary
+    WHERE day BETWEEN :start_date AND :end_date
+""")
+
+async def _agg_one(stmt):
+    """Jalankan satu agregasi pada session async-nya sendiri - tiap
+    coroutine di gather memegang koneksi pool terpisah"""
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(stmt)).one()
+
+def _has_qc_summary_table(db: Session) -> bool:
+    """Probe sekali per proses apakah tabel rollup sudah di-deploy"""
+    if _qc_summary_table["ok"] is None:
+        try:
+            _qc_summary_table["ok"] = sa_inspect(db.get_bind()).has_table("qc_daily_summary")
+        except Exception:
+            _qc_summary_table["ok"] = False
+    return _qc_summary_table["ok"]
+
 @router.get("/dashboard/summary")
 async def get_qc_dashboard_summary(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
     start_date: Optional[date] = Query(None, description="Start date for summary"),
     end_date: Optional[date] = Query(None, description="End date for summary")
 ):
@@ -408,42 +416,90 @@ async def get_qc_dashboard_summary(
             from datetime import timedelta
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=30)
-        
-        # OQC Summary
-        oqc_query = db.query(OQC).filter(
-            OQC.created_at >= start_date,
-            OQC.created_at <= end_date
-        )
-        
-        total_oqc_inspections = oqc_query.count()
-        passed_oqc = oqc_query.filter(OQC.overall_result == 'pass').count()
-        failed_oqc = oqc_query.filter(OQC.overall_result == 'fail').count()
-        
-        # Inspection Results Summary
-        results_query = db.query(QCInspectionResult).filter(
-            QCInspectionResult.inspection_start_time >= start_date,
-            QCInspectionResult.inspection_start_time <= end_date
-        )
-        
-        total_inspections = results_query.count()
-        passed_inspections = results_query.filter(QCInspectionResult.overall_result == 'pass').count()
-        failed_inspections = results_query.filter(QCInspectionResult.overall_result == 'fail').count()
-        
-        # NCR Summary
-        ncr_query = db.query(QCNonConformance).filter(
-            QCNonConformance.created_at >= start_date,
-            QCNonConformance.created_at <= end_date
-        )
-        
-        total_ncrs = ncr_query.count()
-        open_ncrs = ncr_query.filter(QCNonConformance.status == 'open').count()
-        closed_ncrs = ncr_query.filter(QCNonConformance.status == 'closed').count()
-        
+
+        # Ringkasan identik untuk semua pemakai dashboard; TTL pendek
+        # membuat polling hanya membayar agregasi sekali per jendela
+        cache_key = ("qc_dashboard", start_date, end_date)
+        cached = cache_lookup(cache_key, _QC_DASHBOARD_CACHE_TTL)
+        if cached is not None:
+            payload, etag = cached
+            return conditional_response(request, response, payload, etag,
+                                        _QC_DASHBOARD_CACHE_TTL)
+
+        # Jalur cepat: baca rollup harian. Rentang yang mencakup hari ini
+        # hanya dipakai kalau baris hari ini masih segar (EVENT berjalan);
+        # kalau tidak, jatuh ke perhitungan live di bawah.
+        rollup = None
+        if _has_qc_summary_table(db):
+            rollup = db.execute(
+                _QC_SUMMARY_ROLLUP_STMT,
+                {"start_date": start_date, "end_date": end_date}
+            ).first()
+            if end_date >= datetime.now().date():
+                refreshed = rollup.today_refreshed_at
+                if refreshed is None or (datetime.now() - refreshed).total_seconds() > _QC_SUMMARY_TTL:
+                    rollup = None
+
+        if rollup is not None:
+            total_oqc_inspections = int(rollup.oqc_total)
+            passed_oqc = int(rollup.oqc_pass)
+            failed_oqc = int(rollup.oqc_fail)
+            total_inspections = int(rollup.insp_total)
+            passed_inspections = int(rollup.insp_pass)
+            failed_inspections = int(rollup.insp_fail)
+            total_ncrs = int(rollup.ncr_total)
+            open_ncrs = int(rollup.ncr_open)
+            closed_ncrs = int(rollup.ncr_closed)
+        else:
+            # Jalur live: satu pass per tabel dengan agregasi kondisional
+            # (COUNT + SUM(CASE)) alih-alih tiga COUNT(*) terpisah per
+            # model. Ketiganya independen, jadi dijalankan paralel lewat
+            # gather pada session async terpisah - wall time endpoint jadi
+            # max(q1,q2,q3), bukan jumlahnya (pola sama dengan dashboard
+            # produksi lama)
+            oqc_stmt = select(
+                func.count().label('total'),
+                func.sum(case((OQC.overall_result == 'pass', 1), else_=0)).label('passed'),
+                func.sum(case((OQC.overall_result == 'fail', 1), else_=0)).label('failed')
+            ).where(
+                OQC.created_at >= start_date,
+                OQC.created_at <= end_date
+            )
+            results_stmt = select(
+                func.count().label('total'),
+                func.sum(case((QCInspectionResult.overall_result == 'pass', 1), else_=0)).label('passed'),
+                func.sum(case((QCInspectionResult.overall_result == 'fail', 1), else_=0)).label('failed')
+            ).where(
+                QCInspectionResult.inspection_start_time >= start_date,
+                QCInspectionResult.inspection_start_time <= end_date
+            )
+            ncr_stmt = select(
+                func.count().label('total'),
+                func.sum(case((QCNonConformance.status == 'open', 1), else_=0)).label('open'),
+                func.sum(case((QCNonConformance.status == 'closed', 1), else_=0)).label('closed')
+            ).where(
+                QCNonConformance.created_at >= start_date,
+                QCNonConformance.created_at <= end_date
+            )
+            oqc_row, results_row, ncr_row = await asyncio.gather(
+                _agg_one(oqc_stmt), _agg_one(results_stmt), _agg_one(ncr_stmt)
+            )
+
+            total_oqc_inspections = oqc_row.total
+            passed_oqc = int(oqc_row.passed or 0)
+            failed_oqc = int(oqc_row.failed or 0)
+            total_inspections = results_row.total
+            passed_inspections = int(results_row.passed or 0)
+            failed_inspections = int(results_row.failed or 0)
+            total_ncrs = ncr_row.total
+            open_ncrs = int(ncr_row.open or 0)
+            closed_ncrs = int(ncr_row.closed or 0)
+
         # Calculate pass rates
         oqc_pass_rate = (passed_oqc / total_oqc_inspections * 100) if total_oqc_inspections > 0 else 0
         inspection_pass_rate = (passed_inspections / total_inspections * 100) if total_inspections > 0 else 0
         
-        return {
+        payload = {
             "data": {
                 "period": {
                     "start_date": start_date,
@@ -470,7 +526,11 @@ async def get_qc_dashboard_summary(
             },
             "status": "success"
         }
-        
+        etag = make_etag(payload)
+        cache_store(cache_key, (payload, etag))
+        return conditional_response(request, response, payload, etag,
+                                    _QC_DASHBOARD_CACHE_TTL)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving dashboard summary: {str(e)}")
 
@@ -478,58 +538,92 @@ async def get_qc_dashboard_summary(
 # LEGACY TRANSFER QC QUERY OPERATIONS (Keep for backward compatibility)
 # ====================================================================
 
+# Varian statement di-memoize per kombinasi filter; lihat _ncr_list_stmt
+@lru_cache(maxsize=64)
+def _tqc_list_stmt(has_machine, has_pn, has_start, has_end, has_cursor, include_total):
+    filters = []
+    if has_machine:
+        filters.append(TransferQc.machine_id == bindparam("tqc_machine"))
+    if has_pn:
+        # FULLTEXT ngram (ft_tqc_part) - leading-% ilike memaksa full scan
+        filters.append(text("MATCH(part_number) AGAINST (:tqc_pn IN BOOLEAN MODE)"))
+    if has_start:
+        filters.append(TransferQc.operation_date >= bindparam("tqc_start"))
+    if has_end:
+        filters.append(TransferQc.operation_date <= bindparam("tqc_end"))
+    if has_cursor:
+        filters.append(
+            tuple_(TransferQc.operation_date, TransferQc.id)
+            < tuple_(bindparam("cur_date"), bindparam("cur_id"))
+        )
+    cols = list(TransferQc.__table__.c)
+    if include_total:
+        cols.append(func.count().over().label("_total"))
+    stmt = (
+        select(*cols)
+        .where(*filters)
+        .order_by(desc(TransferQc.operation_date), desc(TransferQc.id))
+        .limit(bindparam("lim"))
+    )
+    if not has_cursor:
+        stmt = stmt.offset(bindparam("off"))
+    return stmt
+
 @router.get("/transfer-qc")
 async def get_transfer_qc_records(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
     machine_id: Optional[str] = Query(None, description="Filter by machine ID"),
     part_number: Optional[str] = Query(None, description="Filter by part number"),
     start_date: Optional[date] = Query(None, description="Filter by start date"),
     end_date: Optional[date] = Query(None, description="Filter by end date"),
     limit: int = Query(100, le=1000, description="Limit results"),
-    offset: int = Query(0, description="Offset for pagination")
+    offset: int = Query(0, description="Offset for pagination (deprecated, pakai cursor)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor dari next_cursor halaman sebelumnya"),
+    include_total: bool = Query(False, description="Hitung total (scan penuh, hanya untuk ekspor/admin)")
 ):
     """Get Transfer QC records with filtering"""
     try:
-        query = db.query(TransferQc)
-        
-        # Apply filters
+        # limit+1 sebagai indikator has_more; total hanya saat diminta
+        # (lihat /non-conformance)
+        params: Dict[str, Any] = {"lim": limit + 1}
         if machine_id:
-            query = query.filter(TransferQc.machine_id == machine_id)
+            params["tqc_machine"] = machine_id
         if part_number:
-            query = query.filter(TransferQc.part_number.ilike(f"%{part_number}%"))
+            params["tqc_pn"] = f"{part_number}*"
         if start_date:
-            query = query.filter(TransferQc.operation_date >= start_date)
+            params["tqc_start"] = start_date
         if end_date:
-            query = query.filter(TransferQc.operation_date <= end_date)
-        
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination and ordering
-        records = query.order_by(desc(TransferQc.operation_date)).offset(offset).limit(limit).all()
-        
+            params["tqc_end"] = end_date
+
+        # Keyset pagination di (operation_date, id); lihat /non-conformance
+        if cursor:
+            try:
+                params["cur_date"], params["cur_id"] = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        else:
+            params["off"] = offset
+
+        stmt = _tqc_list_stmt(
+            bool(machine_id), bool(part_number), bool(start_date), bool(end_date),
+            bool(cursor), include_total,
+        )
+        rows = db.execute(stmt, params).mappings().all()
+        total = (rows[0]["_total"] if rows else 0) if include_total else None
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
         return {
-            "data": [
-                {
-                    "id": record.id,
-                    "machine_id": record.machine_id,
-                    "part_number": record.part_number,
-                    "quantity_good": record.quantity_good,
-                    "quantity_ng": record.quantity_ng,
-                    "operator_id": record.operator_id,
-                    "operation_date": record.operation_date,
-                    "shift": record.shift,
-                    "notes": record.notes,
-                    "created_at": record.created_at,
-                    "updated_at": record.updated_at
-                } for record in records
-            ],
+            "data": _rows_to_dicts(rows, include_total),
             "total": total,
+            "has_more": has_more,
             "limit": limit,
             "offset": offset,
+            "next_cursor": next_cursor_from(rows, "operation_date", limit) if has_more else None,
             "status": "success"
         }
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving Transfer QC records: {str(e)}")
@@ -1,5 +1,10 @@
 from sqlalchemy.orm import Session
 from app.models.stock_fg import StockFg
 
-def get_all_stock_fg(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(StockFg).offset(skip).limit(limit).all()
+def get_all_stock_fg(db: Session, skip: int = 0, limit: int = 100, after_id: int = 0):
+    # after_id > 0 = keyset pagination (range seek di PK, tanpa scan+buang
+    # O(skip)); skip dipertahankan untuk pemanggil lama
+    query = db.query(StockFg)
+    if after_id:
+        return query.filter(StockFg.id > after_id).order_by(StockFg.id).limit(limit).all()
+    return query.order_by(StockFg.id).offset(skip).limit(limit).all()
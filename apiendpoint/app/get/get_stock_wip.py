@@ -1,5 +1,10 @@
 from sqlalchemy.orm import Session
 from app.models.stock_wip import StockWip
 
-def get_all_stock_wip(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(StockWip).offset(skip).limit(limit).all()
+def get_all_stock_wip(db: Session, skip: int = 0, limit: int = 100, after_id: int = 0):
+    # after_id > 0 = keyset pagination (range seek di PK, tanpa scan+buang
+    # O(skip)); skip dipertahankan untuk pemanggil lama
+    query = db.query(StockWip)
+    if after_id:
+        return query.filter(StockWip.id > after_id).order_by(StockWip.id).limit(limit).all()
+    return query.order_by(StockWip.id).offset(skip).limit(limit).all()
@@ -2,15 +2,22 @@
 Warehouse Query Service - FastAPI Endpoints
 CQRS Query operations for Warehouse Management
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc, text
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, raiseload, aliased
+from sqlalchemy import select, func, desc, asc, text, tuple_, union, case, cast, Float, or_, and_
 from typing import List, Optional, Dict, Any
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
 
-from app.database.session import get_db
+from app.database.session import get_async_db, AsyncSessionLocal
+from app.core.cache import cache_lookup, cache_store, make_etag, conditional_response
 from app.core.security import get_current_user
+from app.get.pagination import decode_cursor, encode_cursor
 from app.models.warehouse import (
     InventoryBalance, InventoryMovement, InventoryLocation,
     StockReservation, CycleCount, CycleCountDetail
@@ -22,13 +29,108 @@ from app.schemas.warehouse import (
     ABCAnalysis, StockAlert, MovementSummary
 )
 
-router = APIRouter()
+# orjson serializes response payloads (datetime/Decimal included) in C
+# instead of the stdlib json Python loop; fallback if not installed
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    router = APIRouter(default_response_class=ORJSONResponse)
+    _json_loads = orjson.loads
+except ImportError:
+    router = APIRouter()
+    _json_loads = json.loads
+
+# Endpoint summary menghitung agregasi identik untuk tiap pengunjung
+# dashboard; hasilnya di-cache per kombinasi filter dengan TTL pendek
+# (lihat app/core/cache.py). Redis sengaja tidak dipakai - service ini
+# single-purpose dan cache per-proses sudah menghapus scan berulang.
+_SUMMARY_CACHE_TTL = 60  # seconds
+# Agregasi lookup (per zona / reservasi / variance) dipoll dashboard
+# dengan interval pendek; TTL lebih ketat supaya staleness maksimal 30s
+_LOOKUP_CACHE_TTL = 30  # seconds
+# Analytics (ABC, slow-moving, dashboard) menyisir tabel besar dan
+# hasilnya tidak perlu real-time; TTL lebih longgar dari summary
+_ANALYTICS_CACHE_TTL = 120  # seconds
+
+# Tabel dispatch filter per endpoint (param -> pembuat kondisi), dibangun
+# sekali saat import. Handler tinggal meng-iterate param yang diberikan
+# dan memanggil .where(*conds) sekali - bukan rantai if yang membuat
+# objek statement baru per filter.
+def _pn_match(bind_name: str):
+    """Pembuat kondisi FULLTEXT part_number dengan nama bind unik"""
+    def build(value):
+        return (
+            text(f"MATCH(part_number) AGAINST (:{bind_name} IN BOOLEAN MODE)")
+            .bindparams(**{bind_name: f"{value}*"})
+        )
+    return build
+
+_BALANCE_FILTERS = {
+    "part_number": _pn_match("bal_pn"),
+    "location_id": lambda v: InventoryBalance.location_id == v,
+    "location_code": lambda v: InventoryLocation.location_code.ilike(f"%{v}%"),
+    "warehouse_zone": lambda v: InventoryLocation.warehouse_zone == v,
+    "zero_stock": lambda v: InventoryBalance.available_quantity == 0,
+    "negative_stock": lambda v: InventoryBalance.available_quantity < 0,
+}
+# Range filter aktif saat is not None (nilai 0 valid)
+_BALANCE_RANGE_FILTERS = {
+    "min_quantity": lambda v: InventoryBalance.available_quantity >= v,
+    "max_quantity": lambda v: InventoryBalance.available_quantity <= v,
+}
+
+_MOVEMENT_FILTERS = {
+    "part_number": _pn_match("mv_pn"),
+    "movement_type": lambda v: InventoryMovement.movement_type == v,
+    "reference_type": lambda v: InventoryMovement.reference_type == v,
+    "reference_id": lambda v: InventoryMovement.reference_id == v,
+    "user_id": lambda v: InventoryMovement.user_id == v,
+    "start_date": lambda v: InventoryMovement.movement_date >= v,
+    "end_date": lambda v: InventoryMovement.movement_date <= v,
+}
+
+# Allowlist sort /inventory/movements: lookup dict menggantikan validasi
+# regex per request, dan memagari getattr supaya hanya kolom ini yang
+# bisa dipakai (bukan relasi/method kalau daftarnya nanti melebar)
+_MOVEMENT_SORT_COLS = {
+    "created_at": InventoryMovement.created_at,
+    "movement_date": InventoryMovement.movement_date,
+    "part_number": InventoryMovement.part_number,
+    "movement_type": InventoryMovement.movement_type,
+}
+_ORDER = {"asc": asc, "desc": desc}
+
+_RESERVATION_FILTERS = {
+    "part_number": _pn_match("res_pn"),
+    "location_id": lambda v: StockReservation.location_id == v,
+    "reservation_type": lambda v: StockReservation.reservation_type == v,
+    "status": lambda v: StockReservation.status == v,
+    "reserved_by": lambda v: StockReservation.reserved_by == v,
+    "reference_id": lambda v: StockReservation.reference_id == v,
+}
+
+_CYCLE_COUNT_FILTERS = {
+    "location_id": lambda v: CycleCount.location_id == v,
+    "count_type": lambda v: CycleCount.count_type == v,
+    "status": lambda v: CycleCount.status == v,
+    "assigned_to": lambda v: CycleCount.assigned_to == v,
+    "created_by": lambda v: CycleCount.created_by == v,
+    "start_date": lambda v: CycleCount.count_date >= v,
+    "end_date": lambda v: CycleCount.count_date <= v,
+}
+
+async def _count(db: AsyncSession, stmt) -> int:
+    """SELECT COUNT(*) atas statement berfilter (tanpa order/limit)"""
+    result = await db.execute(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    )
+    return result.scalar() or 0
 
 # ====================================================================
 # INVENTORY BALANCE QUERIES
 # ====================================================================
 
-@router.get("/inventory/balances", response_model=List[InventoryBalanceResponse])
+@router.get("/inventory/balances")
 async def get_inventory_balances(
     part_number: Optional[str] = None,
     location_id: Optional[int] = None,
@@ -40,124 +142,197 @@ async def get_inventory_balances(
     negative_stock: Optional[bool] = None,
     limit: int = Query(100, le=1000),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor dari next_cursor halaman sebelumnya"),
+    include_total: bool = Query(False, description="Hitung total (scan penuh, hanya untuk ekspor/admin)"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get inventory balances with filters
     """
-    query = db.query(InventoryBalance).join(InventoryLocation)
-    
-    # Apply filters
-    if part_number:
-        query = query.filter(InventoryBalance.part_number.ilike(f"%{part_number}%"))
-    
-    if location_id:
-        query = query.filter(InventoryBalance.location_id == location_id)
-    
-    if location_code:
-        query = query.filter(InventoryLocation.location_code.ilike(f"%{location_code}%"))
-    
-    if warehouse_zone:
-        query = query.filter(InventoryLocation.warehouse_zone == warehouse_zone)
-    
-    if min_quantity is not None:
-        query = query.filter(InventoryBalance.available_quantity >= min_quantity)
-    
-    if max_quantity is not None:
-        query = query.filter(InventoryBalance.available_quantity <= max_quantity)
-    
-    if zero_stock:
-        query = query.filter(InventoryBalance.available_quantity == 0)
-    
-    if negative_stock:
-        query = query.filter(InventoryBalance.available_quantity < 0)
-    
-    # Get total count before pagination
-    total = query.count()
-    
+    conds = []
+
+    # Keyset pagination di primary key: range seek id > cursor, tanpa
+    # scan+buang O(offset). OFFSET tetap didukung untuk klien lama.
+    if cursor:
+        try:
+            _, cur_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        conds.append(InventoryBalance.id > cur_id)
+
+    # Apply filters via dispatch table (lihat _BALANCE_FILTERS)
+    values = {
+        "part_number": part_number,
+        "location_id": location_id,
+        "location_code": location_code,
+        "warehouse_zone": warehouse_zone,
+        "zero_stock": zero_stock,
+        "negative_stock": negative_stock,
+    }
+    conds.extend(_BALANCE_FILTERS[k](v) for k, v in values.items() if v)
+    ranges = {"min_quantity": min_quantity, "max_quantity": max_quantity}
+    conds.extend(_BALANCE_RANGE_FILTERS[k](v) for k, v in ranges.items() if v is not None)
+
+    # Relasi location dimuat eksplisit lewat satu SELECT ... IN, bukan
+    # lazy load per baris saat serialisasi (N+1); raiseload menjadikan
+    # lazy load lain yang tak disengaja error yang kelihatan
+    stmt = (
+        select(InventoryBalance)
+        .options(selectinload(InventoryBalance.location), raiseload('*'))
+        .join(InventoryLocation)
+        .where(*conds)
+    )
+
+    # COUNT(*) berfilter sering lebih mahal dari halamannya sendiri;
+    # di path panas cukup ambil limit+1 baris sebagai indikator has_more.
+    # Total penuh hanya saat include_total diminta - difusi ke statement
+    # yang sama via COUNT(*) OVER() (satu round-trip, satu pass planner)
+    # seperti pada list QC, bukan SELECT COUNT terpisah.
+    if include_total:
+        stmt = stmt.add_columns(func.count().over().label("_total"))
+
     # Apply pagination
-    balances = query.offset(offset).limit(limit).all()
-    
+    stmt = stmt.order_by(InventoryBalance.id)
+    if not cursor:
+        stmt = stmt.offset(offset)
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    total = (rows[0]._total if rows else 0) if include_total else None
+    balances = [row[0] for row in rows]
+    has_more = len(balances) > limit
+    balances = balances[:limit]
+
     return {
         "items": balances,
         "total": total,
+        "has_more": has_more,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": encode_cursor(balances[-1].id, balances[-1].id) if has_more else None
     }
 
+# Rollup balance per (zona, tipe lokasi) sekali per jendela TTL. Jumlah
+# grupnya hanya segelintir, jadi varian filter summary/by-zone cukup
+# re-slice + penjumlahan Python atas rollup ini - tanpa scan agregat DB
+# per kombinasi filter. (NumPy tidak dipakai: untuk belasan grup,
+# overhead array-nya lebih besar dari sum() biasa.)
+async def _balance_summary_groups(db: AsyncSession):
+    groups = cache_lookup(("balance_summary_groups",), _SUMMARY_CACHE_TTL)
+    if groups is not None:
+        return groups
+
+    stmt = select(
+        InventoryLocation.warehouse_zone,
+        InventoryLocation.location_type,
+        func.count(InventoryBalance.part_number).label('total_parts'),
+        cast(func.sum(InventoryBalance.available_quantity), Float).label('total_available'),
+        cast(func.sum(InventoryBalance.reserved_quantity), Float).label('total_reserved'),
+        cast(func.sum(InventoryBalance.quarantine_quantity), Float).label('total_quarantine'),
+        cast(func.sum(InventoryBalance.available_quantity * InventoryBalance.average_cost), Float).label('total_value'),
+        func.sum(case((InventoryBalance.available_quantity != 0, 1), else_=0)).label('active_parts'),
+        func.sum(case((InventoryBalance.available_quantity == 0, 1), else_=0)).label('zero_stock_parts'),
+        func.sum(case((InventoryBalance.available_quantity < 0, 1), else_=0)).label('negative_stock_parts')
+    ).select_from(InventoryBalance).join(InventoryLocation).group_by(
+        InventoryLocation.warehouse_zone,
+        InventoryLocation.location_type
+    )
+    rows = (await db.execute(stmt)).all()
+
+    return cache_store(("balance_summary_groups",), [
+        {
+            "warehouse_zone": row.warehouse_zone,
+            "location_type": row.location_type,
+            "total_parts": row.total_parts or 0,
+            "total_available": row.total_available or 0.0,
+            "total_reserved": row.total_reserved or 0.0,
+            "total_quarantine": row.total_quarantine or 0.0,
+            "total_value": row.total_value or 0.0,
+            "active_parts": int(row.active_parts or 0),
+            "zero_stock_parts": int(row.zero_stock_parts or 0),
+            "negative_stock_parts": int(row.negative_stock_parts or 0),
+        }
+        for row in rows
+    ])
+
 @router.get("/inventory/balances/summary")
 async def get_inventory_summary(
+    request: Request,
+    response: Response,
     warehouse_zone: Optional[str] = None,
     location_type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get inventory summary statistics
     """
-    query = db.query(
-        func.count(InventoryBalance.part_number).label('total_parts'),
-        func.sum(InventoryBalance.available_quantity).label('total_available'),
-        func.sum(InventoryBalance.reserved_quantity).label('total_reserved'),
-        func.sum(InventoryBalance.quarantine_quantity).label('total_quarantine'),
-        func.sum(InventoryBalance.available_quantity * InventoryBalance.average_cost).label('total_value'),
-        func.count(func.nullif(InventoryBalance.available_quantity, 0)).label('active_parts'),
-        func.count(func.case([(InventoryBalance.available_quantity == 0, 1)])).label('zero_stock_parts'),
-        func.count(func.case([(InventoryBalance.available_quantity < 0, 1)])).label('negative_stock_parts')
-    ).join(InventoryLocation)
-    
-    if warehouse_zone:
-        query = query.filter(InventoryLocation.warehouse_zone == warehouse_zone)
-    
-    if location_type:
-        query = query.filter(InventoryLocation.location_type == location_type)
-    
-    result = query.first()
-    
-    return {
-        "total_parts": result.total_parts or 0,
-        "total_available_quantity": float(result.total_available or 0),
-        "total_reserved_quantity": float(result.total_reserved or 0),
-        "total_quarantine_quantity": float(result.total_quarantine or 0),
-        "total_inventory_value": float(result.total_value or 0),
-        "active_parts": result.active_parts or 0,
-        "zero_stock_parts": result.zero_stock_parts or 0,
-        "negative_stock_parts": result.negative_stock_parts or 0
+    cache_key = ("inventory_summary", warehouse_zone, location_type)
+    cached = cache_lookup(cache_key, _SUMMARY_CACHE_TTL)
+    if cached is not None:
+        payload, etag = cached
+        return conditional_response(request, response, payload, etag, _SUMMARY_CACHE_TTL)
+
+    # Re-slice rollup grup, bukan scan agregat per kombinasi filter
+    groups = await _balance_summary_groups(db)
+    selected = [
+        g for g in groups
+        if (not warehouse_zone or g["warehouse_zone"] == warehouse_zone)
+        and (not location_type or g["location_type"] == location_type)
+    ]
+
+    payload = {
+        "total_parts": sum(g["total_parts"] for g in selected),
+        "total_available_quantity": sum(g["total_available"] for g in selected),
+        "total_reserved_quantity": sum(g["total_reserved"] for g in selected),
+        "total_quarantine_quantity": sum(g["total_quarantine"] for g in selected),
+        "total_inventory_value": sum(g["total_value"] for g in selected),
+        "active_parts": sum(g["active_parts"] for g in selected),
+        "zero_stock_parts": sum(g["zero_stock_parts"] for g in selected),
+        "negative_stock_parts": sum(g["negative_stock_parts"] for g in selected)
     }
+    etag = make_etag(payload)
+    cache_store(cache_key, (payload, etag))
+    return conditional_response(request, response, payload, etag, _SUMMARY_CACHE_TTL)
 
 @router.get("/inventory/balances/by-zone")
 async def get_inventory_by_zone(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get inventory distribution by warehouse zone
     """
-    result = db.query(
-        InventoryLocation.warehouse_zone,
-        func.count(InventoryBalance.part_number).label('total_parts'),
-        func.sum(InventoryBalance.available_quantity).label('total_quantity'),
-        func.sum(InventoryBalance.available_quantity * InventoryBalance.average_cost).label('total_value')
-    ).join(InventoryLocation).group_by(
-        InventoryLocation.warehouse_zone
-    ).all()
-    
-    return [
-        {
-            "warehouse_zone": row.warehouse_zone,
-            "total_parts": row.total_parts,
-            "total_quantity": float(row.total_quantity or 0),
-            "total_value": float(row.total_value or 0)
-        }
-        for row in result
-    ]
+    cache_key = ("inventory_by_zone",)
+    cached = cache_lookup(cache_key, _LOOKUP_CACHE_TTL)
+    if cached is not None:
+        payload, etag = cached
+        return conditional_response(request, response, payload, etag, _LOOKUP_CACHE_TTL)
+
+    # Re-slice rollup grup yang sama dengan /inventory/balances/summary:
+    # jumlahkan per zona di Python, tanpa scan agregat terpisah
+    zones: Dict[Any, Dict[str, Any]] = {}
+    for g in await _balance_summary_groups(db):
+        zone = zones.setdefault(g["warehouse_zone"], {
+            "warehouse_zone": g["warehouse_zone"],
+            "total_parts": 0,
+            "total_quantity": 0.0,
+            "total_value": 0.0
+        })
+        zone["total_parts"] += g["total_parts"]
+        zone["total_quantity"] += g["total_available"]
+        zone["total_value"] += g["total_value"]
+    payload = list(zones.values())
+    etag = make_etag(payload)
+    cache_store(cache_key, (payload, etag))
+    return conditional_response(request, response, payload, etag, _LOOKUP_CACHE_TTL)
 
 # ====================================================================
 # INVENTORY MOVEMENT QUERIES
 # ====================================================================
 
-@router.get("/inventory/movements", response_model=List[InventoryMovementResponse])
+@router.get("/inventory/movements")
 async def get_inventory_movements(
     part_number: Optional[str] = None,
     movement_type: Optional[str] = None,
@@ -169,145 +344,241 @@ async def get_inventory_movements(
     end_date: Optional[date] = None,
     limit: int = Query(100, le=1000),
     offset: int = Query(0, ge=0),
-    sort_by: str = Query("created_at", regex="^(created_at|movement_date|part_number|movement_type)$"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$"),
-    db: Session = Depends(get_db),
+    sort_by: str = Query("created_at", description="Kolom sort (lihat _MOVEMENT_SORT_COLS)"),
+    sort_order: str = Query("desc", description="asc | desc"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor; mengunci urutan ke created_at DESC"),
+    include_total: bool = Query(False, description="Hitung total (scan penuh, hanya untuk ekspor/admin)"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get inventory movements with filters and sorting
     """
-    query = db.query(InventoryMovement)
-    
-    # Apply filters
-    if part_number:
-        query = query.filter(InventoryMovement.part_number.ilike(f"%{part_number}%"))
-    
-    if movement_type:
-        query = query.filter(InventoryMovement.movement_type == movement_type)
-    
+    # Validasi sort lewat allowlist dict (bukan regex per request); nama
+    # di luar daftar kolom -> 400, bukan getattr bebas ke model
+    if sort_by not in _MOVEMENT_SORT_COLS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort_by: {sort_by}")
+    if sort_order not in _ORDER:
+        raise HTTPException(status_code=400, detail=f"Invalid sort_order: {sort_order}")
+
+    conds = []
+
+    # Keyset pagination di (created_at, id) - hanya untuk urutan default;
+    # cursor mengunci sort supaya batas range-nya konsisten antar halaman
+    if cursor:
+        try:
+            cur_ts, cur_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        conds.append(
+            tuple_(InventoryMovement.created_at, InventoryMovement.id) < (cur_ts, cur_id)
+        )
+        sort_by, sort_order = "created_at", "desc"
+
+    # Apply filters via dispatch table (lihat _MOVEMENT_FILTERS)
+    values = {
+        "part_number": part_number,
+        "movement_type": movement_type,
+        "reference_type": reference_type,
+        "reference_id": reference_id,
+        "user_id": user_id,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+    conds.extend(_MOVEMENT_FILTERS[k](v) for k, v in values.items() if v)
+
+    # Serialisasi per baris lewat InventoryMovementResponse (flat, tanpa
+    # relasi) - relasi lokasi tidak pernah disentuh, jadi eager load
+    # tidak diperlukan di sini.
+    # Filter location_id menyentuh dua kolom FK; OR atasnya membuat MySQL
+    # tidak bisa memakai salah satu index dan jatuh ke full scan. UNION dua
+    # seek satu-kolom mengembalikan set yang sama lewat dua index range
+    # (UNION, bukan UNION ALL: transfer dengan from == to tidak boleh dobel).
     if location_id:
-        query = query.filter(
-            (InventoryMovement.from_location_id == location_id) |
-            (InventoryMovement.to_location_id == location_id)
+        base = select(InventoryMovement).where(*conds)
+        movement = aliased(
+            InventoryMovement,
+            union(
+                base.where(InventoryMovement.from_location_id == location_id),
+                base.where(InventoryMovement.to_location_id == location_id),
+            ).subquery(),
         )
-    
-    if reference_type:
-        query = query.filter(InventoryMovement.reference_type == reference_type)
-    
-    if reference_id:
-        query = query.filter(InventoryMovement.reference_id == reference_id)
-    
-    if user_id:
-        query = query.filter(InventoryMovement.user_id == user_id)
-    
-    if start_date:
-        query = query.filter(InventoryMovement.movement_date >= start_date)
-    
-    if end_date:
-        query = query.filter(InventoryMovement.movement_date <= end_date)
-    
-    # Apply sorting
-    sort_column = getattr(InventoryMovement, sort_by)
-    if sort_order == "desc":
-        query = query.order_by(desc(sort_column))
+        stmt = select(movement)
     else:
-        query = query.order_by(asc(sort_column))
-    
-    # Get total count
-    total = query.count()
-    
+        movement = InventoryMovement
+        stmt = select(InventoryMovement).where(*conds)
+
+    # Apply sorting (id sebagai tie-breaker supaya cursor deterministik);
+    # sort_by sudah tervalidasi, getattr di sini hanya memetakan nama ke
+    # kolom entity aktif (alias union atau model)
+    order = _ORDER[sort_order]
+    sort_column = getattr(movement, sort_by)
+    stmt = stmt.order_by(order(sort_column), order(movement.id))
+
+    # Total penuh hanya saat diminta; has_more dari baris ke limit+1
+    total = await _count(db, stmt) if include_total else None
+
     # Apply pagination
-    movements = query.offset(offset).limit(limit).all()
-    
-    return {
-        "items": movements,
-        "total": total,
-        "limit": limit,
-        "offset": offset
-    }
+    if not cursor:
+        stmt = stmt.offset(offset)
+    stmt = stmt.limit(limit + 1).execution_options(yield_per=200)
+
+    # Stream baris ke klien (pola sama dengan erp_query): server-side
+    # cursor di driver + encode per baris, jadi halaman limit=1000 tidak
+    # pernah dimaterialisasi utuh di memori dan TTFB turun. Metadata
+    # (has_more/next_cursor) menyusul setelah array karena baru diketahui
+    # di baris terakhir.
+    async def generate():
+        emitted = 0
+        has_more = False
+        last = None
+        yield '{"items":['
+        result = await db.stream(stmt)
+        async for movement in result.scalars():
+            if emitted >= limit:
+                has_more = True
+                break
+            chunk = InventoryMovementResponse.model_validate(movement).model_dump_json()
+            yield chunk if emitted == 0 else "," + chunk
+            last = movement
+            emitted += 1
+        next_cursor = (
+            encode_cursor(last.created_at, last.id)
+            if has_more and sort_by == "created_at" and sort_order == "desc"
+            else None
+        )
+        yield "]," + json.dumps({
+            "total": total,
+            "has_more": has_more,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+        })[1:]
+
+    return StreamingResponse(generate(), media_type="application/json")
 
 @router.get("/inventory/movements/summary")
 async def get_movement_summary(
+    request: Request,
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     warehouse_zone: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get movement summary by type and date range
     """
-    query = db.query(
-        InventoryMovement.movement_type,
-        func.count(InventoryMovement.id).label('count'),
-        func.sum(InventoryMovement.quantity).label('total_quantity'),
-        func.avg(InventoryMovement.quantity).label('avg_quantity'),
-        func.sum(InventoryMovement.quantity * InventoryMovement.unit_cost).label('total_value')
-    )
-    
+    cache_key = ("movement_summary", start_date, end_date, warehouse_zone)
+    cached = cache_lookup(cache_key, _SUMMARY_CACHE_TTL)
+    if cached is not None:
+        payload, etag = cached
+        return conditional_response(request, response, payload, etag, _SUMMARY_CACHE_TTL)
+
+    date_conds = []
     if start_date:
-        query = query.filter(InventoryMovement.movement_date >= start_date)
-    
+        date_conds.append(InventoryMovement.movement_date >= start_date)
     if end_date:
-        query = query.filter(InventoryMovement.movement_date <= end_date)
-    
+        date_conds.append(InventoryMovement.movement_date <= end_date)
+
     if warehouse_zone:
-        query = query.join(InventoryLocation, 
-            (InventoryMovement.from_location_id == InventoryLocation.id) |
-            (InventoryMovement.to_location_id == InventoryLocation.id)
-        ).filter(InventoryLocation.warehouse_zone == warehouse_zone)
-    
-    result = query.group_by(InventoryMovement.movement_type).all()
-    
-    return [
+        # Join dengan kondisi OR (from/to) mematikan index seperti pada
+        # filter location_id di list movements; ganti dua seek terarah ke
+        # id lokasi zona, digabung UNION (dedup pada id - transfer
+        # intra-zona hanya terhitung sekali)
+        zone_ids = select(InventoryLocation.id).where(
+            InventoryLocation.warehouse_zone == warehouse_zone
+        )
+        branch = select(
+            InventoryMovement.id,
+            InventoryMovement.movement_type,
+            InventoryMovement.quantity,
+            InventoryMovement.unit_cost,
+        ).where(*date_conds)
+        movements = union(
+            branch.where(InventoryMovement.from_location_id.in_(zone_ids)),
+            branch.where(InventoryMovement.to_location_id.in_(zone_ids)),
+        ).subquery()
+        stmt = select(
+            movements.c.movement_type,
+            func.count(movements.c.id).label('count'),
+            cast(func.sum(movements.c.quantity), Float).label('total_quantity'),
+            cast(func.avg(movements.c.quantity), Float).label('avg_quantity'),
+            cast(func.sum(movements.c.quantity * movements.c.unit_cost), Float).label('total_value')
+        ).group_by(movements.c.movement_type)
+    else:
+        # CAST ke DOUBLE seperti /inventory/balances/by-zone: tanpa
+        # Decimal.__float__ per field di Python
+        stmt = select(
+            InventoryMovement.movement_type,
+            func.count(InventoryMovement.id).label('count'),
+            cast(func.sum(InventoryMovement.quantity), Float).label('total_quantity'),
+            cast(func.avg(InventoryMovement.quantity), Float).label('avg_quantity'),
+            cast(func.sum(InventoryMovement.quantity * InventoryMovement.unit_cost), Float).label('total_value')
+        ).where(*date_conds).group_by(InventoryMovement.movement_type)
+
+    result = (await db.execute(stmt)).all()
+
+    payload = [
         {
             "movement_type": row.movement_type,
             "count": row.count,
-            "total_quantity": float(row.total_quantity or 0),
-            "average_quantity": float(row.avg_quantity or 0),
-            "total_value": float(row.total_value or 0)
+            "total_quantity": row.total_quantity or 0.0,
+            "average_quantity": row.avg_quantity or 0.0,
+            "total_value": row.total_value or 0.0
         }
         for row in result
     ]
+    etag = make_etag(payload)
+    cache_store(cache_key, (payload, etag))
+    return conditional_response(request, response, payload, etag, _SUMMARY_CACHE_TTL)
 
 @router.get("/inventory/movements/daily")
 async def get_daily_movements(
     days: int = Query(30, ge=1, le=365),
     movement_type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get daily movement trends
     """
-    query = db.query(
-        func.date(InventoryMovement.movement_date).label('date'),
+    cache_key = ("daily_movements", days, movement_type)
+    cached = cache_lookup(cache_key, _SUMMARY_CACHE_TTL)
+    if cached is not None:
+        return cached
+
+    # Batas tanggal dihitung di Python dan di-bind sebagai parameter -
+    # interpolasi INTERVAL {days} DAY mematahkan statement cache; group by
+    # kolom generated movement_day supaya index idx_movement_day terpakai
+    since = date.today() - timedelta(days=days)
+    stmt = select(
+        InventoryMovement.movement_day.label('date'),
         func.count(InventoryMovement.id).label('count'),
         func.sum(InventoryMovement.quantity).label('total_quantity')
-    ).filter(
-        InventoryMovement.movement_date >= func.date_sub(func.now(), text(f"INTERVAL {days} DAY"))
-    )
-    
+    ).where(InventoryMovement.movement_day >= since)
+
     if movement_type:
-        query = query.filter(InventoryMovement.movement_type == movement_type)
-    
-    result = query.group_by(func.date(InventoryMovement.movement_date)).order_by('date').all()
-    
-    return [
+        stmt = stmt.where(InventoryMovement.movement_type == movement_type)
+
+    stmt = stmt.group_by(InventoryMovement.movement_day).order_by(InventoryMovement.movement_day)
+    result = (await db.execute(stmt)).all()
+
+    return cache_store(cache_key, [
         {
             "date": row.date.isoformat(),
             "count": row.count,
             "total_quantity": float(row.total_quantity or 0)
         }
         for row in result
-    ]
+    ])
 
 # ====================================================================
 # STOCK RESERVATION QUERIES
 # ====================================================================
 
-@router.get("/inventory/reservations", response_model=List[StockReservationResponse])
+@router.get("/inventory/reservations")
 async def get_stock_reservations(
     part_number: Optional[str] = None,
     location_id: Optional[int] = None,
@@ -319,81 +590,110 @@ async def get_stock_reservations(
     days_until_expiry: int = Query(7, ge=1),
     limit: int = Query(100, le=1000),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor dari next_cursor halaman sebelumnya"),
+    include_total: bool = Query(False, description="Hitung total (scan penuh, hanya untuk ekspor/admin)"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get stock reservations with filters
     """
-    query = db.query(StockReservation)
-    
-    # Apply filters
-    if part_number:
-        query = query.filter(StockReservation.part_number.ilike(f"%{part_number}%"))
-    
-    if location_id:
-        query = query.filter(StockReservation.location_id == location_id)
-    
-    if reservation_type:
-        query = query.filter(StockReservation.reservation_type == reservation_type)
-    
-    if status:
-        query = query.filter(StockReservation.status == status)
-    
-    if reserved_by:
-        query = query.filter(StockReservation.reserved_by == reserved_by)
-    
-    if reference_id:
-        query = query.filter(StockReservation.reference_id == reference_id)
-    
+    conds = []
+
+    # Keyset pagination di (created_at, id); lihat /inventory/balances
+    if cursor:
+        try:
+            cur_ts, cur_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        conds.append(
+            tuple_(StockReservation.created_at, StockReservation.id) < (cur_ts, cur_id)
+        )
+
+    # Apply filters via dispatch table (lihat _RESERVATION_FILTERS)
+    values = {
+        "part_number": part_number,
+        "location_id": location_id,
+        "reservation_type": reservation_type,
+        "status": status,
+        "reserved_by": reserved_by,
+        "reference_id": reference_id,
+    }
+    conds.extend(_RESERVATION_FILTERS[k](v) for k, v in values.items() if v)
+
     if expiring_soon:
         expiry_date = datetime.now().date() + timedelta(days=days_until_expiry)
-        query = query.filter(
+        conds.extend([
             StockReservation.expiry_date.isnot(None),
             StockReservation.expiry_date <= expiry_date,
             StockReservation.status == 'active'
-        )
-    
-    # Get total count
-    total = query.count()
-    
+        ])
+
+    # Eager load relasi location (lihat /inventory/balances)
+    stmt = (
+        select(StockReservation)
+        .options(selectinload(StockReservation.location), raiseload('*'))
+        .where(*conds)
+    )
+
+    # Total penuh hanya saat diminta - via COUNT(*) OVER() di statement
+    # yang sama (lihat /inventory/balances); has_more dari baris ke limit+1
+    if include_total:
+        stmt = stmt.add_columns(func.count().over().label("_total"))
+
     # Apply pagination and ordering
-    reservations = query.order_by(desc(StockReservation.created_at)).offset(offset).limit(limit).all()
-    
+    stmt = stmt.order_by(desc(StockReservation.created_at), desc(StockReservation.id))
+    if not cursor:
+        stmt = stmt.offset(offset)
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    total = (rows[0]._total if rows else 0) if include_total else None
+    reservations = [row[0] for row in rows]
+    has_more = len(reservations) > limit
+    reservations = reservations[:limit]
+
     return {
         "items": reservations,
         "total": total,
+        "has_more": has_more,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": encode_cursor(reservations[-1].created_at, reservations[-1].id)
+        if has_more else None
     }
 
 @router.get("/inventory/reservations/summary")
 async def get_reservations_summary(
     warehouse_zone: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get reservations summary statistics
     """
-    query = db.query(
+    cache_key = ("reservations_summary", warehouse_zone)
+    cached = cache_lookup(cache_key, _LOOKUP_CACHE_TTL)
+    if cached is not None:
+        return cached
+
+    stmt = select(
         StockReservation.status,
         StockReservation.reservation_type,
         func.count(StockReservation.id).label('count'),
         func.sum(StockReservation.reserved_quantity).label('total_quantity')
     )
-    
+
     if warehouse_zone:
-        query = query.join(InventoryLocation).filter(
+        stmt = stmt.join(InventoryLocation).where(
             InventoryLocation.warehouse_zone == warehouse_zone
         )
-    
-    result = query.group_by(
-        StockReservation.status, 
+
+    stmt = stmt.group_by(
+        StockReservation.status,
         StockReservation.reservation_type
-    ).all()
-    
-    return [
+    )
+    result = (await db.execute(stmt)).all()
+
+    return cache_store(cache_key, [
         {
             "status": row.status,
             "reservation_type": row.reservation_type,
@@ -401,13 +701,13 @@ async def get_reservations_summary(
             "total_quantity": float(row.total_quantity or 0)
         }
         for row in result
-    ]
+    ])
 
 # ====================================================================
 # CYCLE COUNT QUERIES
 # ====================================================================
 
-@router.get("/inventory/cycle-counts", response_model=List[CycleCountResponse])
+@router.get("/inventory/cycle-counts")
 async def get_cycle_counts(
     location_id: Optional[int] = None,
     count_type: Optional[str] = None,
@@ -418,69 +718,85 @@ async def get_cycle_counts(
     end_date: Optional[date] = None,
     limit: int = Query(100, le=1000),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor dari next_cursor halaman sebelumnya"),
+    include_total: bool = Query(False, description="Hitung total (scan penuh, hanya untuk ekspor/admin)"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get cycle counts with filters
     """
-    query = db.query(CycleCount)
-    
-    # Apply filters
-    if location_id:
-        query = query.filter(CycleCount.location_id == location_id)
-    
-    if count_type:
-        query = query.filter(CycleCount.count_type == count_type)
-    
-    if status:
-        query = query.filter(CycleCount.status == status)
-    
-    if assigned_to:
-        query = query.filter(CycleCount.assigned_to == assigned_to)
-    
-    if created_by:
-        query = query.filter(CycleCount.created_by == created_by)
-    
-    if start_date:
-        query = query.filter(CycleCount.count_date >= start_date)
-    
-    if end_date:
-        query = query.filter(CycleCount.count_date <= end_date)
-    
-    # Get total count
-    total = query.count()
-    
+    conds = []
+
+    # Keyset pagination di (created_at, id); lihat /inventory/balances
+    if cursor:
+        try:
+            cur_ts, cur_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        conds.append(
+            tuple_(CycleCount.created_at, CycleCount.id) < (cur_ts, cur_id)
+        )
+
+    # Apply filters via dispatch table (lihat _CYCLE_COUNT_FILTERS)
+    values = {
+        "location_id": location_id,
+        "count_type": count_type,
+        "status": status,
+        "assigned_to": assigned_to,
+        "created_by": created_by,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+    conds.extend(_CYCLE_COUNT_FILTERS[k](v) for k, v in values.items() if v)
+
+    stmt = select(CycleCount).where(*conds)
+
+    # Total penuh hanya saat diminta - via COUNT(*) OVER() di statement
+    # yang sama (lihat /inventory/balances); has_more dari baris ke limit+1
+    if include_total:
+        stmt = stmt.add_columns(func.count().over().label("_total"))
+
     # Apply pagination and ordering
-    counts = query.order_by(desc(CycleCount.created_at)).offset(offset).limit(limit).all()
-    
+    stmt = stmt.order_by(desc(CycleCount.created_at), desc(CycleCount.id))
+    if not cursor:
+        stmt = stmt.offset(offset)
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    total = (rows[0]._total if rows else 0) if include_total else None
+    counts = [row[0] for row in rows]
+    has_more = len(counts) > limit
+    counts = counts[:limit]
+
     return {
         "items": counts,
         "total": total,
+        "has_more": has_more,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": encode_cursor(counts[-1].created_at, counts[-1].id)
+        if has_more else None
     }
 
 @router.get("/inventory/cycle-counts/{count_id}/details", response_model=List[CycleCountDetailResponse])
 async def get_cycle_count_details(
     count_id: int,
     variance_only: bool = Query(False),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get cycle count details for a specific count
     """
-    query = db.query(CycleCountDetail).filter(CycleCountDetail.cycle_count_id == count_id)
-    
+    stmt = select(CycleCountDetail).where(CycleCountDetail.cycle_count_id == count_id)
+
     if variance_only:
-        query = query.filter(CycleCountDetail.variance_quantity != 0)
-    
-    details = query.all()
-    
+        stmt = stmt.where(CycleCountDetail.variance_quantity != 0)
+
+    details = (await db.execute(stmt)).scalars().all()
+
     if not details:
         raise HTTPException(status_code=404, detail="Cycle count tidak ditemukan")
-    
+
     return details
 
 @router.get("/inventory/cycle-counts/variance-summary")
@@ -489,46 +805,52 @@ async def get_variance_summary(
     end_date: Optional[date] = None,
     location_id: Optional[int] = None,
     significant_variance_threshold: float = Query(10.0, ge=0),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get variance summary from cycle counts
     """
-    query = db.query(
+    cache_key = ("variance_summary", start_date, end_date, location_id,
+                 significant_variance_threshold)
+    cached = cache_lookup(cache_key, _LOOKUP_CACHE_TTL)
+    if cached is not None:
+        return cached
+
+    stmt = select(
         func.count(CycleCountDetail.id).label('total_items_counted'),
-        func.count(func.case([(CycleCountDetail.variance_quantity != 0, 1)])).label('items_with_variance'),
+        func.sum(case((CycleCountDetail.variance_quantity != 0, 1), else_=0)).label('items_with_variance'),
         func.sum(func.abs(CycleCountDetail.variance_quantity)).label('total_abs_variance'),
         func.sum(func.abs(CycleCountDetail.variance_value)).label('total_abs_variance_value'),
-        func.count(func.case([(func.abs(CycleCountDetail.variance_quantity) >= significant_variance_threshold, 1)])).label('significant_variances')
-    ).join(CycleCount)
-    
+        func.sum(case((func.abs(CycleCountDetail.variance_quantity) >= significant_variance_threshold, 1), else_=0)).label('significant_variances')
+    ).select_from(CycleCountDetail).join(CycleCount)
+
     if start_date:
-        query = query.filter(CycleCount.count_date >= start_date)
-    
+        stmt = stmt.where(CycleCount.count_date >= start_date)
+
     if end_date:
-        query = query.filter(CycleCount.count_date <= end_date)
-    
+        stmt = stmt.where(CycleCount.count_date <= end_date)
+
     if location_id:
-        query = query.filter(CycleCount.location_id == location_id)
-    
-    result = query.first()
-    
-    return {
+        stmt = stmt.where(CycleCount.location_id == location_id)
+
+    result = (await db.execute(stmt)).first()
+
+    return cache_store(cache_key, {
         "total_items_counted": result.total_items_counted or 0,
-        "items_with_variance": result.items_with_variance or 0,
-        "variance_percentage": round((result.items_with_variance or 0) / max(result.total_items_counted or 1, 1) * 100, 2),
+        "items_with_variance": int(result.items_with_variance or 0),
+        "variance_percentage": round(int(result.items_with_variance or 0) / max(result.total_items_counted or 1, 1) * 100, 2),
         "total_absolute_variance": float(result.total_abs_variance or 0),
         "total_absolute_variance_value": float(result.total_abs_variance_value or 0),
-        "significant_variances": result.significant_variances or 0,
+        "significant_variances": int(result.significant_variances or 0),
         "significant_variance_threshold": significant_variance_threshold
-    }
+    })
 
 # ====================================================================
 # LOCATION QUERIES
 # ====================================================================
 
-@router.get("/inventory/locations", response_model=List[InventoryLocationResponse])
+@router.get("/inventory/locations")
 async def get_inventory_locations(
     location_code: Optional[str] = None,
     location_type: Optional[str] = None,
@@ -539,80 +861,135 @@ async def get_inventory_locations(
     with_inventory: Optional[bool] = None,
     limit: int = Query(100, le=1000),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor dari next_cursor halaman sebelumnya"),
+    include_total: bool = Query(False, description="Hitung total (scan penuh, hanya untuk ekspor/admin)"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get inventory locations with filters
     """
-    query = db.query(InventoryLocation)
-    
+    # Proyeksi kolom sesuai InventoryLocationResponse: tanpa instansiasi
+    # ORM entity + identity map untuk baris yang cuma dibaca sekali lalu
+    # diserialisasi
+    stmt = select(
+        InventoryLocation.id,
+        InventoryLocation.location_code,
+        InventoryLocation.location_name,
+        InventoryLocation.location_type,
+        InventoryLocation.warehouse_zone,
+        InventoryLocation.aisle,
+        InventoryLocation.rack,
+        InventoryLocation.shelf,
+        InventoryLocation.bin,
+        InventoryLocation.capacity,
+        InventoryLocation.temperature_controlled,
+        InventoryLocation.hazardous_materials,
+        InventoryLocation.active,
+        InventoryLocation.created_at,
+        InventoryLocation.updated_at,
+    )
+
+    # Keyset pagination di (location_code, id): range seek dari baris
+    # terakhir halaman sebelumnya, tanpa scan+buang O(offset). Index
+    # location_code sudah meng-cover (InnoDB menyertakan PK di secondary
+    # index). OFFSET tetap didukung untuk klien lama.
+    if cursor:
+        try:
+            cur_code, cur_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(
+            tuple_(InventoryLocation.location_code, InventoryLocation.id) > (cur_code, cur_id)
+        )
+
     # Apply filters
     if location_code:
-        query = query.filter(InventoryLocation.location_code.ilike(f"%{location_code}%"))
-    
+        stmt = stmt.where(InventoryLocation.location_code.ilike(f"%{location_code}%"))
+
     if location_type:
-        query = query.filter(InventoryLocation.location_type == location_type)
-    
+        stmt = stmt.where(InventoryLocation.location_type == location_type)
+
     if warehouse_zone:
-        query = query.filter(InventoryLocation.warehouse_zone == warehouse_zone)
-    
+        stmt = stmt.where(InventoryLocation.warehouse_zone == warehouse_zone)
+
     if aisle:
-        query = query.filter(InventoryLocation.aisle == aisle)
-    
+        stmt = stmt.where(InventoryLocation.aisle == aisle)
+
     if rack:
-        query = query.filter(InventoryLocation.rack == rack)
-    
+        stmt = stmt.where(InventoryLocation.rack == rack)
+
     if active_only:
-        query = query.filter(InventoryLocation.active == True)
-    
+        stmt = stmt.where(InventoryLocation.active == True)
+
     if with_inventory is not None:
-        if with_inventory:
-            query = query.join(InventoryBalance).filter(InventoryBalance.available_quantity > 0)
-        else:
-            query = query.outerjoin(InventoryBalance).filter(
-                (InventoryBalance.id.is_(None)) | (InventoryBalance.available_quantity == 0)
-            )
-    
-    # Get total count
-    total = query.count()
-    
-    # Apply pagination
-    locations = query.offset(offset).limit(limit).all()
-    
+        # EXISTS, bukan join ke balances: probe berhenti di balance pertama
+        # dan lokasi dengan banyak balance tidak terduplikasi di hasil
+        has_stock = select(InventoryBalance.id).where(
+            InventoryBalance.location_id == InventoryLocation.id,
+            InventoryBalance.available_quantity > 0
+        ).exists()
+        stmt = stmt.where(has_stock if with_inventory else ~has_stock)
+
+    # Total penuh hanya saat diminta eksplisit - aggregate window-nya
+    # menyentuh seluruh hasil filter, jauh lebih mahal dari halamannya
+    # sendiri terutama saat filter with_inventory join ke balance; di
+    # path panas cukup has_more dari probe limit+1
+    if include_total:
+        stmt = stmt.add_columns(func.count().over().label("_total"))
+
+    # Apply pagination (urutan deterministik sesuai key cursor)
+    stmt = stmt.order_by(InventoryLocation.location_code, InventoryLocation.id)
+    if not cursor:
+        stmt = stmt.offset(offset)
+    rows = (await db.execute(stmt.limit(limit + 1))).mappings().all()
+    total = (rows[0]["_total"] if rows else 0) if include_total else None
+    has_more = len(rows) > limit
+    locations = [dict(row) for row in rows[:limit]]
+    if include_total:
+        for item in locations:
+            del item["_total"]
+
     return {
         "items": locations,
         "total": total,
+        "has_more": has_more,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": encode_cursor(locations[-1]["location_code"], locations[-1]["id"])
+        if has_more else None
     }
 
 @router.get("/inventory/locations/{location_id}/utilization")
 async def get_location_utilization(
     location_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get utilization statistics for a specific location
     """
-    location = db.query(InventoryLocation).filter(InventoryLocation.id == location_id).first()
-    
+    location = (await db.execute(
+        select(InventoryLocation).where(InventoryLocation.id == location_id)
+    )).scalar_one_or_none()
+
     if not location:
         raise HTTPException(status_code=404, detail="Location tidak ditemukan")
-    
+
     # Get inventory in location
-    inventory_stats = db.query(
-        func.count(InventoryBalance.part_number).label('total_parts'),
-        func.sum(InventoryBalance.available_quantity).label('total_quantity'),
-        func.sum(InventoryBalance.available_quantity * InventoryBalance.average_cost).label('total_value')
-    ).filter(InventoryBalance.location_id == location_id).first()
-    
+    inventory_stats = (await db.execute(
+        select(
+            func.count(InventoryBalance.part_number).label('total_parts'),
+            func.sum(InventoryBalance.available_quantity).label('total_quantity'),
+            func.sum(InventoryBalance.available_quantity * InventoryBalance.average_cost).label('total_value')
+        ).where(InventoryBalance.location_id == location_id)
+    )).first()
+
     # Calculate utilization percentage
     utilization_percentage = 0
     if location.capacity and inventory_stats.total_quantity:
         utilization_percentage = (float(inventory_stats.total_quantity) / location.capacity) * 100
-    
+
     return {
         "location": location,
         "total_parts": inventory_stats.total_parts or 0,
@@ -630,7 +1007,9 @@ async def get_location_utilization(
 async def get_abc_analysis(
     analysis_type: str = Query("value", regex="^(value|movement|quantity)$"),
     period_days: int = Query(90, ge=1, le=365),
-    db: Session = Depends(get_db),
+    limit: int = Query(100, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor dari next_cursor halaman sebelumnya"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -638,128 +1017,279 @@ async def get_abc_analysis(
     """
     # This is a complex query that would require raw SQL for proper ABC analysis
     # For now, return a simplified version
-    
+
+    cache_key = ("abc_analysis", analysis_type, period_days, limit, cursor)
+    cached = cache_lookup(cache_key, _ANALYTICS_CACHE_TTL)
+    if cached is not None:
+        return cached
+
+    # Keyset pagination di (metrik DESC, kunci unik ASC): cursor membawa
+    # metrik baris terakhir + kuncinya, jadi halaman berikut adalah range
+    # seek - bukan scan ulang dengan LIMIT implisit
+    cur_metric = cur_key = None
+    if cursor:
+        try:
+            cur_metric, cur_key = decode_cursor(cursor)
+            cur_metric = float(cur_metric)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     if analysis_type == "value":
-        # Analyze by inventory value
-        query = db.query(
+        # Analyze by inventory value (baris per part+lokasi; id sebagai
+        # tie-breaker karena part_number bisa muncul di beberapa lokasi)
+        value_expr = InventoryBalance.available_quantity * InventoryBalance.average_cost
+        stmt = select(
             InventoryBalance.part_number,
-            (InventoryBalance.available_quantity * InventoryBalance.average_cost).label('value')
-        ).filter(InventoryBalance.available_quantity > 0)
-        
+            value_expr.label('value'),
+            InventoryBalance.id
+        ).where(InventoryBalance.available_quantity > 0)
+        if cursor:
+            stmt = stmt.where(or_(
+                value_expr < cur_metric,
+                and_(value_expr == cur_metric, InventoryBalance.id > int(cur_key))
+            ))
+        stmt = stmt.order_by(desc('value'), InventoryBalance.id)
+
     elif analysis_type == "movement":
         # Analyze by movement frequency
         start_date = datetime.now().date() - timedelta(days=period_days)
-        query = db.query(
+        metric = func.count(InventoryMovement.id)
+        stmt = select(
             InventoryMovement.part_number,
-            func.count(InventoryMovement.id).label('movement_count'),
+            metric.label('movement_count'),
             func.sum(InventoryMovement.quantity).label('total_moved')
-        ).filter(
+        ).where(
             InventoryMovement.movement_date >= start_date
         ).group_by(InventoryMovement.part_number)
-        
-    result = query.order_by(desc('value' if analysis_type == 'value' else 'movement_count')).limit(100).all()
-    
-    return {
+        if cursor:
+            stmt = stmt.having(or_(
+                metric < cur_metric,
+                and_(metric == cur_metric, InventoryMovement.part_number > cur_key)
+            ))
+        stmt = stmt.order_by(desc('movement_count'), InventoryMovement.part_number)
+
+    else:  # quantity
+        # Analyze by on-hand quantity (digabung per part lintas lokasi)
+        metric = func.sum(InventoryBalance.available_quantity)
+        stmt = select(
+            InventoryBalance.part_number,
+            metric.label('quantity')
+        ).where(
+            InventoryBalance.available_quantity > 0
+        ).group_by(InventoryBalance.part_number)
+        if cursor:
+            stmt = stmt.having(or_(
+                metric < cur_metric,
+                and_(metric == cur_metric, InventoryBalance.part_number > cur_key)
+            ))
+        stmt = stmt.order_by(desc('quantity'), InventoryBalance.part_number)
+
+    # Shaping baris di MySQL: halaman dikembalikan sebagai satu blob
+    # JSON_ARRAYAGG(JSON_OBJECT), bukan dict per baris di Python (pola
+    # _DASHBOARD_STMT di get_dashboard.py). JSON_ARRAYAGG tidak menjamin
+    # urutan, jadi sort key ikut di objek dan diurutkan ulang setelah
+    # decode.
+    t = stmt.limit(limit + 1).subquery()
+    if analysis_type == "value":
+        json_row = func.json_object(
+            'part_number', t.c.part_number,
+            'value', t.c.value,
+            'movement_count', 0,
+            'total_moved', 0.0,
+            'quantity', 0.0,
+            'id', t.c.id
+        )
+    elif analysis_type == "movement":
+        json_row = func.json_object(
+            'part_number', t.c.part_number,
+            'value', 0.0,
+            'movement_count', t.c.movement_count,
+            'total_moved', func.coalesce(t.c.total_moved, 0),
+            'quantity', 0.0
+        )
+    else:
+        json_row = func.json_object(
+            'part_number', t.c.part_number,
+            'value', 0.0,
+            'movement_count', 0,
+            'total_moved', 0.0,
+            'quantity', t.c.quantity
+        )
+
+    raw = (await db.execute(select(func.json_arrayagg(json_row)))).scalar()
+    rows = _json_loads(raw) if raw else []
+    if analysis_type == "value":
+        rows.sort(key=lambda r: (-r['value'], r['id']))
+    elif analysis_type == "movement":
+        rows.sort(key=lambda r: (-r['movement_count'], r['part_number']))
+    else:
+        rows.sort(key=lambda r: (-r['quantity'], r['part_number']))
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        if analysis_type == "value":
+            next_cursor = encode_cursor(last['value'], last['id'])
+        elif analysis_type == "movement":
+            next_cursor = encode_cursor(last['movement_count'], last['part_number'])
+        else:
+            next_cursor = encode_cursor(last['quantity'], last['part_number'])
+    if analysis_type == "value":
+        for row in rows:
+            del row['id']
+
+    return cache_store(cache_key, {
         "analysis_type": analysis_type,
         "period_days": period_days,
-        "items": [
-            {
-                "part_number": row.part_number,
-                "value": float(getattr(row, 'value', 0)),
-                "movement_count": getattr(row, 'movement_count', 0),
-                "total_moved": float(getattr(row, 'total_moved', 0))
-            }
-            for row in result
-        ]
-    }
+        "items": rows,
+        "has_more": has_more,
+        "limit": limit,
+        "next_cursor": next_cursor
+    })
 
 @router.get("/inventory/analytics/slow-moving")
 async def get_slow_moving_inventory(
     days_threshold: int = Query(90, ge=30, le=365),
     min_value_threshold: float = Query(100.0, ge=0),
-    db: Session = Depends(get_db),
+    limit: int = Query(200, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor dari next_cursor halaman sebelumnya"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get slow-moving inventory items
     """
+    cache_key = ("slow_moving", days_threshold, min_value_threshold, limit, cursor)
+    cached = cache_lookup(cache_key, _ANALYTICS_CACHE_TTL)
+    if cached is not None:
+        return cached
+
     threshold_date = datetime.now().date() - timedelta(days=days_threshold)
-    
-    # Find items with no recent movements
-    slow_moving = db.query(
+
+    # Find items with no recent movements: NOT EXISTS berhenti di movement
+    # pertama yang cocok (semi-join probe), sedangkan outer join + IS NULL
+    # harus materialisasi semua movement terbaru per part sebelum dibuang
+    recent_movement = select(InventoryMovement.id).where(
+        InventoryMovement.part_number == InventoryBalance.part_number,
+        InventoryMovement.movement_date >= threshold_date
+    ).exists()
+
+    value_expr = InventoryBalance.available_quantity * InventoryBalance.average_cost
+    stmt = select(
         InventoryBalance.part_number,
         InventoryBalance.available_quantity,
         InventoryBalance.average_cost,
-        (InventoryBalance.available_quantity * InventoryBalance.average_cost).label('total_value'),
+        value_expr.label('total_value'),
         InventoryBalance.last_movement_date,
-        InventoryLocation.location_code
-    ).join(InventoryLocation).outerjoin(
-        InventoryMovement,
-        (InventoryMovement.part_number == InventoryBalance.part_number) &
-        (InventoryMovement.movement_date >= threshold_date)
-    ).filter(
+        InventoryLocation.location_code,
+        InventoryBalance.id
+    ).select_from(InventoryBalance).join(InventoryLocation).where(
         InventoryBalance.available_quantity > 0,
-        (InventoryBalance.available_quantity * InventoryBalance.average_cost) >= min_value_threshold,
-        InventoryMovement.id.is_(None)  # No recent movements
-    ).all()
-    
-    return [
-        {
-            "part_number": item.part_number,
-            "available_quantity": float(item.available_quantity),
-            "average_cost": float(item.average_cost),
-            "total_value": float(item.total_value),
-            "last_movement_date": item.last_movement_date.isoformat() if item.last_movement_date else None,
-            "location_code": item.location_code,
-            "days_since_movement": (datetime.now().date() - item.last_movement_date).days if item.last_movement_date else None
-        }
-        for item in slow_moving
-    ]
+        value_expr >= min_value_threshold,
+        ~recent_movement
+    )
+
+    # Keyset pagination (total_value DESC, id ASC): sebelumnya endpoint ini
+    # mengembalikan seluruh hasil tanpa LIMIT
+    if cursor:
+        try:
+            cur_value, cur_id = decode_cursor(cursor)
+            cur_value = float(cur_value)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(or_(
+            value_expr < cur_value,
+            and_(value_expr == cur_value, InventoryBalance.id > cur_id)
+        ))
+
+    stmt = stmt.order_by(desc('total_value'), InventoryBalance.id).limit(limit + 1)
+
+    # Shaping di MySQL (lihat abc-analysis di atas): DATE_FORMAT dan
+    # DATEDIFF menggantikan isoformat() + hitung selisih hari per baris
+    # di Python; hasilnya satu blob JSON per halaman
+    t = stmt.subquery()
+    json_row = func.json_object(
+        'part_number', t.c.part_number,
+        'available_quantity', t.c.available_quantity,
+        'average_cost', t.c.average_cost,
+        'total_value', t.c.total_value,
+        'last_movement_date', func.date_format(t.c.last_movement_date, '%Y-%m-%d'),
+        'location_code', t.c.location_code,
+        'days_since_movement', func.datediff(func.curdate(), t.c.last_movement_date),
+        'id', t.c.id
+    )
+    raw = (await db.execute(select(func.json_arrayagg(json_row)))).scalar()
+    items = _json_loads(raw) if raw else []
+    items.sort(key=lambda r: (-r['total_value'], r['id']))
+
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(last['total_value'], last['id'])
+    for item in items:
+        del item['id']
+
+    return cache_store(cache_key, {
+        "items": items,
+        "has_more": has_more,
+        "limit": limit,
+        "next_cursor": next_cursor
+    })
 
 @router.get("/inventory/analytics/stock-alerts")
 async def get_stock_alerts(
     alert_type: str = Query("all", regex="^(all|low_stock|zero_stock|negative_stock|overstock)$"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get stock alert notifications
     """
-    alerts = []
-    
-    if alert_type in ["all", "zero_stock"]:
-        zero_stock = db.query(InventoryBalance).filter(
-            InventoryBalance.available_quantity == 0
-        ).all()
-        alerts.extend([
-            {
-                "type": "zero_stock",
-                "part_number": item.part_number,
-                "location_id": item.location_id,
-                "available_quantity": float(item.available_quantity),
-                "message": f"Zero stock for {item.part_number}"
-            }
-            for item in zero_stock
-        ])
-    
-    if alert_type in ["all", "negative_stock"]:
-        negative_stock = db.query(InventoryBalance).filter(
-            InventoryBalance.available_quantity < 0
-        ).all()
-        alerts.extend([
-            {
-                "type": "negative_stock",
-                "part_number": item.part_number,
-                "location_id": item.location_id,
-                "available_quantity": float(item.available_quantity),
-                "message": f"Negative stock for {item.part_number}: {item.available_quantity}"
-            }
-            for item in negative_stock
-        ])
-    
+    # Satu round trip untuk semua tipe: zero dan negative sama-sama
+    # available_quantity <= 0, tipenya diturunkan per baris di Python.
+    # Proyeksi hanya kolom yang dipakai alert, bukan entity penuh.
+    if alert_type == "zero_stock":
+        cond = InventoryBalance.available_quantity == 0
+    elif alert_type == "negative_stock":
+        cond = InventoryBalance.available_quantity < 0
+    elif alert_type == "all":
+        cond = InventoryBalance.available_quantity <= 0
+    else:
+        # low_stock/overstock belum diimplementasikan (perilaku lama:
+        # daftar kosong)
+        return {"alerts": [], "total_alerts": 0}
+
+    # Shaping alert di MySQL: tipe dan pesan dihitung per baris lewat
+    # CASE/CONCAT, seluruh daftar pulang sebagai satu blob JSON
+    json_row = func.json_object(
+        'type', case(
+            (InventoryBalance.available_quantity < 0, 'negative_stock'),
+            else_='zero_stock'
+        ),
+        'part_number', InventoryBalance.part_number,
+        'location_id', InventoryBalance.location_id,
+        'available_quantity', InventoryBalance.available_quantity,
+        'message', case(
+            (InventoryBalance.available_quantity < 0,
+             func.concat('Negative stock for ', InventoryBalance.part_number,
+                         ': ', InventoryBalance.available_quantity)),
+            else_=func.concat('Zero stock for ', InventoryBalance.part_number)
+        )
+    )
+    row = (await db.execute(
+        select(func.json_arrayagg(json_row), func.count()).where(cond)
+    )).one()
+    alerts = _json_loads(row[0]) if row[0] else []
+
     return {
         "alerts": alerts,
-        "total_alerts": len(alerts)
+        "total_alerts": row[1]
     }
 
 # ====================================================================
@@ -769,45 +1299,65 @@ async def get_stock_alerts(
 @router.get("/inventory/dashboard")
 async def get_inventory_dashboard(
     warehouse_zone: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get comprehensive inventory dashboard data
     """
-    base_query = db.query(InventoryBalance).join(InventoryLocation)
-    
-    if warehouse_zone:
-        base_query = base_query.filter(InventoryLocation.warehouse_zone == warehouse_zone)
-    
+    cache_key = ("inventory_dashboard", warehouse_zone)
+    cached = cache_lookup(cache_key, _ANALYTICS_CACHE_TTL)
+    if cached is not None:
+        return cached
+
     # Overall statistics
-    overall_stats = base_query.with_entities(
+    stats_stmt = select(
         func.count(InventoryBalance.part_number).label('total_parts'),
         func.sum(InventoryBalance.available_quantity).label('total_available'),
         func.sum(InventoryBalance.reserved_quantity).label('total_reserved'),
         func.sum(InventoryBalance.available_quantity * InventoryBalance.average_cost).label('total_value')
-    ).first()
-    
+    ).select_from(InventoryBalance).join(InventoryLocation)
+
+    if warehouse_zone:
+        stats_stmt = stats_stmt.where(InventoryLocation.warehouse_zone == warehouse_zone)
+
     # Recent movements (last 7 days)
-    recent_movements = db.query(
+    recent_stmt = select(
         func.count(InventoryMovement.id).label('total_movements'),
         func.sum(InventoryMovement.quantity).label('total_quantity_moved')
-    ).filter(
+    ).where(
         InventoryMovement.movement_date >= datetime.now().date() - timedelta(days=7)
-    ).first()
-    
+    )
+
     # Active reservations
-    active_reservations = db.query(
+    reservations_stmt = select(
         func.count(StockReservation.id).label('total_reservations'),
         func.sum(StockReservation.reserved_quantity).label('total_reserved_qty')
-    ).filter(StockReservation.status == 'active').first()
-    
+    ).where(StockReservation.status == 'active')
+
     # Pending cycle counts
-    pending_counts = db.query(func.count(CycleCount.id)).filter(
-        CycleCount.status == 'pending'
-    ).scalar()
-    
-    return {
+    pending_stmt = select(func.count(CycleCount.id)).where(CycleCount.status == 'pending')
+
+    # Empat agregasi independen atas tabel berbeda: jalan paralel, satu
+    # sesi pool per sub-query (AsyncSession hanya memproses satu statement
+    # pada satu waktu). Latensi dashboard = sub-query terlambat, bukan
+    # jumlah keempatnya.
+    async def _first(stmt):
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(stmt)).first()
+
+    async def _scalar(stmt):
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(stmt)).scalar()
+
+    overall_stats, recent_movements, active_reservations, pending_counts = await asyncio.gather(
+        _first(stats_stmt),
+        _first(recent_stmt),
+        _first(reservations_stmt),
+        _scalar(pending_stmt),
+    )
+
+    return cache_store(cache_key, {
         "summary": {
             "total_parts": overall_stats.total_parts or 0,
             "total_available_quantity": float(overall_stats.total_available or 0),
@@ -826,4 +1376,4 @@ async def get_inventory_dashboard(
             "pending_counts": pending_counts or 0
         },
         "warehouse_zone": warehouse_zone
-    }
+    })
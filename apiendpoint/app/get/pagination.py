@@ -0,0 +1,58 @@
+"""
+Opaque cursor helpers untuk keyset pagination (CQRS list endpoints)
+
+OFFSET besar memaksa MySQL scan+buang `offset` baris sebelum halaman
+diminta; keyset memakai nilai (sort_column, id) baris terakhir sebagai
+kursor sehingga halaman berikutnya jadi index range seek murni.
+"""
+import base64
+from typing import Optional, Tuple, Union
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json as _json
+
+    def _dumps(obj) -> bytes:
+        return _json.dumps(obj, default=str).encode()
+
+    _loads = _json.loads
+
+
+def encode_cursor(sort_value, row_id: Union[int, str]) -> str:
+    """Bangun cursor dari baris terakhir halaman (sort value + key unik)"""
+    raw = _dumps([str(sort_value), row_id])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Union[int, str]]:
+    """Urai cursor -> (sort_value, key); ValueError kalau tidak valid.
+
+    Sort value dikembalikan sebagai string ISO dan di-bind apa adanya -
+    MySQL membandingkan literal 'YYYY-MM-DD HH:MM:SS' dengan kolom
+    DATETIME/DATE tanpa konversi di sisi Python. Key unik ikut tipe saat
+    di-encode: id numerik pulang sebagai int, key string (mis.
+    part_number pada endpoint analytics) dibiarkan string supaya
+    perbandingan kolom VARCHAR tidak kena koersi numerik.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = _loads(raw)
+        if not isinstance(row_id, str):
+            row_id = int(row_id)
+        return sort_value, row_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def next_cursor_from(rows, sort_key: str, limit: int) -> Optional[str]:
+    """Cursor halaman berikut dari page penuh; None kalau sudah habis.
+
+    `rows` adalah list mapping/dict hasil halaman (maksimal `limit`).
+    """
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last[sort_key], last["id"])
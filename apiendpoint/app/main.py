@@ -96,13 +96,24 @@ def optimize_for_mobile(data: dict, device_type: str) -> dict:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# orjson response class: C serializer untuk payload list besar, jauh lebih
+# cepat dari stdlib json. Fallback ke JSONResponse kalau orjson belum terinstall.
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 # Create FastAPI app with comprehensive configuration
 app = FastAPI(
+    default_response_class=DefaultResponse,
     title="ERP Manufacturing Unified API",
     description="ERP Manufacturing System - Unified Query & Mobile API Service",
     version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
+    # Schema generation untuk /docs & /redoc lumayan berat saat startup;
+    # di production tidak dipakai, jadi dimatikan sekalian
+    docs_url="/docs" if settings.ENVIRONMENT != "production" else None,
+    redoc_url="/redoc" if settings.ENVIRONMENT != "production" else None,
     openapi_tags=[
         {"name": "mobile", "description": "Mobile-optimized endpoints"},
         {"name": "query", "description": "Data query operations"},
@@ -145,6 +156,47 @@ app.add_middleware(
     allow_headers=["*", "X-Mobile-App", "X-Device-ID", "X-App-Version", "X-Platform"],
 )
 
+# Kompresi response: list endpoint dengan .all() gampang tembus puluhan KB
+# JSON, kompresi memangkas 70-90% ukuran payload (penting untuk /mobile/*).
+# starlette-compress negosiasi zstd/brotli/gzip dari Accept-Encoding;
+# fallback ke GZipMiddleware bawaan Starlette kalau belum terinstall.
+try:
+    from starlette_compress import CompressMiddleware
+    app.add_middleware(
+        CompressMiddleware,
+        minimum_size=500,
+        zstd_level=4,
+        brotli_quality=4,
+        gzip_level=6,
+    )
+except ImportError:
+    from fastapi.middleware.gzip import GZipMiddleware
+    app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
+# Auth untuk route QC dipindah ke middleware: decode + lookup user jalan
+# sekali di sini dan hasilnya ditaruh di request.state.user, jadi FastAPI
+# tidak membangun dependency graph get_current_user per route
+@app.middleware("http")
+async def qc_auth_middleware(request: Request, call_next):
+    if SessionLocal and "/qc/" in f"{request.url.path}/":
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        user = None
+        if scheme.lower() == "bearer" and token:
+            from app.core.security import authenticate_token
+            db = SessionLocal()
+            try:
+                user = authenticate_token(token, db)
+            finally:
+                db.close()
+        if user is None:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Tidak dapat memvalidasi kredensial"},
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        request.state.user = user
+    return await call_next(request)
+
 # Block non-GET methods - CQRS enforcement
 @app.middleware("http")
 async def block_write_operations(request: Request, call_next):
@@ -674,10 +726,28 @@ async def mobile_query_alias(path: str, request: Request):
 
 if __name__ == "__main__":
     import uvicorn
+
+    # uvloop + httptools: event loop dan HTTP parser berbasis C, ~2x
+    # throughput dibanding asyncio/h11 bawaan. Fallback ke "auto" kalau
+    # belum terinstall (mis. Windows tidak support uvloop).
+    try:
+        import uvloop  # noqa: F401
+        import httptools  # noqa: F401
+        loop_impl, http_impl = "uvloop", "httptools"
+    except ImportError:
+        loop_impl, http_impl = "auto", "auto"
+
+    # Worker per core saat production; reload mode tidak kompatibel
+    # dengan multi-worker jadi tetap single process saat DEBUG
+    workers = 1 if settings.DEBUG else min(4, os.cpu_count() or 1)
+
     uvicorn.run(
         "main:app",
         host="127.0.0.1",
         port=settings.API_PORT,
         reload=settings.DEBUG,
+        workers=workers,
+        loop=loop_impl,
+        http=http_impl,
         log_level="info"
     )
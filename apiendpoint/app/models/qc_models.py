@@ -19,7 +19,7 @@ class QCInspectionPlan(Base):
     sample_size = Column(Integer, default=1)
     acceptance_criteria = Column(JSON, comment="Criteria for pass/fail decisions")
     inspection_points = Column(JSON, comment="List of measurement points and tolerances")
-    required_tools = Column(String(500), comment="Required inspection tools/equipment")
+    required_tools = Column(JSON, comment="Required inspection tools/equipment")
     estimated_time_minutes = Column(Integer, default=30)
     is_active = Column(Boolean, default=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,7 +1,7 @@
 """
 Warehouse SQLAlchemy Models for FastAPI
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Boolean, Text, ForeignKey, Index
+from sqlalchemy import Column, Computed, Integer, String, Float, DateTime, Date, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.base import Base
@@ -55,6 +55,9 @@ class InventoryMovement(Base):
     notes = Column(Text, nullable=True)
     user_id = Column(Integer, nullable=False)  # Foreign key to users table
     movement_date = Column(Date, server_default=func.curdate(), nullable=False)
+    # Generated STORED (lihat database/movement_day_generated_column.sql):
+    # bucketing harian lewat kolom ter-index, bukan DATE() di GROUP BY
+    movement_day = Column(Date, Computed("DATE(movement_date)", persisted=True))
     batch_number = Column(String(50), nullable=True)
     expiry_date = Column(Date, nullable=True)
     serial_numbers = Column(Text, nullable=True)
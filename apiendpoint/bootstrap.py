@@ -31,19 +31,19 @@ ALIBABA_FC_PATHS = [
 for path in ALIBABA_FC_PATHS:
     if path and os.path.exists(path) and os.path.exists(os.path.join(path, 'app')):
         CODE_DIR = path
-        logger.info(f"Using code directory: {CODE_DIR}")
+        logger.info("Using code directory: %s", CODE_DIR)
         break
 else:
     # Fallback: use first path that exists (even without app/)
     for path in ALIBABA_FC_PATHS:
         if path and os.path.exists(path):
             CODE_DIR = path
-            logger.info(f"Using code directory (fallback): {CODE_DIR}")
+            logger.info("Using code directory (fallback): %s", CODE_DIR)
             break
 
-logger.info(f"LD_LIBRARY_PATH: {os.environ.get('LD_LIBRARY_PATH', 'NOT SET')}")
-logger.info(f"PATH: {os.environ.get('PATH', 'NOT SET')[:100]}...")
-logger.info(f"PYTHONPATH: {os.environ.get('PYTHONPATH', 'NOT SET')}")
+logger.info("LD_LIBRARY_PATH: %s", os.environ.get('LD_LIBRARY_PATH', 'NOT SET'))
+logger.info("PATH: %s...", os.environ.get('PATH', 'NOT SET')[:100])
+logger.info("PYTHONPATH: %s", os.environ.get('PYTHONPATH', 'NOT SET'))
 
 # Add app directory to path
 sys.path.insert(0, CODE_DIR)
@@ -69,11 +69,11 @@ def load_env():
     
     for env_path in env_paths:
         if os.path.exists(env_path):
-            logger.info(f"Loading environment from: {env_path}")
+            logger.info("Loading environment from: %s", env_path)
             try:
                 from dotenv import load_dotenv
                 load_dotenv(env_path)
-                logger.info(f"✓ Loaded environment from {env_path}")
+                logger.info("✓ Loaded environment from %s", env_path)
                 break
             except ImportError:
                 logger.warning("python-dotenv not installed, reading manually")
@@ -86,7 +86,7 @@ def load_env():
                                 key, value = line.split('=', 1)
                                 os.environ[key.strip()] = value.strip()
                 except Exception as e:
-                    logger.warning(f"Error reading {env_path}: {e}")
+                    logger.warning("Error reading %s: %s", env_path, e)
                 break
 
 # Load environment
@@ -125,11 +125,11 @@ def import_app():
         
         for main_path in main_paths:
             if os.path.exists(main_path):
-                logger.info(f"Loading main.py from: {main_path}")
+                logger.info("Loading main.py from: %s", main_path)
                 spec = importlib.util.spec_from_file_location("app_main", main_path)
                 main_module = importlib.util.module_from_spec(spec)
                 spec.loader.exec_module(main_module)
-                logger.info(f"✓ Strategy 3: FastAPI app loaded from {main_path}")
+                logger.info("✓ Strategy 3: FastAPI app loaded from %s", main_path)
                 return main_module.app
         
         import_errors.append(f"main.py not found in: {main_paths}")
@@ -143,27 +143,27 @@ def import_app():
     
     logger.error("Failed strategies:")
     for error in import_errors:
-        logger.error(f"  - {error}")
+        logger.error("  - %s", error)
     
-    logger.error(f"\nEnvironment:")
-    logger.error(f"  CODE_DIR: {CODE_DIR}")
-    logger.error(f"  SCRIPT_DIR: {SCRIPT_DIR}")
-    logger.error(f"  PWD: {os.getcwd()}")
-    logger.error(f"  FC_FUNCTION_NAME: {os.environ.get('FC_FUNCTION_NAME', 'NOT SET')}")
+    logger.error("\nEnvironment:")
+    logger.error("  CODE_DIR: %s", CODE_DIR)
+    logger.error("  SCRIPT_DIR: %s", SCRIPT_DIR)
+    logger.error("  PWD: %s", os.getcwd())
+    logger.error("  FC_FUNCTION_NAME: %s", os.environ.get('FC_FUNCTION_NAME', 'NOT SET'))
     
-    logger.error(f"\nDirectory contents:")
+    logger.error("\nDirectory contents:")
     try:
         if os.path.exists(CODE_DIR):
             contents = os.listdir(CODE_DIR)
-            logger.error(f"  {CODE_DIR}: {contents}")
+            logger.error("  %s: %s", CODE_DIR, contents)
         else:
-            logger.error(f"  {CODE_DIR}: DOES NOT EXIST")
+            logger.error("  %s: DOES NOT EXIST", CODE_DIR)
     except Exception as e:
-        logger.error(f"  Error listing {CODE_DIR}: {e}")
+        logger.error("  Error listing %s: %s", CODE_DIR, e)
     
-    logger.error(f"\nsys.path (first 5):")
+    logger.error("\nsys.path (first 5):")
     for i, path in enumerate(sys.path[:5], 1):
-        logger.error(f"  [{i}] {path}")
+        logger.error("  [%s] %s", i, path)
     
     logger.error("="*70)
     sys.exit(1)
@@ -179,7 +179,7 @@ asgi_app = app
 
 def signal_handler(signum, frame):
     """Handle graceful shutdown"""
-    logger.info(f"Received signal {signum}, shutting down gracefully...")
+    logger.info("Received signal %s, shutting down gracefully...", signum)
     sys.exit(0)
 
 # Register signal handlers
@@ -196,20 +196,25 @@ if __name__ == '__main__':
         
         logger.info("\n" + "="*60)
         logger.info("✅ WMS Manufacturing Query Service (FastAPI)")
-        logger.info(f"   Environment: {env_name}")
-        logger.info(f"   Listening on: {FC_HOST}:{FC_PORT}")
-        logger.info(f"   URL: http://{FC_HOST}:{FC_PORT}")
-        logger.info(f"   Health: http://{FC_HOST}:{FC_PORT}/health")
-        logger.info(f"   Docs: http://{FC_HOST}:{FC_PORT}/docs")
+        logger.info("   Environment: %s", env_name)
+        logger.info("   Listening on: %s:%s", FC_HOST, FC_PORT)
+        logger.info("   URL: http://%s:%s", FC_HOST, FC_PORT)
+        logger.info("   Health: http://%s:%s/health", FC_HOST, FC_PORT)
+        logger.info("   Docs: http://%s:%s/docs", FC_HOST, FC_PORT)
         logger.info("="*60 + "\n")
         
-        # Start Uvicorn server
+        # Start Uvicorn server with uvloop + httptools (C-accelerated event
+        # loop and HTTP parser); access logs off - each line is a full
+        # Python-level format+write per request
         uvicorn.run(
             'app.main:app',
             host=FC_HOST,
             port=FC_PORT,
-            log_level='info',
-            access_log=True,
+            loop='uvloop',
+            http='httptools',
+            workers=int(os.environ.get('FC_WORKERS', '1')),
+            log_level='warning',
+            access_log=False,
             reload=False,  # Production mode
         )
         
@@ -217,5 +222,5 @@ if __name__ == '__main__':
         logger.error("uvicorn not installed")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"Failed to start server: {e}")
+        logger.error("Failed to start server: %s", e)
         sys.exit(1)
@@ -0,0 +1,44 @@
+-- ====================================================================
+-- INVENTORY BALANCE NON-ZERO FILTER INDEX
+-- Query Service - /erp/inventory/balances (include_zero=False default)
+-- Date: 2025-08-29
+-- Purpose: Filter available_quantity > 0 jalan di setiap call default.
+--          MySQL tidak mendukung partial index (WHERE available_quantity > 0
+--          ala PostgreSQL), jadi pakai composite index yang menempatkan
+--          available_quantity sebagai kolom terakhir: ORDER BY
+--          part_number + join location terlayani dari index, dan baris
+--          zero-balance tersaring di index tanpa menyentuh row data
+--          (ICP / index condition pushdown).
+-- Catatan: CREATE INDEX IF NOT EXISTS hanya ada di MariaDB; guard lewat
+--          information_schema supaya idempotent juga di MySQL 8.
+-- ====================================================================
+
+USE cloudtle;
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+DELIMITER $$
+CREATE PROCEDURE add_index_if_missing(
+    IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_ddl TEXT)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+          AND table_name = p_table AND index_name = p_index
+    ) THEN
+        SET @ddl = p_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END$$
+DELIMITER ;
+
+CALL add_index_if_missing('inventory_balances', 'idx_inv_balance_part_loc_qty',
+    'CREATE INDEX idx_inv_balance_part_loc_qty ON inventory_balances(part_number, location_id, available_quantity)');
+
+DROP PROCEDURE add_index_if_missing;
+
+-- Verification: EXPLAIN harus menunjukkan "Using index condition"
+-- EXPLAIN SELECT * FROM inventory_balances
+--         WHERE available_quantity > 0
+--         ORDER BY part_number LIMIT 100;
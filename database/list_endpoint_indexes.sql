@@ -0,0 +1,137 @@
+-- ====================================================================
+-- LIST ENDPOINT COMPOSITE INDEXES
+-- Query Service - ORDER BY ... DESC LIMIT N access patterns
+-- Date: 2025-08-29
+-- Purpose: Composite index yang cocok dengan kombinasi WHERE + ORDER BY
+--          pada list endpoints, supaya LIMIT N berhenti setelah N baris
+--          index (Index Scan Backward) tanpa filtered scan + filesort.
+-- Catatan: CREATE INDEX IF NOT EXISTS hanya ada di MariaDB; produksi
+--          jalan di MySQL 8, jadi tiap index lewat prosedur yang cek
+--          information_schema dulu - idempotent di kedua server.
+-- ====================================================================
+
+USE cloudtle;
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+DELIMITER $$
+CREATE PROCEDURE add_index_if_missing(
+    IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_ddl TEXT)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+          AND table_name = p_table AND index_name = p_index
+    ) THEN
+        SET @ddl = p_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END$$
+DELIMITER ;
+
+-- /erp/production/orders: filter status/part_number, order by created_at DESC
+CALL add_index_if_missing('production_orders', 'idx_prod_order_status_created',
+    'CREATE INDEX idx_prod_order_status_created ON production_orders(status, created_at DESC)');
+CALL add_index_if_missing('production_orders', 'idx_prod_order_part_created',
+    'CREATE INDEX idx_prod_order_part_created ON production_orders(part_number, created_at DESC)');
+
+-- Keyset pagination: range scan (created_at, id) untuk cursor > / < tuple
+CALL add_index_if_missing('production_orders', 'idx_prod_order_created_id',
+    'CREATE INDEX idx_prod_order_created_id ON production_orders(created_at DESC, id DESC)');
+
+-- Keyset pagination master_prod: cursor pada part_number
+CALL add_index_if_missing('master_prod', 'idx_master_prod_part_number',
+    'CREATE INDEX idx_master_prod_part_number ON master_prod(part_number)');
+
+-- /erp/production/output: filter shift/date range, order by operation_date DESC
+CALL add_index_if_missing('output_mc', 'idx_output_mc_opdate_shift',
+    'CREATE INDEX idx_output_mc_opdate_shift ON output_mc(operation_date DESC, shift)');
+
+-- /erp/inventory/movements: filter movement_type/date range, order by movement_date DESC
+CALL add_index_if_missing('inventory_movements', 'idx_inv_move_date_type',
+    'CREATE INDEX idx_inv_move_date_type ON inventory_movements(movement_date DESC, movement_type)');
+
+-- Join/aggregasi output per job_order (status summary, search, orders list)
+CALL add_index_if_missing('output_mc', 'idx_output_mc_job_order',
+    'CREATE INDEX idx_output_mc_job_order ON output_mc(job_order)');
+
+-- /erp/production/output?job_order=...: filter job_order + order by
+-- operation_date DESC dari satu index (juga meng-cover idx_output_mc_job_order)
+CALL add_index_if_missing('output_mc', 'idx_om_jo_date',
+    'CREATE INDEX idx_om_jo_date ON output_mc(job_order, operation_date DESC)');
+
+-- /master/products: filter is_active + category, order/cursor pada part_number
+CALL add_index_if_missing('master_prod', 'idx_mp_active_cat_pn',
+    'CREATE INDEX idx_mp_active_cat_pn ON master_prod(is_active, category, part_number)');
+
+-- /qc/oqc: filter part/lot + order by created_at DESC LIMIT N dari satu
+-- index (MySQL tidak punya INCLUDE; kolom status ikut dibaca dari row)
+CALL add_index_if_missing('oqc', 'idx_oqc_part_lot_created',
+    'CREATE INDEX idx_oqc_part_lot_created ON oqc(part_number, lot_number, created_at DESC)');
+
+-- /production/outputs & dashboard recent outputs: ORDER BY created_at DESC LIMIT N
+CALL add_index_if_missing('output_mc', 'idx_output_mc_created',
+    'CREATE INDEX idx_output_mc_created ON output_mc(created_at DESC)');
+
+-- Keyset pagination QC & warehouse: range scan tuple (sort_col, id)
+CALL add_index_if_missing('qc_non_conformance', 'idx_ncr_created_id',
+    'CREATE INDEX idx_ncr_created_id ON qc_non_conformance(created_at DESC, id DESC)');
+CALL add_index_if_missing('transfer_qc', 'idx_tqc_opdate_id',
+    'CREATE INDEX idx_tqc_opdate_id ON transfer_qc(operation_date DESC, id DESC)');
+CALL add_index_if_missing('inventory_movements', 'idx_inv_move_created_id',
+    'CREATE INDEX idx_inv_move_created_id ON inventory_movements(created_at DESC, id DESC)');
+CALL add_index_if_missing('stock_reservations', 'idx_stock_res_created_id',
+    'CREATE INDEX idx_stock_res_created_id ON stock_reservations(created_at DESC, id DESC)');
+CALL add_index_if_missing('cycle_counts', 'idx_cycle_count_created_id',
+    'CREATE INDEX idx_cycle_count_created_id ON cycle_counts(created_at DESC, id DESC)');
+
+-- Composite (filter, sort, id) per pasangan WHERE + ORDER BY list QC &
+-- warehouse: satu filter equality di depan, lalu kolom sort DESC + id
+-- sebagai tie-breaker supaya halaman keyset tetap index range scan
+-- tanpa filesort meski filter aktif
+CALL add_index_if_missing('qc_non_conformance', 'idx_ncr_status_created',
+    'CREATE INDEX idx_ncr_status_created ON qc_non_conformance(status, created_at DESC, id DESC)');
+CALL add_index_if_missing('qc_non_conformance', 'idx_ncr_type_created',
+    'CREATE INDEX idx_ncr_type_created ON qc_non_conformance(ncr_type, created_at DESC, id DESC)');
+CALL add_index_if_missing('transfer_qc', 'idx_tqc_machine_date',
+    'CREATE INDEX idx_tqc_machine_date ON transfer_qc(machine_id, operation_date DESC, id DESC)');
+CALL add_index_if_missing('inventory_movements', 'idx_mv_type_created',
+    'CREATE INDEX idx_mv_type_created ON inventory_movements(movement_type, created_at DESC, id DESC)');
+CALL add_index_if_missing('stock_reservations', 'idx_stock_res_status_created',
+    'CREATE INDEX idx_stock_res_status_created ON stock_reservations(status, created_at DESC, id DESC)');
+CALL add_index_if_missing('cycle_counts', 'idx_cycle_count_status_created',
+    'CREATE INDEX idx_cycle_count_status_created ON cycle_counts(status, created_at DESC, id DESC)');
+
+-- Cabang UNION filter location_id pada /inventory/movements: seek per
+-- arah (from/to) + kolom sort/date supaya tiap cabang murni index range
+CALL add_index_if_missing('inventory_movements', 'idx_mv_from_loc_date',
+    'CREATE INDEX idx_mv_from_loc_date ON inventory_movements(from_location_id, movement_date DESC, id DESC)');
+CALL add_index_if_missing('inventory_movements', 'idx_mv_to_loc_date',
+    'CREATE INDEX idx_mv_to_loc_date ON inventory_movements(to_location_id, movement_date DESC, id DESC)');
+
+-- Anti-join NOT EXISTS pada /inventory/analytics/slow-moving: probe
+-- (part_number, movement_date >= threshold) berhenti di baris index
+-- pertama, tanpa menyentuh row movement sama sekali
+CALL add_index_if_missing('inventory_movements', 'idx_mv_part_date',
+    'CREATE INDEX idx_mv_part_date ON inventory_movements(part_number, movement_date)');
+
+-- /inventory/balances: filter part_number + range available_quantity;
+-- average_cost/reserved_quantity ikut di index sebagai pengganti INCLUDE
+-- (MySQL secondary index selalu non-covering kecuali kolomnya disebut)
+CALL add_index_if_missing('inventory_balances', 'idx_bal_part_qty',
+    'CREATE INDEX idx_bal_part_qty ON inventory_balances(part_number, available_quantity, average_cost, reserved_quantity)');
+
+-- FK index untuk eager load user pada list endpoint (selectinload)
+CALL add_index_if_missing('stock_take_history', 'idx_stock_take_user',
+    'CREATE INDEX idx_stock_take_user ON stock_take_history(user_id)');
+CALL add_index_if_missing('transfer_qc', 'idx_transfer_qc_user',
+    'CREATE INDEX idx_transfer_qc_user ON transfer_qc(user_id)');
+CALL add_index_if_missing('delivery', 'idx_delivery_user',
+    'CREATE INDEX idx_delivery_user ON delivery(user_id)');
+
+DROP PROCEDURE add_index_if_missing;
+
+-- Verification: EXPLAIN harus menunjukkan index scan, bukan filesort
+-- EXPLAIN SELECT * FROM production_orders WHERE status = 'running'
+--         ORDER BY created_at DESC LIMIT 100;
@@ -0,0 +1,43 @@
+-- ====================================================================
+-- MOVEMENT DAY GENERATED COLUMN
+-- Query Service - daily trend bucketing
+-- Date: 2025-08-29
+-- Purpose: /inventory/movements/daily meng-group pakai
+--          DATE(movement_date); fungsi di GROUP BY membungkus kolom
+--          sehingga index movement_date tidak terpakai. Kolom generated
+--          STORED + index sendiri membuat agregasi harian jalan sebagai
+--          index-order grouping.
+-- Catatan: ADD COLUMN/ADD INDEX tidak idempotent; guard lewat
+--          information_schema (pola sama dengan skrip index lain)
+--          supaya aman dijalankan ulang di MySQL 8 maupun MariaDB.
+-- ====================================================================
+
+USE cloudtle;
+
+DROP PROCEDURE IF EXISTS add_movement_day_if_missing;
+DELIMITER $$
+CREATE PROCEDURE add_movement_day_if_missing()
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE()
+          AND table_name = 'inventory_movements'
+          AND column_name = 'movement_day'
+    ) THEN
+        ALTER TABLE inventory_movements
+            ADD COLUMN movement_day DATE AS (DATE(movement_date)) STORED;
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+          AND table_name = 'inventory_movements'
+          AND index_name = 'idx_movement_day'
+    ) THEN
+        ALTER TABLE inventory_movements
+            ADD INDEX idx_movement_day (movement_day, movement_type);
+    END IF;
+END$$
+DELIMITER ;
+
+CALL add_movement_day_if_missing();
+DROP PROCEDURE add_movement_day_if_missing;
@@ -0,0 +1,75 @@
+-- ====================================================================
+-- QC DAILY SUMMARY ROLLUP
+-- Query Service - pre-aggregated dashboard metrics
+-- Date: 2025-08-29
+-- Purpose: /qc/dashboard/summary menghitung 9 COUNT(*) atas oqc,
+--          qc_inspection_results, dan qc_non_conformance per request.
+--          Rollup harian ini diisi berkala oleh MySQL EVENT sehingga
+--          endpoint cukup satu SELECT SUM() atas rentang hari.
+-- ====================================================================
+
+USE cloudtle;
+
+CREATE TABLE IF NOT EXISTS qc_daily_summary (
+    day DATE NOT NULL PRIMARY KEY,
+    oqc_total INT NOT NULL DEFAULT 0,
+    oqc_pass INT NOT NULL DEFAULT 0,
+    oqc_fail INT NOT NULL DEFAULT 0,
+    insp_total INT NOT NULL DEFAULT 0,
+    insp_pass INT NOT NULL DEFAULT 0,
+    insp_fail INT NOT NULL DEFAULT 0,
+    ncr_total INT NOT NULL DEFAULT 0,
+    ncr_open INT NOT NULL DEFAULT 0,
+    ncr_closed INT NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Refresh 2 hari terakhir (hari berjalan + kemarin); hari yang lebih
+-- lama sudah final dan tidak perlu dihitung ulang
+DELIMITER $$
+
+CREATE PROCEDURE IF NOT EXISTS refresh_qc_daily_summary()
+BEGIN
+    DECLARE since DATE DEFAULT DATE_SUB(CURDATE(), INTERVAL 1 DAY);
+
+    INSERT INTO qc_daily_summary (day, oqc_total, oqc_pass, oqc_fail)
+    SELECT DATE(created_at), COUNT(*),
+           SUM(overall_result = 'pass'), SUM(overall_result = 'fail')
+    FROM oqc WHERE created_at >= since
+    GROUP BY DATE(created_at)
+    ON DUPLICATE KEY UPDATE
+        oqc_total = VALUES(oqc_total),
+        oqc_pass = VALUES(oqc_pass),
+        oqc_fail = VALUES(oqc_fail);
+
+    INSERT INTO qc_daily_summary (day, insp_total, insp_pass, insp_fail)
+    SELECT DATE(inspection_start_time), COUNT(*),
+           SUM(overall_result = 'pass'), SUM(overall_result = 'fail')
+    FROM qc_inspection_results WHERE inspection_start_time >= since
+    GROUP BY DATE(inspection_start_time)
+    ON DUPLICATE KEY UPDATE
+        insp_total = VALUES(insp_total),
+        insp_pass = VALUES(insp_pass),
+        insp_fail = VALUES(insp_fail);
+
+    INSERT INTO qc_daily_summary (day, ncr_total, ncr_open, ncr_closed)
+    SELECT DATE(created_at), COUNT(*),
+           SUM(status = 'open'), SUM(status = 'closed')
+    FROM qc_non_conformance WHERE created_at >= since
+    GROUP BY DATE(created_at)
+    ON DUPLICATE KEY UPDATE
+        ncr_total = VALUES(ncr_total),
+        ncr_open = VALUES(ncr_open),
+        ncr_closed = VALUES(ncr_closed);
+END$$
+
+DELIMITER ;
+
+-- Backfill sekali untuk riwayat lama: jalankan manual tiga INSERT di
+-- atas tanpa klausa WHERE created_at >= since.
+
+-- Event scheduler harus aktif: SET GLOBAL event_scheduler = ON;
+CREATE EVENT IF NOT EXISTS ev_refresh_qc_daily_summary
+ON SCHEDULE EVERY 10 MINUTE
+DO CALL refresh_qc_daily_summary();
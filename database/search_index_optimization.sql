@@ -0,0 +1,86 @@
+-- ====================================================================
+-- SEARCH INDEX OPTIMIZATION
+-- Query Service - LIKE '%term%' filter performance
+-- Date: 2025-08-29
+-- Purpose: Index support untuk filter part_number / job_order pada
+--          list endpoints. Contains-search ('%term%') tidak bisa pakai
+--          B-tree index, jadi ditambahkan FULLTEXT index (InnoDB) dan
+--          prefix B-tree untuk anchored search ('term%').
+-- Catatan: harus jalan di MySQL 8 (produksi) DAN MariaDB (XAMPP dev).
+--          ADD FULLTEXT/CREATE INDEX tidak idempotent di MySQL, jadi
+--          tiap index dibungkus prosedur yang cek information_schema
+--          dulu - aman dijalankan ulang di kedua server. WITH PARSER
+--          ngram hanya ada di MySQL; di MariaDB klausa itu dilewati
+--          (FULLTEXT biasa, substring pendek dibatasi ft_min_word_len).
+-- ====================================================================
+
+USE cloudtle;
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+DELIMITER $$
+CREATE PROCEDURE add_index_if_missing(
+    IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_ddl TEXT)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+          AND table_name = p_table AND index_name = p_index
+    ) THEN
+        SET @ddl = p_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END$$
+DELIMITER ;
+
+-- ====================================================================
+-- FULLTEXT INDEXES (untuk contains-search pada kolom high-cardinality)
+-- Query service dapat memakai MATCH(col) AGAINST('term*' IN BOOLEAN MODE)
+-- ====================================================================
+
+CALL add_index_if_missing('inventory_balances', 'ft_inv_balance_part',
+    'ALTER TABLE inventory_balances ADD FULLTEXT INDEX ft_inv_balance_part (part_number)');
+CALL add_index_if_missing('inventory_movements', 'ft_inv_movement_part',
+    'ALTER TABLE inventory_movements ADD FULLTEXT INDEX ft_inv_movement_part (part_number)');
+CALL add_index_if_missing('production_orders', 'ft_prod_order_search',
+    'ALTER TABLE production_orders ADD FULLTEXT INDEX ft_prod_order_search (job_order, part_number)');
+CALL add_index_if_missing('output_mc', 'ft_output_mc_search',
+    'ALTER TABLE output_mc ADD FULLTEXT INDEX ft_output_mc_search (job_order, part_number)');
+CALL add_index_if_missing('master_prod', 'ft_master_prod_part',
+    'ALTER TABLE master_prod ADD FULLTEXT INDEX ft_master_prod_part (part_number)');
+
+-- QC list filters: part/lot adalah kode pendek, pakai parser ngram
+-- supaya substring di tengah kode tetap ketemu (MySQL saja; MariaDB
+-- tidak punya plugin ngram, jadi fallback ke FULLTEXT standar)
+SET @ngram := IF(VERSION() LIKE '%MariaDB%', '', ' WITH PARSER ngram');
+
+CALL add_index_if_missing('oqc', 'ft_oqc_part',
+    CONCAT('ALTER TABLE oqc ADD FULLTEXT INDEX ft_oqc_part (part_number)', @ngram));
+CALL add_index_if_missing('oqc', 'ft_oqc_lot',
+    CONCAT('ALTER TABLE oqc ADD FULLTEXT INDEX ft_oqc_lot (lot_number)', @ngram));
+CALL add_index_if_missing('qc_inspection_results', 'ft_qc_result_part',
+    CONCAT('ALTER TABLE qc_inspection_results ADD FULLTEXT INDEX ft_qc_result_part (part_number)', @ngram));
+CALL add_index_if_missing('qc_inspection_results', 'ft_qc_result_lot',
+    CONCAT('ALTER TABLE qc_inspection_results ADD FULLTEXT INDEX ft_qc_result_lot (lot_number)', @ngram));
+CALL add_index_if_missing('qc_non_conformance', 'ft_ncr_part',
+    CONCAT('ALTER TABLE qc_non_conformance ADD FULLTEXT INDEX ft_ncr_part (part_number)', @ngram));
+CALL add_index_if_missing('transfer_qc', 'ft_tqc_part',
+    CONCAT('ALTER TABLE transfer_qc ADD FULLTEXT INDEX ft_tqc_part (part_number)', @ngram));
+CALL add_index_if_missing('stock_reservations', 'ft_stock_res_part',
+    CONCAT('ALTER TABLE stock_reservations ADD FULLTEXT INDEX ft_stock_res_part (part_number)', @ngram));
+
+-- ====================================================================
+-- PREFIX B-TREE INDEXES (untuk anchored search 'term%')
+-- Dipakai oleh parameter *_prefix pada query endpoints
+-- ====================================================================
+
+CALL add_index_if_missing('inventory_movements', 'idx_inv_movement_part_prefix',
+    'CREATE INDEX idx_inv_movement_part_prefix ON inventory_movements(part_number)');
+CALL add_index_if_missing('output_mc', 'idx_output_mc_part_prefix',
+    'CREATE INDEX idx_output_mc_part_prefix ON output_mc(part_number)');
+
+DROP PROCEDURE add_index_if_missing;
+
+-- Verification
+-- SHOW INDEX FROM inventory_balances WHERE Key_name LIKE 'ft_%';